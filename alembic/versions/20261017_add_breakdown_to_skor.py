@@ -0,0 +1,31 @@
+"""Store scoring breakdown on santri_skor and pesantren_skor
+
+Revision ID: add_skor_breakdown
+Revises: 20260101_add_missing_columns
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "add_skor_breakdown"
+down_revision: Union[str, Sequence[str], None] = "20260101_add_missing_columns"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add breakdown JSONB columns, filled when a score is calculated."""
+    op.add_column("santri_skor", sa.Column("breakdown", postgresql.JSONB(), nullable=True))
+    op.add_column("pesantren_skor", sa.Column("breakdown", postgresql.JSONB(), nullable=True))
+
+
+def downgrade() -> None:
+    """Drop breakdown columns."""
+    op.drop_column("pesantren_skor", "breakdown")
+    op.drop_column("santri_skor", "breakdown")
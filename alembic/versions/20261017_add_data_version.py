@@ -0,0 +1,34 @@
+"""Add data_version change counters
+
+Revision ID: add_data_version
+Revises: add_santri_feature_rank_indexes
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "add_data_version"
+down_revision: Union[str, Sequence[str], None] = "add_santri_feature_rank_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create data_version table."""
+    op.create_table(
+        "data_version",
+        sa.Column("name", sa.String(50), nullable=False),
+        sa.Column("version", sa.BigInteger(), server_default=sa.text("0"), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False),
+        sa.PrimaryKeyConstraint("name"),
+    )
+
+
+def downgrade() -> None:
+    """Drop data_version table."""
+    op.drop_table("data_version")
@@ -0,0 +1,58 @@
+"""Add gis_grid_cell pre-aggregated map grid
+
+Revision ID: add_gis_grid_cell
+Revises: add_data_version
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "add_gis_grid_cell"
+down_revision: Union[str, Sequence[str], None] = "add_data_version"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Grid as of this revision: zoom levels and cell width (32 px at that zoom, EPSG:3857 metres)
+_RESOLUTIONS = ", ".join(f"({zoom}, {40075016.685578488 / (256 * 2 ** zoom) * 32!r})" for zoom in (4, 6, 8, 10, 12, 14))
+
+_FILL = """
+INSERT INTO gis_grid_cell (layer, resolusi, cx, cy, kategori, jumlah, total_skor)
+SELECT '{layer}', r.resolusi,
+       floor(ST_X(ST_Transform(m.lokasi, 3857)) / r.ukuran)::int,
+       floor(ST_Y(ST_Transform(m.lokasi, 3857)) / r.ukuran)::int,
+       m.{kategori}, count(*), COALESCE(sum(m.skor_terakhir), 0)
+FROM {table} m
+CROSS JOIN (VALUES {resolutions}) r(resolusi, ukuran)
+WHERE m.lokasi IS NOT NULL
+GROUP BY 1, 2, 3, 4, 5
+"""
+
+
+def upgrade() -> None:
+    """Create gis_grid_cell table and fill it from santri_map and pesantren_map.
+
+    Writers only apply deltas, so the table must start complete.
+    """
+    op.create_table(
+        "gis_grid_cell",
+        sa.Column("layer", sa.String(20), nullable=False),
+        sa.Column("resolusi", sa.SmallInteger(), nullable=False),
+        sa.Column("cx", sa.Integer(), nullable=False),
+        sa.Column("cy", sa.Integer(), nullable=False),
+        sa.Column("kategori", sa.String(50), nullable=False),
+        sa.Column("jumlah", sa.Integer(), server_default=sa.text("0"), nullable=False),
+        sa.Column("total_skor", sa.BigInteger(), server_default=sa.text("0"), nullable=False),
+        sa.PrimaryKeyConstraint("layer", "resolusi", "cx", "cy", "kategori"),
+    )
+    op.execute(_FILL.format(layer="santri", table="santri_map", kategori="kategori_kemiskinan", resolutions=_RESOLUTIONS))
+    op.execute(_FILL.format(layer="pesantren", table="pesantren_map", kategori="kategori_kelayakan", resolutions=_RESOLUTIONS))
+
+
+def downgrade() -> None:
+    """Drop gis_grid_cell table."""
+    op.drop_table("gis_grid_cell")
@@ -0,0 +1,90 @@
+"""Add santri_feature wide table
+
+Revision ID: add_santri_feature
+Revises: add_santri_skor_input_hashes
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from geoalchemy2 import Geometry
+
+
+# revision identifiers, used by Alembic.
+revision: str = "add_santri_feature"
+down_revision: Union[str, Sequence[str], None] = "add_santri_skor_input_hashes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_ASET_KODES = ("motor", "mobil", "sepeda", "hp", "laptop", "lahan", "ternak", "alat_kerja", "lainnya")
+_SKOR_COLUMNS = ("skor_ekonomi", "skor_rumah", "skor_aset", "skor_pembiayaan", "skor_kesehatan", "skor_bansos", "skor_total")
+
+
+def upgrade() -> None:
+    """Create santri_feature table.
+
+    It starts empty: its rows are compiled from the current scoring.json, so fill
+    it after upgrading with `python -m app.services.santri_feature_service`.
+    """
+    op.create_table(
+        "santri_feature",
+        sa.Column("santri_id", sa.UUID(as_uuid=True), nullable=False),
+        sa.Column("pesantren_id", sa.UUID(as_uuid=True), nullable=True),
+        sa.Column("nama", sa.String(150), nullable=True),
+        sa.Column("jenis_kelamin", sa.String(1), nullable=True),
+        sa.Column("provinsi", sa.String(100), nullable=True),
+        sa.Column("kabupaten", sa.String(100), nullable=True),
+        sa.Column("kecamatan", sa.String(100), nullable=True),
+        sa.Column("desa", sa.String(100), nullable=True),
+        sa.Column("lokasi", Geometry("POINT", srid=4326, spatial_index=False), nullable=True),
+        sa.Column("pendapatan_bulanan", sa.Integer(), nullable=True),
+        sa.Column("pekerjaan", sa.String(100), nullable=True),
+        sa.Column("pendidikan", sa.String(50), nullable=True),
+        sa.Column("status_pekerjaan", sa.String(20), nullable=True),
+        sa.Column("status_rumah", sa.String(30), nullable=True),
+        sa.Column("jenis_lantai", sa.String(30), nullable=True),
+        sa.Column("jenis_dinding", sa.String(30), nullable=True),
+        sa.Column("jenis_atap", sa.String(30), nullable=True),
+        sa.Column("akses_air_bersih", sa.String(30), nullable=True),
+        sa.Column("daya_listrik_va", sa.String(30), nullable=True),
+        sa.Column("sanitasi_layak", sa.Boolean(), nullable=True),
+        *[
+            sa.Column(f"aset_{kode}", sa.Integer(), server_default=sa.text("0"), nullable=False)
+            for kode in _ASET_KODES
+        ],
+        sa.Column("sumber_biaya", sa.String(30), nullable=True),
+        sa.Column("status_pembayaran", sa.String(30), nullable=True),
+        sa.Column("tunggakan_bulan", sa.Integer(), nullable=True),
+        sa.Column("status_gizi", sa.String(30), nullable=True),
+        sa.Column("riwayat_penyakit", sa.String(), nullable=True),
+        sa.Column("kebutuhan_khusus", sa.String(), nullable=True),
+        sa.Column("penyakit_kronis", sa.Boolean(), nullable=True),
+        sa.Column("pkh", sa.Boolean(), nullable=True),
+        sa.Column("bpnt", sa.Boolean(), nullable=True),
+        sa.Column("pip", sa.Boolean(), nullable=True),
+        sa.Column("kis_pbi", sa.Boolean(), nullable=True),
+        sa.Column("blt_desa", sa.Boolean(), nullable=True),
+        sa.Column("pernah_menerima_bansos", sa.Boolean(), nullable=True),
+        *[sa.Column(col, sa.Integer(), nullable=True) for col in _SKOR_COLUMNS],
+        sa.Column("kategori_kemiskinan", sa.String(30), nullable=True),
+        sa.Column("skor_calculated_at", sa.DateTime(), nullable=True),
+        sa.Column("refreshed_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["santri_id"], ["santri_pribadi.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("santri_id"),
+    )
+    op.create_index(
+        "idx_santri_feature_region", "santri_feature", ["provinsi", "kabupaten", "kecamatan", "desa"]
+    )
+    op.create_index(
+        "idx_santri_feature_kabupaten_kategori", "santri_feature", ["kabupaten", "kategori_kemiskinan"]
+    )
+    op.create_index("idx_santri_feature_pesantren", "santri_feature", ["pesantren_id"])
+    op.create_index("idx_santri_feature_skor_total", "santri_feature", ["skor_total"])
+    op.execute("CREATE INDEX idx_santri_feature_lokasi ON santri_feature USING GIST (lokasi)")
+
+
+def downgrade() -> None:
+    """Drop santri_feature table."""
+    op.drop_table("santri_feature")
@@ -0,0 +1,42 @@
+"""Add santri_feature ranking indexes
+
+Revision ID: add_santri_feature_rank_indexes
+Revises: add_santri_skor_histogram
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "add_santri_feature_rank_indexes"
+down_revision: Union[str, Sequence[str], None] = "add_santri_skor_histogram"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_RANK_ORDER = (
+    "skor_total DESC, skor_ekonomi DESC, skor_rumah DESC, skor_aset DESC, skor_pembiayaan DESC,"
+    " skor_kesehatan DESC, skor_bansos DESC, santri_id DESC"
+)
+
+_INDEXES = {
+    "idx_santri_feature_rank_kabupaten": "kabupaten",
+    "idx_santri_feature_rank_kecamatan": "kabupaten, kecamatan",
+    "idx_santri_feature_rank_pesantren": "pesantren_id",
+}
+
+
+def upgrade() -> None:
+    """Create (group, skor_total DESC, ...) partial indexes for top-N ranking."""
+    for name, group in _INDEXES.items():
+        op.execute(
+            f"CREATE INDEX {name} ON santri_feature ({group}, {_RANK_ORDER}) WHERE skor_total IS NOT NULL"
+        )
+
+
+def downgrade() -> None:
+    """Drop the ranking indexes."""
+    for name in _INDEXES:
+        op.drop_index(name, table_name="santri_feature")
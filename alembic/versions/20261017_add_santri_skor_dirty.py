@@ -0,0 +1,36 @@
+"""Add santri_skor_dirty queue for incremental re-scoring
+
+Revision ID: add_santri_skor_dirty
+Revises: add_skor_breakdown
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "add_santri_skor_dirty"
+down_revision: Union[str, Sequence[str], None] = "add_skor_breakdown"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create santri_skor_dirty table."""
+    op.create_table(
+        "santri_skor_dirty",
+        sa.Column("santri_id", sa.UUID(as_uuid=True), nullable=False),
+        sa.Column("marked_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["santri_id"], ["santri_pribadi.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("santri_id"),
+    )
+    op.create_index("idx_santri_skor_dirty_marked_at", "santri_skor_dirty", ["marked_at"])
+
+
+def downgrade() -> None:
+    """Drop santri_skor_dirty table."""
+    op.drop_index("idx_santri_skor_dirty_marked_at", table_name="santri_skor_dirty")
+    op.drop_table("santri_skor_dirty")
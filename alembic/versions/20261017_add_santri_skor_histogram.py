@@ -0,0 +1,47 @@
+"""Add santri_skor_histogram pre-aggregated score distribution
+
+Revision ID: add_santri_skor_histogram
+Revises: add_santri_feature
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "add_santri_skor_histogram"
+down_revision: Union[str, Sequence[str], None] = "add_santri_feature"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create santri_skor_histogram table.
+
+    It starts empty like santri_feature; `python -m app.services.santri_feature_service`
+    fills both.
+    """
+    op.create_table(
+        "santri_skor_histogram",
+        sa.Column("dimensi", sa.String(30), nullable=False),
+        sa.Column("provinsi", sa.String(100), server_default=sa.text("''"), nullable=False),
+        sa.Column("kabupaten", sa.String(100), server_default=sa.text("''"), nullable=False),
+        sa.Column("pesantren_id", sa.UUID(as_uuid=True), nullable=False),
+        sa.Column("skor", sa.Integer(), nullable=False),
+        sa.Column("jumlah", sa.Integer(), server_default=sa.text("0"), nullable=False),
+        sa.PrimaryKeyConstraint("dimensi", "provinsi", "kabupaten", "pesantren_id", "skor"),
+    )
+    op.create_index(
+        "idx_santri_skor_histogram_pesantren", "santri_skor_histogram", ["dimensi", "pesantren_id"]
+    )
+    op.create_index(
+        "idx_santri_skor_histogram_kabupaten", "santri_skor_histogram", ["dimensi", "kabupaten"]
+    )
+
+
+def downgrade() -> None:
+    """Drop santri_skor_histogram table."""
+    op.drop_table("santri_skor_histogram")
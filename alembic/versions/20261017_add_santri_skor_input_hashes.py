@@ -0,0 +1,29 @@
+"""Store per-dimension input hashes on santri_skor
+
+Revision ID: add_santri_skor_input_hashes
+Revises: add_scoring_job
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "add_santri_skor_input_hashes"
+down_revision: Union[str, Sequence[str], None] = "add_scoring_job"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add input_hashes JSONB column, filled when a score is calculated."""
+    op.add_column("santri_skor", sa.Column("input_hashes", postgresql.JSONB(), nullable=True))
+
+
+def downgrade() -> None:
+    """Drop input_hashes column."""
+    op.drop_column("santri_skor", "input_hashes")
@@ -0,0 +1,61 @@
+"""Add scoring_job and scoring_job_item for asynchronous batch scoring
+
+Revision ID: add_scoring_job
+Revises: add_santri_skor_dirty
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "add_scoring_job"
+down_revision: Union[str, Sequence[str], None] = "add_santri_skor_dirty"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create scoring_job and scoring_job_item tables."""
+    op.create_table(
+        "scoring_job",
+        sa.Column("id", sa.UUID(as_uuid=True), server_default=sa.text("gen_random_uuid()"), nullable=False),
+        sa.Column("kind", sa.String(length=20), nullable=False),
+        sa.Column("status", sa.String(length=20), server_default=sa.text("'pending'"), nullable=False),
+        sa.Column("chunk_size", sa.Integer(), nullable=False),
+        sa.Column("total", sa.Integer(), server_default=sa.text("0"), nullable=False),
+        sa.Column("processed", sa.Integer(), server_default=sa.text("0"), nullable=False),
+        sa.Column("failed", sa.Integer(), server_default=sa.text("0"), nullable=False),
+        sa.Column("done_at_start", sa.Integer(), server_default=sa.text("0"), nullable=False),
+        sa.Column("cursor", sa.UUID(as_uuid=True), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("heartbeat_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("idx_scoring_job_status", "scoring_job", ["status"])
+
+    op.create_table(
+        "scoring_job_item",
+        sa.Column("job_id", sa.UUID(as_uuid=True), nullable=False),
+        sa.Column("entity_id", sa.UUID(as_uuid=True), nullable=False),
+        sa.Column("nama", sa.String(length=200), nullable=True),
+        sa.Column("success", sa.Boolean(), nullable=False),
+        sa.Column("skor_total", sa.Integer(), nullable=True),
+        sa.Column("kategori", sa.String(length=30), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.ForeignKeyConstraint(["job_id"], ["scoring_job.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("job_id", "entity_id"),
+    )
+
+
+def downgrade() -> None:
+    """Drop scoring_job tables."""
+    op.drop_table("scoring_job_item")
+    op.drop_index("idx_scoring_job_status", table_name="scoring_job")
+    op.drop_table("scoring_job")
@@ -25,6 +25,19 @@ class Settings(BaseSettings):
     nl2sql_max_tokens: int = Field(default=2000, alias="NL2SQL_MAX_TOKENS")
     nl2sql_timeout_seconds: int = Field(default=30, alias="NL2SQL_TIMEOUT_SECONDS")
 
+    # ===== Scoring =====
+    scoring_job_chunk_size: int = Field(default=1000, alias="SCORING_JOB_CHUNK_SIZE")
+    # Processes used by santri batch jobs: 1 = sequential in the API process, 0 = one per CPU
+    scoring_workers: int = Field(default=1, alias="SCORING_WORKERS")
+    # Santri batch jobs: "python" evaluates scoring.json in the app, "sql" compiles it into one query
+    scoring_engine: str = Field(default="python", alias="SCORING_ENGINE")
+    # Feature matrix of the what-if simulator is reloaded from the database after this many seconds
+    scoring_simulation_cache_seconds: int = Field(default=900, alias="SCORING_SIMULATION_CACHE_SECONDS")
+    rescore_worker_enabled: bool = Field(default=False, alias="RESCORE_WORKER_ENABLED")
+    rescore_interval_seconds: int = Field(default=30, alias="RESCORE_INTERVAL_SECONDS")
+    rescore_batch_size: int = Field(default=1000, alias="RESCORE_BATCH_SIZE")
+    rescore_settle_seconds: int = Field(default=5, alias="RESCORE_SETTLE_SECONDS")
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
@@ -0,0 +1,42 @@
+"""
+Simplified geometry tiers for the admin boundary tables (provinsi, kabupaten, kecamatan).
+
+Each tier is a precomputed `ST_SimplifyPreserveTopology(geom, tolerance)` column
+stored next to `geom` by `app.gis.import_admin_boundaries`, served up to a maximum
+zoom with GeoJSON coordinates trimmed to a matching number of decimals. Zooms
+above the last tier read the full-resolution `geom`.
+"""
+
+# (max zoom, column, tolerance in degrees, GeoJSON decimal digits), coarsest first
+BOUNDARY_TIERS = (
+    (5, "geom_s3", 0.01, 3),
+    (8, "geom_s2", 0.002, 4),
+    (11, "geom_s1", 0.0005, 5),
+)
+FULL_TIER = ("geom", 6)
+MAX_ZOOM = 22
+
+
+def pick_tier(zoom: int | None = None, tolerance: float | None = None) -> tuple[str, int] | None:
+    """Column and GeoJSON precision for a zoom level or a tolerance (degrees).
+
+    A tolerance picks the coarsest tier not coarser than it; a zoom picks the first
+    tier whose max zoom covers it. Returns None when neither is given (full `geom`,
+    untrimmed, as before tiers existed).
+
+    Raises:
+        ValueError: zoom outside 0..MAX_ZOOM or tolerance <= 0
+    """
+    if tolerance is not None:
+        if tolerance <= 0:
+            raise ValueError("tolerance harus > 0")
+        fitting = [(column, digits) for _, column, tol, digits in BOUNDARY_TIERS if tol <= tolerance]
+        return fitting[0] if fitting else FULL_TIER
+    if zoom is not None:
+        if not 0 <= zoom <= MAX_ZOOM:
+            raise ValueError(f"zoom harus di antara 0 dan {MAX_ZOOM}")
+        for max_zoom, column, _, digits in BOUNDARY_TIERS:
+            if zoom <= max_zoom:
+                return column, digits
+        return FULL_TIER
+    return None
@@ -3,13 +3,16 @@ Import Indonesian administrative boundaries (provinsi, kabupaten, kecamatan) fro
 into PostGIS tables: public.provinsi, public.kabupaten, public.kecamatan
 
 - Geometry stored as MultiPolygon SRID 4326
+- Simplified copies of geom per zoom tier (see app.gis.boundary_tiers) in geom_s1..geom_s3
 - Creates GIST index on geom and BTree indexes on name columns
 - Reads DATABASE_URL from .env or environment; fallback to common local setup
 
 Usage:
     python -m app.gis.import_admin_boundaries
+    python -m app.gis.import_admin_boundaries --tiers-only   # rebuild simplified tiers of loaded tables
 """
 import os
+import sys
 import json
 from pathlib import Path
 from typing import Optional
@@ -18,6 +21,8 @@ import psycopg2
 from psycopg2.extras import execute_batch
 from dotenv import load_dotenv
 
+from app.gis.boundary_tiers import BOUNDARY_TIERS
+
 load_dotenv()
 
 # Resolve database URL with sensible fallback
@@ -141,10 +146,24 @@ def upsert_admin_table(conn, table: str, features: list[dict]):
     conn.commit()
 
 
+def build_simplified_tiers(conn, table: str):
+    """Fill the simplified geometry columns of a table from geom, one UPDATE for all tiers."""
+    assignments = ", ".join(
+        f"{column} = ST_Multi(ST_SimplifyPreserveTopology(geom, {tolerance}))"
+        for _, column, tolerance, _ in BOUNDARY_TIERS
+    )
+    with conn.cursor() as cur:
+        cur.execute(f"UPDATE {SCHEMA}.{table} SET {assignments}")
+    conn.commit()
+
+
 def ensure_tables(conn):
     with conn.cursor() as cur:
         for t, sql in TABLE_SQL.items():
             cur.execute(sql)
+            # Tables created before the tiers existed get the columns added in place
+            for _, column, _, _ in BOUNDARY_TIERS:
+                cur.execute(f"ALTER TABLE {SCHEMA}.{t} ADD COLUMN IF NOT EXISTS {column} geometry(MultiPolygon, 4326)")
     conn.commit()
     # Indexes
     with conn.cursor() as cur:
@@ -171,6 +190,7 @@ def import_all():
         print(f"➡️  Importing {level} ({len(features)} features) from {path}")
         clear_table(conn, level)
         upsert_admin_table(conn, level, features)
+        build_simplified_tiers(conn, level)
         print(f"✅ Imported {level}")
         completed.append(level)
 
@@ -178,5 +198,17 @@ def import_all():
     print(f"\nDone. Imported: {', '.join(completed) if completed else 'none'}")
 
 
+def build_all_tiers():
+    conn = get_conn()
+    ensure_tables(conn)
+    for level in FILES:
+        build_simplified_tiers(conn, level)
+        print(f"✅ Simplified tiers built for {level}")
+    conn.close()
+
+
 if __name__ == "__main__":
-    import_all()
+    if "--tiers-only" in sys.argv[1:]:
+        build_all_tiers()
+    else:
+        import_all()
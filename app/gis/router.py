@@ -1,7 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
+import math
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from app.core.database import get_db
+from app.gis.boundary_tiers import pick_tier
+from app.services.gis_grid_service import GRID_LAYERS, GRID_RESOLUTIONS, GisGridService, cell_size, mercator
+from app.supports import decode_cursor, encode_cursor
 
 router = APIRouter(prefix="/gis", tags=["GIS"])
 
@@ -15,6 +20,46 @@ KEC_TABLE = "kecamatan"
 def _tbl(name: str) -> str:
     return f"{ADMIN_SCHEMA}.{name}" if ADMIN_SCHEMA else name
 
+# total=exact runs COUNT(*); estimate reads the planner's row estimate; none skips it
+TOTAL_MODES = ("exact", "estimate", "none")
+
+
+def _keyset(after: str | None, id_column: str, where: list, params: dict) -> None:
+    """Restrict to rows after the cursor; keyset on the primary key, so every page costs the same."""
+    if after is None:
+        return
+    try:
+        params["after_id"] = UUID(str(decode_cursor(after, 1)[0]))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cursor tidak valid")
+    where.append(f"{id_column} > :after_id")
+
+
+def _total(db: Session, from_where_sql: str, params: dict, mode: str | None, after: str | None) -> int | None:
+    """Row count for the pagination block; cursor requests skip it unless asked for."""
+    mode = mode or ("none" if after else "exact")
+    if mode not in TOTAL_MODES:
+        raise HTTPException(status_code=400, detail=f"total harus salah satu dari: {', '.join(TOTAL_MODES)}")
+    if mode == "none":
+        return None
+    if mode == "estimate":
+        plan = db.execute(text(f"EXPLAIN (FORMAT JSON) SELECT 1 {from_where_sql}"), params).scalar()
+        return int(plan[0]["Plan"]["Plan Rows"])
+    return db.execute(text(f"SELECT COUNT(*) {from_where_sql}"), params).scalar() or 0
+
+
+def _paginate(rows: list, page: int, limit: int, total: int | None, after: str | None):
+    """Trim the look-ahead row and build the pagination block with `next_cursor`."""
+    next_cursor = encode_cursor([str(rows[limit - 1].id)]) if len(rows) > limit else None
+    return rows[:limit], {
+        "page": None if after else page,
+        "limit": limit,
+        "total": total,
+        "pages": (total + limit - 1) // limit if total is not None else None,
+        "next_cursor": next_cursor,
+    }
+
+
 def _mv_exists(db: Session, name: str) -> bool:
     """Check if a materialized view or table exists by regclass lookup."""
     try:
@@ -24,15 +69,50 @@ def _mv_exists(db: Session, name: str) -> bool:
         return False
 
 
+def _has_column(db: Session, table: str, column: str) -> bool:
+    """Check if a boundary table has a column (simplified tiers may not be built yet)."""
+    try:
+        exists = db.execute(
+            text(
+                "SELECT EXISTS (SELECT 1 FROM pg_attribute"
+                " WHERE attrelid = to_regclass(:table) AND attname = :column AND NOT attisdropped)"
+            ),
+            {"table": table, "column": column},
+        ).scalar()
+        return bool(exists)
+    except Exception:
+        return False
+
+
+def _boundary_geojson(db: Session, table: str, alias: str, zoom: int | None, tolerance: float | None) -> str:
+    """SQL for the GeoJSON geometry of a boundary row at the tier for `zoom`/`tolerance`."""
+    try:
+        tier = pick_tier(zoom, tolerance)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if tier is None:
+        return f"ST_AsGeoJSON({alias}.geom)::jsonb"
+    column, digits = tier
+    if column == "geom" or not _has_column(db, table, column):
+        return f"ST_AsGeoJSON({alias}.geom, {digits})::jsonb"
+    return f"ST_AsGeoJSON(COALESCE({alias}.{column}, {alias}.geom), {digits})::jsonb"
+
+
 @router.get("/santri-points")
 def santri_points(
     kategori: str | None = None,
     pesantren_id: str | None = None,
     page: int = 1,
     limit: int = 1000,
+    after: str | None = None,
+    total: str | None = None,
     db: Session = Depends(get_db),
 ):
-    """Get santri locations with score and category info (paginated)."""
+    """Get santri locations with score and category info (paginated).
+
+    Page with `after=<pagination.next_cursor>` (keyset on id, constant cost per
+    page) or the legacy `page`; `total` is exact, estimate or none.
+    """
     if page < 1:
         page = 1
     if limit < 1 or limit > 5000:
@@ -49,12 +129,10 @@ def santri_points(
         where.append("sm.pesantren_id = :pesantren_id")
         params["pesantren_id"] = pesantren_id
 
-    offset = (page - 1) * limit
+    count = _total(db, f"FROM santri_map sm WHERE {' AND '.join(where)}", params, total, after)
+    _keyset(after, "sm.id", where, params)
+    offset = 0 if after else (page - 1) * limit
     where_sql = " AND ".join(where)
-    
-    # Get total count (cached query, lightweight)
-    count_sql = f"SELECT COUNT(*) FROM santri_map sm WHERE {where_sql}"
-    total = db.execute(text(count_sql), params).scalar()
 
     # Get paginated data (optimized - no JOIN, no ST_AsGeoJSON aggregation)
     sql = f"""
@@ -73,10 +151,10 @@ def santri_points(
     LIMIT :limit OFFSET :offset
     """
     
-    params['limit'] = limit
+    params['limit'] = limit + 1
     params['offset'] = offset
     
-    rows = db.execute(text(sql), params).fetchall()
+    rows, pagination = _paginate(db.execute(text(sql), params).fetchall(), page, limit, count, after)
 
     # Format GeoJSON di Python (lebih efisien)
     features = [
@@ -101,12 +179,7 @@ def santri_points(
     return {
         "type": "FeatureCollection",
         "features": features,
-        "pagination": {
-            "page": page,
-            "limit": limit,
-            "total": total or 0,
-            "pages": ((total or 0) + limit - 1) // limit
-        }
+        "pagination": pagination
     }
 
     try:
@@ -121,9 +194,11 @@ def pesantren_points(
     kabupaten: str | None = None,
     page: int = 1,
     limit: int = 1000,
+    after: str | None = None,
+    total: str | None = None,
     db: Session = Depends(get_db),
 ):
-    """Get pesantren locations with details (paginated)."""
+    """Get pesantren locations with details (paginated; `after` cursor as in /santri-points)."""
     if page < 1:
         page = 1
     if limit < 1 or limit > 5000:
@@ -141,12 +216,10 @@ def pesantren_points(
         params["kabupaten"] = kabupaten
     
 
-    offset = (page - 1) * limit
+    count = _total(db, f"FROM pesantren_map pm WHERE {' AND '.join(where)}", params, total, after)
+    _keyset(after, "pm.id", where, params)
+    offset = 0 if after else (page - 1) * limit
     where_sql = " AND ".join(where)
-    
-    # Get total count
-    count_sql = f"SELECT COUNT(*) FROM pesantren_map pm WHERE {where_sql}"
-    total = db.execute(text(count_sql), params).scalar()
 
     # Get paginated data (optimized)
     sql = f"""
@@ -168,10 +241,10 @@ def pesantren_points(
     LIMIT :limit OFFSET :offset
     """
     
-    params['limit'] = limit
+    params['limit'] = limit + 1
     params['offset'] = offset
 
-    rows = db.execute(text(sql), params).fetchall()
+    rows, pagination = _paginate(db.execute(text(sql), params).fetchall(), page, limit, count, after)
 
     # Format GeoJSON di Python
     features = [
@@ -199,33 +272,31 @@ def pesantren_points(
     return {
         "type": "FeatureCollection",
         "features": features,
-        "pagination": {
-            "page": page,
-            "limit": limit,
-            "total": total or 0,
-            "pages": ((total or 0) + limit - 1) // limit
-        }
+        "pagination": pagination
     }
 
 @router.get("/pesantren-heatmap")
 def pesantren_heatmap(
     page: int = 1,
     limit: int = 5000,
+    after: str | None = None,
+    total: str | None = None,
     db: Session = Depends(get_db)
 ):
-    """Get pesantren heatmap with score-based intensity (paginated)."""
+    """Get pesantren heatmap with score-based intensity (paginated; `after` cursor as in /santri-points)."""
     if page < 1:
         page = 1
     if limit < 1 or limit > 10000:
         limit = 5000
     
-    offset = (page - 1) * limit
+    where = ["lokasi IS NOT NULL"]
+    params: dict = {}
+    count = _total(db, "FROM pesantren_map WHERE lokasi IS NOT NULL", params, total, after)
+    _keyset(after, "id", where, params)
+    offset = 0 if after else (page - 1) * limit
     
     # Lightweight query - no aggregation
-    count_sql = "SELECT COUNT(*) FROM pesantren_map WHERE lokasi IS NOT NULL"
-    total = db.execute(text(count_sql)).scalar()
-    
-    sql = """
+    sql = f"""
     SELECT
       ST_Y(lokasi) AS lat,
       ST_X(lokasi) AS lng,
@@ -234,12 +305,13 @@ def pesantren_heatmap(
       skor_terakhir AS skor,
       id
     FROM pesantren_map
-    WHERE lokasi IS NOT NULL
+    WHERE {" AND ".join(where)}
     ORDER BY id
     LIMIT :limit OFFSET :offset
     """
     
-    rows = db.execute(text(sql), {"limit": limit, "offset": offset}).fetchall()
+    params.update(limit=limit + 1, offset=offset)
+    rows, pagination = _paginate(db.execute(text(sql), params).fetchall(), page, limit, count, after)
 
     return {
         "data": [
@@ -253,12 +325,7 @@ def pesantren_heatmap(
             }
             for r in rows
         ],
-        "pagination": {
-            "page": page,
-            "limit": limit,
-            "total": total or 0,
-            "pages": ((total or 0) + limit - 1) // limit
-        }
+        "pagination": pagination
     }
 
 @router.get("/heatmap")
@@ -266,9 +333,11 @@ def heatmap(
     kategori: str | None = None,
     page: int = 1,
     limit: int = 5000,
+    after: str | None = None,
+    total: str | None = None,
     db: Session = Depends(get_db),
 ):
-    """Get santri heatmap with score-based intensity (paginated)."""
+    """Get santri heatmap with score-based intensity (paginated; `after` cursor as in /santri-points)."""
     if page < 1:
         page = 1
     if limit < 1 or limit > 10000:
@@ -281,12 +350,10 @@ def heatmap(
         where.append("sm.kategori_kemiskinan = :kategori")
         params["kategori"] = kategori
 
-    offset = (page - 1) * limit
+    count = _total(db, f"FROM santri_map sm WHERE {' AND '.join(where)}", params, total, after)
+    _keyset(after, "sm.id", where, params)
+    offset = 0 if after else (page - 1) * limit
     where_sql = " AND ".join(where)
-    
-    # Count query with alias
-    count_sql = f"SELECT COUNT(*) FROM santri_map sm WHERE {where_sql}"
-    total = db.execute(text(count_sql), params).scalar()
 
     sql = f"""
     SELECT
@@ -302,10 +369,10 @@ def heatmap(
     LIMIT :limit OFFSET :offset
     """
     
-    params['limit'] = limit
+    params['limit'] = limit + 1
     params['offset'] = offset
     
-    rows = db.execute(text(sql), params).fetchall()
+    rows, pagination = _paginate(db.execute(text(sql), params).fetchall(), page, limit, count, after)
 
     return {
         "data": [
@@ -319,12 +386,7 @@ def heatmap(
             }
             for r in rows
         ],
-        "pagination": {
-            "page": page,
-            "limit": limit,
-            "total": total or 0,
-            "pages": ((total or 0) + limit - 1) // limit
-        }
+        "pagination": pagination
     }
 
 
@@ -332,11 +394,14 @@ def heatmap(
 def choropleth_santri_kabupaten(
     provinsi: str | None = None,
     kategori_kemiskinan: str | None = None,
+    zoom: int | None = None,
+    tolerance: float | None = None,
     db: Session = Depends(get_db),
 ):
     """
     Choropleth map data untuk santri tingkat kabupaten.
     Requires admin boundary table to be loaded.
+    `zoom` or `tolerance` selects a simplified geometry tier (see /boundaries/*).
     """
     # Check if boundary table exists
     try:
@@ -346,6 +411,7 @@ def choropleth_santri_kabupaten(
             status_code=501,
             detail=f"Admin boundary table '{_tbl(KAB_TABLE)}' not found. Please import Indonesian admin boundaries (e.g., from BPS or GADM) to enable choropleth maps."
         )
+    geometry = _boundary_geojson(db, _tbl(KAB_TABLE), "k", zoom, tolerance)
     
     where_clauses = ["k.geom IS NOT NULL"]
     params = {}
@@ -372,7 +438,7 @@ def choropleth_santri_kabupaten(
                 jsonb_agg(
                     jsonb_build_object(
                         'type', 'Feature',
-                        'geometry', ST_AsGeoJSON(k.geom)::jsonb,
+                        'geometry', {geometry},
                         'properties', jsonb_build_object(
                             'kabupaten', k.name_2,
                             'provinsi', k.name_1,
@@ -424,7 +490,7 @@ def choropleth_santri_kabupaten(
                 jsonb_agg(
                     jsonb_build_object(
                         'type', 'Feature',
-                        'geometry', ST_AsGeoJSON(k.geom)::jsonb,
+                        'geometry', {geometry},
                         'properties', jsonb_build_object(
                             'kabupaten', k.name_2,
                             'provinsi', k.name_1,
@@ -464,11 +530,14 @@ def choropleth_santri_kabupaten(
 def choropleth_pesantren_kabupaten(
     provinsi: str | None = None,
     kategori_kelayakan: str | None = None,
+    zoom: int | None = None,
+    tolerance: float | None = None,
     db: Session = Depends(get_db),
 ):
     """
     Choropleth map data untuk pesantren tingkat kabupaten.
     Requires admin boundary table to be loaded.
+    `zoom` or `tolerance` selects a simplified geometry tier (see /boundaries/*).
     """
     # Check if boundary table exists
     try:
@@ -478,6 +547,7 @@ def choropleth_pesantren_kabupaten(
             status_code=501,
             detail=f"Admin boundary table '{_tbl(KAB_TABLE)}' not found. Please import Indonesian admin boundaries (e.g., from BPS or GADM) to enable choropleth maps."
         )
+    geometry = _boundary_geojson(db, _tbl(KAB_TABLE), "k", zoom, tolerance)
     
     where_clauses = ["k.geom IS NOT NULL"]
     params = {}
@@ -504,7 +574,7 @@ def choropleth_pesantren_kabupaten(
                 jsonb_agg(
                     jsonb_build_object(
                         'type', 'Feature',
-                        'geometry', ST_AsGeoJSON(k.geom)::jsonb,
+                        'geometry', {geometry},
                         'properties', jsonb_build_object(
                             'kabupaten', k.name_2,
                             'provinsi', k.name_1,
@@ -558,7 +628,7 @@ def choropleth_pesantren_kabupaten(
                 jsonb_agg(
                     jsonb_build_object(
                         'type', 'Feature',
-                        'geometry', ST_AsGeoJSON(k.geom)::jsonb,
+                        'geometry', {geometry},
                         'properties', jsonb_build_object(
                             'kabupaten', k.name_2,
                             'provinsi', k.name_1,
@@ -589,6 +659,12 @@ def choropleth_pesantren_kabupaten(
         WHERE {where_sql};
         """
 
+    try:
+        return db.execute(text(sql), params).scalar()
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"Choropleth query failed: {exc}")
+
+
 @router.post("/choropleth/refresh")
 def refresh_choropleth_views(db: Session = Depends(get_db)):
     """Refresh materialized views if available."""
@@ -603,20 +679,22 @@ def refresh_choropleth_views(db: Session = Depends(get_db)):
         return {"refreshed": refreshed}
     except Exception as exc:
         raise HTTPException(status_code=500, detail=f"Refresh failed: {exc}")
-    
-    try:
-        return db.execute(text(sql), params).scalar()
-    except Exception as exc:
-        raise HTTPException(status_code=500, detail=f"Choropleth query failed: {exc}")
 
 
 # --- Admin boundaries preview endpoints ---
 @router.get("/boundaries/provinsi")
 def boundaries_provinsi(
     provinsi: str | None = None,
+    zoom: int | None = None,
+    tolerance: float | None = None,
     db: Session = Depends(get_db),
 ):
-    """Return provinsi boundaries as GeoJSON FeatureCollection."""
+    """Return provinsi boundaries as GeoJSON FeatureCollection.
+
+    `zoom` (0-22) or `tolerance` (degrees) selects a precomputed simplified tier
+    with trimmed coordinate precision; without either the full geometry is returned.
+    """
+    geometry = _boundary_geojson(db, _tbl(PROV_TABLE), "p", zoom, tolerance)
     where = ["p.geom IS NOT NULL"]
     params: dict[str, str] = {}
     if provinsi:
@@ -631,7 +709,7 @@ def boundaries_provinsi(
             jsonb_agg(
                 jsonb_build_object(
                     'type','Feature',
-                    'geometry', ST_AsGeoJSON(p.geom)::jsonb,
+                    'geometry', {geometry},
                     'properties', jsonb_build_object(
                         'provinsi', p.name_1
                     )
@@ -653,9 +731,12 @@ def boundaries_provinsi(
 def boundaries_kabupaten(
     provinsi: str | None = None,
     kabupaten: str | None = None,
+    zoom: int | None = None,
+    tolerance: float | None = None,
     db: Session = Depends(get_db),
 ):
-    """Return kabupaten boundaries as GeoJSON FeatureCollection (optional filters)."""
+    """Return kabupaten boundaries as GeoJSON FeatureCollection (optional filters; tiers as /boundaries/provinsi)."""
+    geometry = _boundary_geojson(db, _tbl(KAB_TABLE), "k", zoom, tolerance)
     where = ["k.geom IS NOT NULL"]
     params: dict[str, str] = {}
     if provinsi:
@@ -673,7 +754,7 @@ def boundaries_kabupaten(
             jsonb_agg(
                 jsonb_build_object(
                     'type','Feature',
-                    'geometry', ST_AsGeoJSON(k.geom)::jsonb,
+                    'geometry', {geometry},
                     'properties', jsonb_build_object(
                         'provinsi', k.name_1,
                         'kabupaten', k.name_2
@@ -697,9 +778,12 @@ def boundaries_kecamatan(
     provinsi: str | None = None,
     kabupaten: str | None = None,
     kecamatan: str | None = None,
+    zoom: int | None = None,
+    tolerance: float | None = None,
     db: Session = Depends(get_db),
 ):
-    """Return kecamatan boundaries as GeoJSON FeatureCollection (optional filters)."""
+    """Return kecamatan boundaries as GeoJSON FeatureCollection (optional filters; tiers as /boundaries/provinsi)."""
+    geometry = _boundary_geojson(db, _tbl(KEC_TABLE), "c", zoom, tolerance)
     where = ["c.geom IS NOT NULL"]
     params: dict[str, str] = {}
     if provinsi:
@@ -720,7 +804,7 @@ def boundaries_kecamatan(
             jsonb_agg(
                 jsonb_build_object(
                     'type','Feature',
-                    'geometry', ST_AsGeoJSON(c.geom)::jsonb,
+                    'geometry', {geometry},
                     'properties', jsonb_build_object(
                         'provinsi', c.name_1,
                         'kabupaten', c.name_2,
@@ -806,3 +890,282 @@ def choropleth_stats(db: Session = Depends(get_db)):
         return result if result else {}
     except Exception as exc:
         raise HTTPException(status_code=500, detail=f"Stats query failed: {exc}")
+
+
+# Grid clustering: cells of CLUSTER_CELL_PX screen pixels at the requested zoom, in EPSG:3857
+CLUSTER_CELL_PX = 60
+# Cells a bbox may span at the requested zoom (a 4K screen at 20px cells is ~20k)
+MAX_CLUSTER_CELLS = 25000
+
+
+@router.get("/clusters")
+def santri_clusters(
+    min_lon: float,
+    min_lat: float,
+    max_lon: float,
+    max_lat: float,
+    zoom: int,
+    kategori: str | None = None,
+    pesantren_id: str | None = None,
+    cell_px: int = CLUSTER_CELL_PX,
+    db: Session = Depends(get_db),
+):
+    """Santri clustered on a screen-space grid for the bbox at `zoom` (GeoJSON).
+
+    Points are snapped to square EPSG:3857 cells of `cell_px` pixels at this zoom
+    and aggregated in one GROUP BY, so the payload grows with the viewport size, not
+    with the number of santri. Each cluster has its count, centroid, average
+    skor_terakhir and counts per kategori_kemiskinan; single-point clusters also
+    carry their santri_id.
+    """
+    if not 0 <= zoom <= MVT_MAX_ZOOM:
+        raise HTTPException(status_code=400, detail=f"zoom harus di antara 0 dan {MVT_MAX_ZOOM}")
+    if not 20 <= cell_px <= 256:
+        raise HTTPException(status_code=400, detail="cell_px harus di antara 20 dan 256")
+    if min_lon >= max_lon or min_lat >= max_lat:
+        raise HTTPException(status_code=400, detail="Bounding box tidak valid")
+
+    cell = cell_size(zoom, cell_px)
+    x0, y0 = mercator(min_lon, min_lat)
+    x1, y1 = mercator(max_lon, max_lat)
+    cells = (math.floor(x1 / cell) - math.floor(x0 / cell) + 1) * (math.floor(y1 / cell) - math.floor(y0 / cell) + 1)
+    if cells > MAX_CLUSTER_CELLS:
+        raise HTTPException(status_code=400, detail="Bounding box terlalu besar untuk zoom ini")
+
+    where = [
+        "sm.lokasi IS NOT NULL",
+        "sm.lokasi && ST_MakeEnvelope(:min_lon, :min_lat, :max_lon, :max_lat, 4326)",
+    ]
+    params: dict = {
+        "min_lon": min_lon, "min_lat": min_lat, "max_lon": max_lon, "max_lat": max_lat,
+        "cell": cell,
+    }
+    if kategori:
+        where.append("sm.kategori_kemiskinan = :kategori")
+        params["kategori"] = kategori
+    if pesantren_id:
+        where.append("sm.pesantren_id = :pesantren_id")
+        params["pesantren_id"] = pesantren_id
+
+    # One row per (cell, kategori); merged per cell below
+    sql = f"""
+    SELECT
+        floor(ST_X(m.geom) / :cell)::bigint AS cx,
+        floor(ST_Y(m.geom) / :cell)::bigint AS cy,
+        m.kategori_kemiskinan AS kategori,
+        COUNT(*) AS jumlah,
+        SUM(ST_X(m.lokasi)) AS sum_lng,
+        SUM(ST_Y(m.lokasi)) AS sum_lat,
+        SUM(m.skor_terakhir) AS sum_skor,
+        MIN(m.santri_id::text) AS santri_id
+    FROM (
+        SELECT sm.lokasi, ST_Transform(sm.lokasi, 3857) AS geom, sm.kategori_kemiskinan, sm.skor_terakhir, sm.santri_id
+        FROM santri_map sm
+        WHERE {" AND ".join(where)}
+    ) m
+    GROUP BY 1, 2, 3
+    """
+    try:
+        rows = db.execute(text(sql), params).fetchall()
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"Cluster query failed: {exc}")
+
+    clusters: dict = {}
+    for row in rows:
+        c = clusters.setdefault((row.cx, row.cy), {"jumlah": 0, "lng": 0.0, "lat": 0.0, "skor": 0, "kategori": {}, "santri_id": None})
+        c["jumlah"] += row.jumlah
+        c["lng"] += row.sum_lng
+        c["lat"] += row.sum_lat
+        c["skor"] += row.sum_skor or 0
+        c["kategori"][row.kategori] = row.jumlah
+        c["santri_id"] = row.santri_id
+
+    features = [
+        {
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [c["lng"] / c["jumlah"], c["lat"] / c["jumlah"]]},
+            "properties": {
+                "cluster": c["jumlah"] > 1,
+                "jumlah": c["jumlah"],
+                "rata_skor": round(c["skor"] / c["jumlah"], 2),
+                "kategori": c["kategori"],
+                "santri_id": c["santri_id"] if c["jumlah"] == 1 else None,
+            },
+        }
+        for c in clusters.values()
+    ]
+    return {
+        "type": "FeatureCollection",
+        "features": features,
+        "zoom": zoom,
+        "cell_size_m": round(cell, 2),
+        "total": sum(c["jumlah"] for c in clusters.values()),
+    }
+
+
+@router.get("/grid/{layer}")
+def grid_density(
+    layer: str,
+    min_lon: float,
+    min_lat: float,
+    max_lon: float,
+    max_lat: float,
+    zoom: int,
+    kategori: str | None = None,
+    db: Session = Depends(get_db),
+):
+    """Precomputed density grid of santri or pesantren for the bbox.
+
+    Reads `gis_grid_cell` at the finest resolution not finer than `zoom`
+    (one of GRID_RESOLUTIONS) by primary key, instead of paging raw points as
+    /heatmap does. Each cell has its centre, count, average score and counts per
+    kategori; `kategori` restricts the counts to one category.
+    """
+    if layer not in GRID_LAYERS:
+        raise HTTPException(status_code=404, detail=f"Layer tidak dikenal: {layer}")
+    try:
+        return GisGridService(db).cells(layer, zoom, min_lon, min_lat, max_lon, max_lat, kategori=kategori)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"Grid query failed: {exc}")
+
+
+@router.post("/grid/rebuild")
+def rebuild_grid(layer: str | None = None, db: Session = Depends(get_db)):
+    """Recount the density grid from santri_map / pesantren_map (both layers by default)."""
+    if layer is not None and layer not in GRID_LAYERS:
+        raise HTTPException(status_code=404, detail=f"Layer tidak dikenal: {layer}")
+    try:
+        GisGridService(db).rebuild(layer)
+        db.commit()
+        return {"rebuilt": [layer] if layer else list(GRID_LAYERS), "resolusi": list(GRID_RESOLUTIONS)}
+    except Exception as exc:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Rebuild failed: {exc}")
+
+
+# Vector tiles: 4096-unit extent with a 64-unit buffer so symbols at tile edges are not clipped
+MVT_EXTENT = 4096
+MVT_BUFFER = 64
+MVT_MAX_ZOOM = 22
+# Upper bound on points encoded into one tile (low zooms over the whole population)
+MVT_MAX_FEATURES = 50000
+
+# layer -> (table alias + FROM, attribute columns, key column the feature cap is ordered by)
+TILE_LAYERS = {
+    "santri": (
+        "santri_map sm",
+        "sm.santri_id::text AS santri_id, sm.nama, sm.skor_terakhir AS skor, "
+        "sm.kategori_kemiskinan AS kategori, sm.pesantren_id::text AS pesantren_id",
+        "santri_id",
+    ),
+    "pesantren": (
+        "pesantren_map pm",
+        "pm.pesantren_id::text AS pesantren_id, pm.nama, pm.nsp, pm.skor_terakhir AS skor, "
+        "pm.kategori_kelayakan AS kategori, pm.jumlah_santri, pm.provinsi, pm.kabupaten",
+        "pesantren_id",
+    ),
+}
+
+
+@router.get("/tiles/{layer}/{z}/{x}/{y}.mvt")
+def vector_tile(
+    layer: str,
+    z: int,
+    x: int,
+    y: int,
+    kategori: str | None = None,
+    pesantren_id: str | None = None,
+    provinsi: str | None = None,
+    kabupaten: str | None = None,
+    db: Session = Depends(get_db),
+):
+    """Mapbox Vector Tile of santri or pesantren points (layer name = `layer`).
+
+    Points are selected with the GIST index on `lokasi` (tile envelope plus buffer,
+    in EPSG:4326) and encoded with ST_AsMVTGeom/ST_AsMVT. Filters match
+    /gis/santri-points and /gis/pesantren-points: santri take kategori,
+    pesantren_id and provinsi; pesantren take kategori, provinsi and kabupaten.
+
+    At most MVT_MAX_FEATURES points are encoded, the lowest ids first so a
+    capped tile is stable between requests; the `X-Tile-Truncated` header says
+    whether points were left out.
+    """
+    if layer not in TILE_LAYERS:
+        raise HTTPException(status_code=404, detail=f"Layer tidak dikenal: {layer}. Pilihan: {', '.join(TILE_LAYERS)}")
+    if not 0 <= z <= MVT_MAX_ZOOM or not 0 <= x < 2 ** z or not 0 <= y < 2 ** z:
+        raise HTTPException(status_code=400, detail="Koordinat tile tidak valid")
+
+    source, columns, key = TILE_LAYERS[layer]
+    alias = source.split()[-1]
+    where = [f"{alias}.lokasi && ST_Transform(bounds.buffered, 4326)"]
+    params: dict = {
+        "z": z, "x": x, "y": y,
+        "layer": layer,
+        "extent": MVT_EXTENT,
+        "buffer": MVT_BUFFER,
+        "margin": MVT_BUFFER / MVT_EXTENT,
+        "max_features": MVT_MAX_FEATURES,
+    }
+    if layer == "santri":
+        if kategori:
+            where.append("sm.kategori_kemiskinan = :kategori")
+            params["kategori"] = kategori
+        if pesantren_id:
+            where.append("sm.pesantren_id = :pesantren_id")
+            params["pesantren_id"] = pesantren_id
+        if provinsi:
+            # santri_map has no region columns; provinsi comes from santri_pribadi
+            where.append("EXISTS (SELECT 1 FROM santri_pribadi sp WHERE sp.id = sm.santri_id AND sp.provinsi = :provinsi)")
+            params["provinsi"] = provinsi
+    else:
+        if kategori:
+            where.append("pm.kategori_kelayakan = :kategori")
+            params["kategori"] = kategori
+        if provinsi:
+            where.append("pm.provinsi = :provinsi")
+            params["provinsi"] = provinsi
+        if kabupaten:
+            where.append("pm.kabupaten = :kabupaten")
+            params["kabupaten"] = kabupaten
+
+    sql = f"""
+    WITH bounds AS (
+        SELECT
+            ST_TileEnvelope(:z, :x, :y) AS envelope,
+            ST_TileEnvelope(:z, :x, :y, margin => :margin) AS buffered
+    ),
+    -- One key past the cap tells whether the tile is truncated
+    candidates AS (
+        SELECT {alias}.{key} AS tile_key
+        FROM {source}, bounds
+        WHERE {" AND ".join(where)}
+        ORDER BY {alias}.{key}
+        LIMIT :max_features + 1
+    ),
+    mvtgeom AS (
+        SELECT
+            ST_AsMVTGeom(ST_Transform({alias}.lokasi, 3857), bounds.envelope, :extent, :buffer, true) AS geom,
+            {columns}
+        FROM (SELECT tile_key FROM candidates ORDER BY tile_key LIMIT :max_features) c
+        JOIN {source} ON {alias}.{key} = c.tile_key
+        CROSS JOIN bounds
+    )
+    SELECT
+        (SELECT ST_AsMVT(mvtgeom.*, :layer, :extent, 'geom') FROM mvtgeom) AS tile,
+        (SELECT count(*) FROM candidates) > :max_features AS truncated
+    """
+
+    try:
+        row = db.execute(text(sql), params).one()
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"Tile query failed: {exc}")
+    return Response(
+        content=bytes(row.tile or b""),
+        media_type="application/vnd.mapbox-vector-tile",
+        headers={
+            "Cache-Control": "public, max-age=60",
+            "X-Tile-Truncated": "true" if row.truncated else "false",
+        },
+    )
@@ -29,6 +29,12 @@ from app.models.foto_santri import FotoSantri  # noqa: F401
 from app.models.foto_asset import FotoAsset  # noqa: F401
 from app.models.santri_map import SantriMap  # noqa: F401
 from app.models.pesantren_map import PesantrenMap  # noqa: F401
+from app.models.santri_skor_dirty import SantriSkorDirty  # noqa: F401
+from app.models.santri_feature import SantriFeature  # noqa: F401
+from app.models.santri_skor_histogram import SantriSkorHistogram  # noqa: F401
+from app.models.data_version import DataVersion  # noqa: F401
+from app.models.gis_grid_cell import GisGridCell  # noqa: F401
+from app.models.scoring_job import ScoringJob, ScoringJobItem  # noqa: F401
 from app.routes.santri_orangtua_routes import router as santri_orangtua_router
 from app.routes.santri_rumah_routes import router as santri_rumah_router
 from app.routes.santri_asset_routes import router as santri_asset_router
@@ -45,6 +51,9 @@ from app.routes.santri_map_routes import router as santri_map_router
 from app.routes.pesantren_map_routes import router as pesantren_map_router
 from app.routes.nl2sql_routes import router as nl2sql_router
 from app.routes.gemini_routes import router as gemini_router
+from app.routes.scoring_job_routes import router as scoring_job_router
+from app.routes.analytics_routes import router as analytics_router
+from app.services.rescore_service import start_background_worker, stop_background_worker
 from fastapi.middleware.cors import CORSMiddleware
 
 
@@ -94,9 +103,23 @@ app.include_router(santri_map_router)
 app.include_router(pesantren_map_router)
 app.include_router(pesantren_pendidikan_router)
 app.include_router(pesantren_score_router)
+app.include_router(scoring_job_router)
+app.include_router(analytics_router)
 app.include_router(nl2sql_router)
 app.include_router(gemini_router)
 
+@app.on_event("startup")
+def start_rescore_worker():
+    # Incremental re-scoring of santri marked dirty by data-entry edits
+    if settings.rescore_worker_enabled:
+        start_background_worker()
+
+
+@app.on_event("shutdown")
+def stop_rescore_worker():
+    stop_background_worker()
+
+
 @app.get("/")
 def root():
     return {"status": "FastAPI Santri Backend Ready"}
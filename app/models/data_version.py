@@ -0,0 +1,16 @@
+"""Model for per-dataset change counters."""
+from sqlalchemy import BigInteger, Column, DateTime, String, text
+from app.core.database import Base
+
+
+class DataVersion(Base):
+    """Version counter per dataset (`santri_skor`, `santri_bansos`, `santri_pribadi`).
+
+    Bumped at commit of every transaction that writes the dataset, so cached
+    analytics can tell whether their inputs changed with a single indexed read.
+    """
+    __tablename__ = "data_version"
+
+    name = Column(String(50), primary_key=True)
+    version = Column(BigInteger, nullable=False, server_default=text("0"))
+    updated_at = Column(DateTime, nullable=False, server_default=text("now()"))
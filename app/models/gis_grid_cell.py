@@ -0,0 +1,23 @@
+"""Model for pre-aggregated GIS grid cells."""
+from sqlalchemy import BigInteger, Column, Integer, SmallInteger, String, text
+from app.core.database import Base
+
+
+class GisGridCell(Base):
+    """Number of points and their score sum per square grid cell and category.
+
+    `layer` is `santri` (santri_map, kategori_kemiskinan) or `pesantren`
+    (pesantren_map, kategori_kelayakan). `resolusi` is the zoom level the grid is
+    sized for; cells are `GRID_CELL_PX` screen pixels square at that zoom in
+    EPSG:3857, and (`cx`, `cy`) is the cell index. Maintained by deltas whenever
+    map rows are written (see `app.services.gis_grid_service`).
+    """
+    __tablename__ = "gis_grid_cell"
+
+    layer = Column(String(20), primary_key=True)
+    resolusi = Column(SmallInteger, primary_key=True)
+    cx = Column(Integer, primary_key=True)
+    cy = Column(Integer, primary_key=True)
+    kategori = Column(String(50), primary_key=True)
+    jumlah = Column(Integer, nullable=False, server_default=text("0"))
+    total_skor = Column(BigInteger, nullable=False, server_default=text("0"))
@@ -1,7 +1,7 @@
 """Model for pesantren skor (scoring results)."""
 
 from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, func
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from app.models.base import UUIDBase
 
@@ -28,6 +28,7 @@ class PesantrenSkor(UUIDBase):
     # Metadata
     metode = Column(String(50), nullable=False)
     version = Column(String(20), nullable=False)
+    breakdown = Column(JSONB, nullable=True)  # Stored breakdown, served on read
     calculated_at = Column(DateTime, server_default=func.now())
     
     # Relationship
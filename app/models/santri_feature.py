@@ -0,0 +1,121 @@
+"""Model for the wide per-santri feature table."""
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, Integer, String, text
+from sqlalchemy.dialects.postgresql import UUID
+from geoalchemy2 import Geometry
+from app.core.database import Base
+
+
+# skor_total DESC, then the dimension scores DESC as tie-breakers, then santri_id DESC
+_RANK_ORDER = [
+    text(f"{col} DESC")
+    for col in ("skor_total", "skor_ekonomi", "skor_rumah", "skor_aset", "skor_pembiayaan",
+                "skor_kesehatan", "skor_bansos", "santri_id")
+]
+
+
+class SantriFeature(Base):
+    """One row per santri with its scoring inputs, derived fields, latest score and region.
+
+    Input columns hold the values scoring sees (see `app.services.santri_feature_service`),
+    so analytics and NL2SQL can read a single row instead of joining santri_pribadi
+    with its six sub-tables. Refreshed for changed santri by the re-scoring worker;
+    the score columns are kept in sync by the score writers.
+    """
+    __tablename__ = "santri_feature"
+
+    santri_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("santri_pribadi.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+
+    # santri_pribadi
+    pesantren_id = Column(UUID(as_uuid=True))
+    nama = Column(String(150))
+    jenis_kelamin = Column(String(1))
+    provinsi = Column(String(100))
+    kabupaten = Column(String(100))
+    kecamatan = Column(String(100))
+    desa = Column(String(100))
+    lokasi = Column(Geometry("POINT", srid=4326))
+
+    # santri_orangtua
+    pendapatan_bulanan = Column(Integer)
+    pekerjaan = Column(String(100))
+    pendidikan = Column(String(50))
+    status_pekerjaan = Column(String(20))
+
+    # santri_rumah
+    status_rumah = Column(String(30))
+    jenis_lantai = Column(String(30))
+    jenis_dinding = Column(String(30))
+    jenis_atap = Column(String(30))
+    akses_air_bersih = Column(String(30))
+    daya_listrik_va = Column(String(30))
+    sanitasi_layak = Column(Boolean)
+
+    # santri_asset: total `jumlah` per jenis_aset
+    aset_motor = Column(Integer, nullable=False, server_default=text("0"))
+    aset_mobil = Column(Integer, nullable=False, server_default=text("0"))
+    aset_sepeda = Column(Integer, nullable=False, server_default=text("0"))
+    aset_hp = Column(Integer, nullable=False, server_default=text("0"))
+    aset_laptop = Column(Integer, nullable=False, server_default=text("0"))
+    aset_lahan = Column(Integer, nullable=False, server_default=text("0"))
+    aset_ternak = Column(Integer, nullable=False, server_default=text("0"))
+    aset_alat_kerja = Column(Integer, nullable=False, server_default=text("0"))
+    aset_lainnya = Column(Integer, nullable=False, server_default=text("0"))
+
+    # santri_pembiayaan
+    sumber_biaya = Column(String(30))
+    status_pembayaran = Column(String(30))
+    tunggakan_bulan = Column(Integer)
+
+    # santri_kesehatan
+    status_gizi = Column(String(30))
+    riwayat_penyakit = Column(String)
+    kebutuhan_khusus = Column(String)
+    penyakit_kronis = Column(Boolean)
+
+    # santri_bansos
+    pkh = Column(Boolean)
+    bpnt = Column(Boolean)
+    pip = Column(Boolean)
+    kis_pbi = Column(Boolean)
+    blt_desa = Column(Boolean)
+    pernah_menerima_bansos = Column(Boolean)
+
+    # santri_skor (latest score; NULL until scored)
+    skor_ekonomi = Column(Integer)
+    skor_rumah = Column(Integer)
+    skor_aset = Column(Integer)
+    skor_pembiayaan = Column(Integer)
+    skor_kesehatan = Column(Integer)
+    skor_bansos = Column(Integer)
+    skor_total = Column(Integer)
+    kategori_kemiskinan = Column(String(30))
+    skor_calculated_at = Column(DateTime)
+
+    refreshed_at = Column(DateTime, nullable=False, server_default=text("now()"))
+
+    __table_args__ = (
+        Index("idx_santri_feature_region", "provinsi", "kabupaten", "kecamatan", "desa"),
+        Index("idx_santri_feature_kabupaten_kategori", "kabupaten", "kategori_kemiskinan"),
+        Index("idx_santri_feature_pesantren", "pesantren_id"),
+        Index("idx_santri_feature_skor_total", "skor_total"),
+        # Ranking order of app.services.santri_ranking_service, one index per level
+        Index(
+            "idx_santri_feature_rank_kabupaten",
+            "kabupaten", *_RANK_ORDER,
+            postgresql_where=text("skor_total IS NOT NULL"),
+        ),
+        Index(
+            "idx_santri_feature_rank_kecamatan",
+            "kabupaten", "kecamatan", *_RANK_ORDER,
+            postgresql_where=text("skor_total IS NOT NULL"),
+        ),
+        Index(
+            "idx_santri_feature_rank_pesantren",
+            "pesantren_id", *_RANK_ORDER,
+            postgresql_where=text("skor_total IS NOT NULL"),
+        ),
+    )
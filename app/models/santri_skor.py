@@ -1,5 +1,5 @@
 from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, text
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 from uuid import UUID as _UUID
 from app.models.base import UUIDBase
 
@@ -27,4 +27,10 @@ class SantriSkor(UUIDBase):
     metode = Column(String(50), nullable=False)
     version = Column(String(20), nullable=False)
 
+    # Breakdown as returned by the scoring rules, stored so reads don't recompute it
+    breakdown = Column(JSONB, nullable=True)
+    # Per-dimension hash of config + input values the breakdown was computed from;
+    # dimensions with an unchanged hash are reused on re-score
+    input_hashes = Column(JSONB, nullable=True)
+
     calculated_at = Column(DateTime, server_default=text("now()"))
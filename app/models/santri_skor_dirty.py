@@ -0,0 +1,25 @@
+"""Model for santri whose scoring inputs changed since their last score."""
+from sqlalchemy import Column, DateTime, ForeignKey, Index, text
+from sqlalchemy.dialects.postgresql import UUID
+from app.core.database import Base
+
+
+class SantriSkorDirty(Base):
+    """Queue of santri waiting to be re-scored.
+
+    One row per santri (primary key), so repeated edits coalesce into a single
+    mark. Rows are written by the sub-table services and consumed by the
+    re-scoring worker in `app.services.rescore_service`.
+    """
+    __tablename__ = "santri_skor_dirty"
+
+    santri_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("santri_pribadi.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    marked_at = Column(DateTime, nullable=False, server_default=text("now()"))
+
+    __table_args__ = (
+        Index("idx_santri_skor_dirty_marked_at", "marked_at"),
+    )
@@ -0,0 +1,28 @@
+"""Model for the pre-aggregated santri score distribution."""
+from sqlalchemy import Column, Index, Integer, String, text
+from sqlalchemy.dialects.postgresql import UUID
+from app.core.database import Base
+
+
+class SantriSkorHistogram(Base):
+    """Number of santri per exact score value, per dimension and drill-down group.
+
+    `dimensi` is `total` (skor_total) or a dimension key (`ekonomi`, `rumah`, ...).
+    Scores are integers, so one row per value keeps quantiles exact while a
+    distribution query reads O(distinct values x groups) rows, independent of the
+    population. Maintained by deltas whenever santri_feature rows are written (see
+    `app.services.score_histogram_service`); NULL regions are stored as ''.
+    """
+    __tablename__ = "santri_skor_histogram"
+
+    dimensi = Column(String(30), primary_key=True)
+    provinsi = Column(String(100), primary_key=True, server_default=text("''"))
+    kabupaten = Column(String(100), primary_key=True, server_default=text("''"))
+    pesantren_id = Column(UUID(as_uuid=True), primary_key=True)
+    skor = Column(Integer, primary_key=True)
+    jumlah = Column(Integer, nullable=False, server_default=text("0"))
+
+    __table_args__ = (
+        Index("idx_santri_skor_histogram_pesantren", "dimensi", "pesantren_id"),
+        Index("idx_santri_skor_histogram_kabupaten", "dimensi", "kabupaten"),
+    )
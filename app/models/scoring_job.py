@@ -0,0 +1,54 @@
+"""Models for asynchronous batch scoring jobs."""
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Index, text
+from sqlalchemy.dialects.postgresql import UUID
+from app.core.database import Base
+from app.models.base import UUIDBase
+
+
+class ScoringJob(UUIDBase):
+    """One batch scoring run (all santri or all pesantren).
+
+    `cursor` is the last entity id of the last committed chunk; a resumed job
+    continues after it. `heartbeat_at` is refreshed on every chunk commit so a
+    job whose process died can be told apart from one that is still running.
+    `started_at` is set by every claim and identifies the runner allowed to write.
+    """
+    __tablename__ = "scoring_job"
+
+    kind = Column(String(20), nullable=False)  # santri | pesantren
+    status = Column(String(20), nullable=False, server_default=text("'pending'"))
+    chunk_size = Column(Integer, nullable=False)
+
+    total = Column(Integer, nullable=False, server_default=text("0"))
+    processed = Column(Integer, nullable=False, server_default=text("0"))
+    failed = Column(Integer, nullable=False, server_default=text("0"))
+    # processed + failed when the current run started (ETA and throughput use this run's rate only)
+    done_at_start = Column(Integer, nullable=False, server_default=text("0"))
+    cursor = Column(UUID(as_uuid=True), nullable=True)
+    error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime, nullable=False, server_default=text("now()"))
+    started_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("idx_scoring_job_status", "status"),
+    )
+
+
+class ScoringJobItem(Base):
+    """Per-entity outcome of a scoring job, written with the chunk that scored it."""
+    __tablename__ = "scoring_job_item"
+
+    job_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("scoring_job.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    entity_id = Column(UUID(as_uuid=True), primary_key=True)
+    nama = Column(String(200), nullable=True)
+    success = Column(Boolean, nullable=False)
+    skor_total = Column(Integer, nullable=True)
+    kategori = Column(String(30), nullable=True)
+    error = Column(Text, nullable=True)
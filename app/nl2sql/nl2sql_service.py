@@ -149,6 +149,8 @@ ATURAN KETAT:
 6. **Untuk agregasi per wilayah (kabupaten/provinsi):**
    - Gunakan GROUP BY kabupaten/provinsi
    - Gunakan aggregate functions: COUNT(*), AVG(skor_total), SUM(), MAX(), MIN()
+   - Untuk santri: gunakan tabel santri_feature (wilayah, input scoring dan skor terakhir dalam satu baris, tanpa JOIN)
+     Contoh: SELECT kabupaten, COUNT(*) FILTER (WHERE NOT pernah_menerima_bansos) AS belum_bansos FROM santri_feature GROUP BY kabupaten
    - Jangan include latitude/longitude pada agregasi
 7. **PENTING: Gunakan enum values yang TEPAT (case-sensitive):**
    - kualitas_air_bersih: 'layak_minum', 'berbau', 'keruh', 'asin' (lowercase dengan underscore)
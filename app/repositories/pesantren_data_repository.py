@@ -1,6 +1,6 @@
 """Repository for fetching pesantren data across all tables."""
 
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Sequence
 from uuid import UUID
 from sqlalchemy.orm import Session
 
@@ -44,12 +44,38 @@ class PesantrenDataRepository:
         """
         Get all pesantren data for scoring.
         
-        Returns a dictionary with all tables' data.
+        Returns a dictionary with all tables' data, loaded with one joined query.
         """
-        result = {
-            "pesantren": self.get_pesantren(pesantren_id),
-            "fisik": self.get_fisik(pesantren_id),
-            "fasilitas": self.get_fasilitas(pesantren_id),
-            "pendidikan": self.get_pendidikan(pesantren_id),
+        return self.get_all_many([pesantren_id])[pesantren_id]
+
+    def get_all_many(self, pesantren_ids: Sequence[UUID]) -> Dict[UUID, Dict[str, Any]]:
+        """Load scoring data for many pesantren with a single joined query.
+
+        pondok_pesantren is outer-joined with pesantren_fisik, pesantren_fasilitas
+        and pesantren_pendidikan (one row each per pesantren). Returns a mapping of
+        pesantren_id to the same shape as `get_all`; unknown ids map to all-None rows.
+        """
+        ids = list(pesantren_ids)
+        result: Dict[UUID, Dict[str, Any]] = {
+            pid: {"pesantren": None, "fisik": None, "fasilitas": None, "pendidikan": None}
+            for pid in ids
         }
+        if not ids:
+            return result
+
+        rows = (
+            self.db.query(PondokPesantren, PesantrenFisik, PesantrenFasilitas, PesantrenPendidikan)
+            .outerjoin(PesantrenFisik, PesantrenFisik.pesantren_id == PondokPesantren.id)
+            .outerjoin(PesantrenFasilitas, PesantrenFasilitas.pesantren_id == PondokPesantren.id)
+            .outerjoin(PesantrenPendidikan, PesantrenPendidikan.pesantren_id == PondokPesantren.id)
+            .filter(PondokPesantren.id.in_(ids))
+            .all()
+        )
+        for pesantren, fisik, fasilitas, pendidikan in rows:
+            result[pesantren.id] = {
+                "pesantren": pesantren,
+                "fisik": fisik,
+                "fasilitas": fasilitas,
+                "pendidikan": pendidikan,
+            }
         return result
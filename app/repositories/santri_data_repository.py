@@ -1,6 +1,6 @@
 """Repository for aggregating santri-related data from multiple tables."""
 
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Sequence
 from uuid import UUID
 from sqlalchemy.orm import Session
 
@@ -23,19 +23,39 @@ class SantriDataRepository:
         return self.db.query(SantriPribadi).filter(SantriPribadi.id == santri_id).first()
 
     def get_rumah(self, santri_id: UUID) -> Optional[SantriRumah]:
-        return self.db.query(SantriRumah).filter(SantriRumah.santri_id == santri_id).first()
+        return (
+            self.db.query(SantriRumah)
+            .filter(SantriRumah.santri_id == santri_id)
+            .order_by(SantriRumah.id)
+            .first()
+        )
 
     def get_assets(self, santri_id: UUID) -> List[SantriAsset]:
         return self.db.query(SantriAsset).filter(SantriAsset.santri_id == santri_id).all()
 
     def get_pembiayaan(self, santri_id: UUID) -> Optional[SantriPembiayaan]:
-        return self.db.query(SantriPembiayaan).filter(SantriPembiayaan.santri_id == santri_id).first()
+        return (
+            self.db.query(SantriPembiayaan)
+            .filter(SantriPembiayaan.santri_id == santri_id)
+            .order_by(SantriPembiayaan.id)
+            .first()
+        )
 
     def get_kesehatan(self, santri_id: UUID) -> Optional[SantriKesehatan]:
-        return self.db.query(SantriKesehatan).filter(SantriKesehatan.santri_id == santri_id).first()
+        return (
+            self.db.query(SantriKesehatan)
+            .filter(SantriKesehatan.santri_id == santri_id)
+            .order_by(SantriKesehatan.id)
+            .first()
+        )
 
     def get_bansos(self, santri_id: UUID) -> Optional[SantriBansos]:
-        return self.db.query(SantriBansos).filter(SantriBansos.santri_id == santri_id).first()
+        return (
+            self.db.query(SantriBansos)
+            .filter(SantriBansos.santri_id == santri_id)
+            .order_by(SantriBansos.id)
+            .first()
+        )
 
     def get_all(self, santri_id: UUID) -> Dict[str, Any]:
         return {
@@ -47,125 +67,198 @@ class SantriDataRepository:
             "bansos": self.get_bansos(santri_id),
         }
 
+    def get_orangtua(self, santri_id: UUID) -> Optional[SantriOrangtua]:
+        return (
+            self.db.query(SantriOrangtua)
+            .filter(SantriOrangtua.santri_id == santri_id)
+            .order_by(SantriOrangtua.id)
+            .first()
+        )
+
+    def get_all_many(self, santri_ids: Sequence[UUID]) -> Dict[UUID, Dict[str, Any]]:
+        """Load scoring inputs for many santri with one query per source table.
+
+        Returns a mapping of santri_id to the same shape as `get_all`, plus an
+        `orangtua` key, so the rows can be fed to `resolve_param_value`.
+        Single-row tables keep the row with the lowest id per santri, so bulk,
+        single-santri and SQL-compiled scoring all pick the same row.
+        """
+        ids = list(santri_ids)
+        inputs: Dict[UUID, Dict[str, Any]] = {sid: _empty_inputs() for sid in ids}
+        if not ids:
+            return inputs
+
+        single_sources = (
+            ("orangtua", SantriOrangtua),
+            ("rumah", SantriRumah),
+            ("pembiayaan", SantriPembiayaan),
+            ("kesehatan", SantriKesehatan),
+            ("bansos", SantriBansos),
+        )
+        for key, model in single_sources:
+            rows = self.db.query(model).filter(model.santri_id.in_(ids)).order_by(model.id).all()
+            for row in rows:
+                bucket = inputs.get(row.santri_id)
+                if bucket is not None and bucket[key] is None:
+                    bucket[key] = row
+
+        assets = self.db.query(SantriAsset).filter(SantriAsset.santri_id.in_(ids)).all()
+        for asset in assets:
+            bucket = inputs.get(asset.santri_id)
+            if bucket is not None:
+                bucket["assets"].append(asset)
+
+        return inputs
+
+    def get_snapshot(self, santri_id: UUID) -> Dict[str, Any]:
+        """Load every scoring input of one santri, one query per source table.
+
+        Feed the result to `resolve_param_value` (or `calculate_scores_from_inputs`)
+        instead of calling `get_param_value` per parameter.
+        """
+        return self.get_all_many([santri_id])[santri_id]
+
     # Config-driven parameter fetchers
     def get_param_value(self, santri_id: UUID, sumber: str, kode: str) -> Any:
         """Return a value for a parameter `kode` from `sumber` based on available models.
 
         This maps the config needs to existing schema fields, deriving when necessary.
+        Issues one query per call; use `get_snapshot` when resolving several parameters.
         """
+        inputs = _empty_inputs()
         if sumber == "santri_orangtua":
-            ot = self.db.query(SantriOrangtua).filter(SantriOrangtua.santri_id == santri_id).first()
-            if not ot:
-                return None
-            if kode == "penghasilan_bulanan" or kode == "pendapatan_bulanan":
-                return getattr(ot, "pendapatan_bulanan", None)
-            if kode == "pekerjaan":
-                return getattr(ot, "pekerjaan", None)
-            if kode == "pendidikan":
-                return getattr(ot, "pendidikan", None)
-            if kode == "jumlah_tanggungan":
-                # Not available; default to 0 (can be refined later)
-                return 0
-            if kode == "status_pekerjaan":
-                # Derive category from pekerjaan free-text
-                pekerjaan = (getattr(ot, "pekerjaan", "") or "").lower()
-                if any(k in pekerjaan for k in ["buruh", "kuli", "serabutan"]):
-                    return "buruh"
-                if any(k in pekerjaan for k in ["kontrak", "bagian", "honor"]):
-                    return "tidak_tetap"
-                if pekerjaan:
-                    return "tetap"
-                return None
-
-        if sumber == "santri_rumah":
-            r = self.db.query(SantriRumah).filter(SantriRumah.santri_id == santri_id).first()
-            if not r:
-                return None
-            if kode == "status_kepemilikan" or kode == "status_rumah":
-                return getattr(r, "status_rumah", None)
-            if kode == "jenis_lantai":
-                return getattr(r, "jenis_lantai", None)
-            if kode == "jenis_dinding":
-                return getattr(r, "jenis_dinding", None)
-            if kode == "jenis_atap":
-                return getattr(r, "jenis_atap", None)
-            if kode == "akses_air_bersih":
-                return getattr(r, "akses_air_bersih", None)
-            if kode == "daya_listrik_va":
-                return getattr(r, "daya_listrik_va", None)
-            if kode == "luas_per_orang":
-                # No explicit fields; default to None (no score)
-                return None
-            if kode == "lantai":
-                return getattr(r, "jenis_lantai", None)
-            if kode == "sanitasi":
-                # Derive: akses_air_bersih "layak" -> True; else False
-                return (getattr(r, "akses_air_bersih", None) == "layak")
-
-        if sumber in ("santri_aset", "santri_asset"):
-            assets = self.get_assets(santri_id)
-            if kode == "motor":
-                return sum(a.jumlah or 0 for a in assets if getattr(a, "jenis_aset", None) == "motor")
-            if kode == "mobil":
-                return sum(a.jumlah or 0 for a in assets if getattr(a, "jenis_aset", None) == "mobil")
-            if kode == "sepeda":
-                return sum(a.jumlah or 0 for a in assets if getattr(a, "jenis_aset", None) == "sepeda")
-            if kode == "lahan":
-                return sum(a.jumlah or 0 for a in assets if getattr(a, "jenis_aset", None) == "lahan")
-            if kode == "hp":
-                return sum(a.jumlah or 0 for a in assets if getattr(a, "jenis_aset", None) == "hp")
-            if kode == "ternak":
-                return sum(a.jumlah or 0 for a in assets if getattr(a, "jenis_aset", None) == "ternak")
-            if kode == "laptop":
-                return sum(a.jumlah or 0 for a in assets if getattr(a, "jenis_aset", None) == "laptop")
-            if kode == "alat_kerja":
-                return sum(a.jumlah or 0 for a in assets if getattr(a, "jenis_aset", None) == "alat_kerja")
-            if kode == "lainnya":
-                return sum(a.jumlah or 0 for a in assets if getattr(a, "jenis_aset", None) == "lainnya")
-
-        if sumber == "santri_pembiayaan":
-            p = self.db.query(SantriPembiayaan).filter(SantriPembiayaan.santri_id == santri_id).first()
-            if not p:
-                return None
-            if kode == "sumber_biaya":
-                return getattr(p, "sumber_biaya", None)
-            if kode == "status_pembayaran":
-                return getattr(p, "status_pembayaran", None)
-            if kode == "tunggakan_bulan":
-                return getattr(p, "tunggakan_bulan", None)
-            if kode == "tunggakan":
-                return (getattr(p, "tunggakan_bulan", 0) or 0) > 0
-
-        if sumber == "santri_kesehatan":
-            k = self.db.query(SantriKesehatan).filter(SantriKesehatan.santri_id == santri_id).first()
-            if not k:
-                return None
-            if kode == "status_gizi":
-                return getattr(k, "status_gizi", None)
-            if kode == "riwayat_penyakit":
-                return getattr(k, "riwayat_penyakit", None)
-            if kode == "kebutuhan_khusus":
-                return getattr(k, "kebutuhan_khusus", None)
-            if kode == "penyakit_kronis":
-                # Derive from riwayat_penyakit presence
-                rp = getattr(k, "riwayat_penyakit", "") or ""
-                return bool(rp.strip())
-            if kode == "bpjs_aktif":
-                # Unknown; default False (vulnerable)
-                return False
-
-        if sumber == "santri_bansos":
-            b = self.db.query(SantriBansos).filter(SantriBansos.santri_id == santri_id).first()
-            if not b:
-                return None
-            # Direct flags for each bantuan program
-            if kode in {"pkh", "bpnt", "pip", "kis_pbi", "blt_desa"}:
-                return bool(getattr(b, kode, False))
-            if kode == "pernah_menerima":
-                flags = [b.pkh, b.bpnt, b.pip, b.kis_pbi, b.blt_desa]
-                return any(bool(f) for f in flags)
-            if kode == "dtks":
-                # Not tracked; default False
-                return False
-
-        return None
+            inputs["orangtua"] = self.get_orangtua(santri_id)
+        elif sumber == "santri_rumah":
+            inputs["rumah"] = self.get_rumah(santri_id)
+        elif sumber in ("santri_aset", "santri_asset"):
+            inputs["assets"] = self.get_assets(santri_id)
+        elif sumber == "santri_pembiayaan":
+            inputs["pembiayaan"] = self.get_pembiayaan(santri_id)
+        elif sumber == "santri_kesehatan":
+            inputs["kesehatan"] = self.get_kesehatan(santri_id)
+        elif sumber == "santri_bansos":
+            inputs["bansos"] = self.get_bansos(santri_id)
+        return resolve_param_value(inputs, sumber, kode)
+
+
+def _empty_inputs() -> Dict[str, Any]:
+    return {
+        "orangtua": None,
+        "rumah": None,
+        "assets": [],
+        "pembiayaan": None,
+        "kesehatan": None,
+        "bansos": None,
+    }
+
+
+ASSET_KODES = {"motor", "mobil", "sepeda", "lahan", "hp", "ternak", "laptop", "alat_kerja", "lainnya"}
+
+
+def resolve_param_value(inputs: Dict[str, Any], sumber: str, kode: str) -> Any:
+    """Resolve a config parameter from already-loaded santri rows.
+
+    `inputs` uses the keys produced by `SantriDataRepository.get_all_many`.
+    Derived parameters (status_pekerjaan, sanitasi, penyakit_kronis, ...) are
+    computed here so single and bulk scoring share one definition.
+    """
+    if sumber == "santri_orangtua":
+        ot = inputs.get("orangtua")
+        if not ot:
+            return None
+        if kode == "penghasilan_bulanan" or kode == "pendapatan_bulanan":
+            return getattr(ot, "pendapatan_bulanan", None)
+        if kode == "pekerjaan":
+            return getattr(ot, "pekerjaan", None)
+        if kode == "pendidikan":
+            return getattr(ot, "pendidikan", None)
+        if kode == "jumlah_tanggungan":
+            # Not available; default to 0 (can be refined later)
+            return 0
+        if kode == "status_pekerjaan":
+            # Derive category from pekerjaan free-text
+            pekerjaan = (getattr(ot, "pekerjaan", "") or "").lower()
+            if any(k in pekerjaan for k in ["buruh", "kuli", "serabutan"]):
+                return "buruh"
+            if any(k in pekerjaan for k in ["kontrak", "bagian", "honor"]):
+                return "tidak_tetap"
+            if pekerjaan:
+                return "tetap"
+            return None
+
+    if sumber == "santri_rumah":
+        r = inputs.get("rumah")
+        if not r:
+            return None
+        if kode == "status_kepemilikan" or kode == "status_rumah":
+            return getattr(r, "status_rumah", None)
+        if kode == "jenis_lantai":
+            return getattr(r, "jenis_lantai", None)
+        if kode == "jenis_dinding":
+            return getattr(r, "jenis_dinding", None)
+        if kode == "jenis_atap":
+            return getattr(r, "jenis_atap", None)
+        if kode == "akses_air_bersih":
+            return getattr(r, "akses_air_bersih", None)
+        if kode == "daya_listrik_va":
+            return getattr(r, "daya_listrik_va", None)
+        if kode == "luas_per_orang":
+            # No explicit fields; default to None (no score)
+            return None
+        if kode == "lantai":
+            return getattr(r, "jenis_lantai", None)
+        if kode == "sanitasi":
+            # Derive: akses_air_bersih "layak" -> True; else False
+            return (getattr(r, "akses_air_bersih", None) == "layak")
+
+    if sumber in ("santri_aset", "santri_asset"):
+        if kode in ASSET_KODES:
+            assets = inputs.get("assets") or []
+            return sum(a.jumlah or 0 for a in assets if getattr(a, "jenis_aset", None) == kode)
+
+    if sumber == "santri_pembiayaan":
+        p = inputs.get("pembiayaan")
+        if not p:
+            return None
+        if kode == "sumber_biaya":
+            return getattr(p, "sumber_biaya", None)
+        if kode == "status_pembayaran":
+            return getattr(p, "status_pembayaran", None)
+        if kode == "tunggakan_bulan":
+            return getattr(p, "tunggakan_bulan", None)
+        if kode == "tunggakan":
+            return (getattr(p, "tunggakan_bulan", 0) or 0) > 0
+
+    if sumber == "santri_kesehatan":
+        k = inputs.get("kesehatan")
+        if not k:
+            return None
+        if kode == "status_gizi":
+            return getattr(k, "status_gizi", None)
+        if kode == "riwayat_penyakit":
+            return getattr(k, "riwayat_penyakit", None)
+        if kode == "kebutuhan_khusus":
+            return getattr(k, "kebutuhan_khusus", None)
+        if kode == "penyakit_kronis":
+            # Derive from riwayat_penyakit presence
+            rp = getattr(k, "riwayat_penyakit", "") or ""
+            return bool(rp.strip())
+        if kode == "bpjs_aktif":
+            # Unknown; default False (vulnerable)
+            return False
+
+    if sumber == "santri_bansos":
+        b = inputs.get("bansos")
+        if not b:
+            return None
+        # Direct flags for each bantuan program
+        if kode in {"pkh", "bpnt", "pip", "kis_pbi", "blt_desa"}:
+            return bool(getattr(b, kode, False))
+        if kode == "pernah_menerima":
+            flags = [b.pkh, b.bpnt, b.pip, b.kis_pbi, b.blt_desa]
+            return any(bool(f) for f in flags)
+        if kode == "dtks":
+            # Not tracked; default False
+            return False
+
+    return None
@@ -0,0 +1,113 @@
+"""Routes for population analytics."""
+import csv
+import io
+from uuid import UUID
+from typing import Iterator, Optional
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal, get_db
+from app.services.bansos_gap_service import EXPORT_COLUMNS, GAPS, BansosGapService
+from app.services.bansos_targeting_service import BansosTargetingService
+from app.schemas.bansos_targeting_schema import BansosTargetingRequest
+from app.supports import success_response, error_response
+
+router = APIRouter(prefix="/api/analytics", tags=["Analytics"])
+
+# Rows buffered per streamed CSV chunk
+EXPORT_CHUNK_ROWS = 1000
+
+
+@router.get("/bansos-gap", response_model=None)
+def get_bansos_gap(db: Session = Depends(get_db)):
+    """Bansos coverage gaps overall, per kabupaten and per pesantren.
+
+    `miskin_tanpa_bansos`: santri scored Miskin/Sangat Miskin receiving none of
+    pkh, bpnt, pip, kis_pbi or blt_desa. `tidak_miskin_dengan_bansos`: santri scored
+    Tidak Miskin receiving at least one. Cached until scores, bansos or santri data change.
+    """
+    try:
+        result = BansosGapService(db).summary()
+        total = result["total"]
+        return success_response(
+            data=result,
+            message=(
+                f"{total['miskin_tanpa_bansos']} santri miskin tanpa bansos, "
+                f"{total['tidak_miskin_dengan_bansos']} santri tidak miskin menerima bansos"
+            ),
+        )
+    except Exception as e:
+        return error_response(f"Gagal menghitung kesenjangan bansos: {str(e)}", error_code="INTERNAL_ERROR")
+
+
+@router.get("/bansos-gap/export", response_model=None)
+def export_bansos_gap(
+    gap: str = Query("miskin_tanpa_bansos", description=f"Salah satu dari: {', '.join(GAPS)}"),
+    kabupaten: Optional[str] = Query(None),
+    pesantren_id: Optional[UUID] = Query(None),
+):
+    """CSV of the santri in one coverage gap, streamed from a server-side cursor."""
+    db = SessionLocal()
+    try:
+        rows = BansosGapService(db).iter_gap_rows(gap, kabupaten=kabupaten, pesantren_id=pesantren_id)
+    except ValueError as e:
+        db.close()
+        return error_response(str(e), error_code="VALIDATION_ERROR")
+
+    def generate() -> Iterator[str]:
+        # The session lives as long as the response body, not the request handler
+        try:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(EXPORT_COLUMNS)
+            for i, row in enumerate(rows, start=1):
+                writer.writerow(row)
+                if i % EXPORT_CHUNK_ROWS == 0:
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+            yield buffer.getvalue()
+        finally:
+            db.close()
+
+    return StreamingResponse(
+        generate(),
+        media_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{gap}.csv"'},
+    )
+
+
+@router.post("/bansos-targeting", response_model=None)
+def optimize_bansos_targeting(payload: BansosTargetingRequest, db: Session = Depends(get_db)):
+    """Santri to enrol in bansos programs so the budget covers the most vulnerability.
+
+    Each santri's value is skor_total (or the weighted dimension scores in
+    `bobot_dimensi`) and their cost is the programs in `biaya_program` they do not
+    receive yet. Selection is greedy on value per rupiah, within the per-kabupaten
+    quotas. Candidates are held in memory and reloaded when scores or bansos change.
+    """
+    try:
+        result = BansosTargetingService(db).optimize(
+            anggaran=payload.anggaran,
+            biaya_program=payload.biaya_program,
+            kuota_kabupaten=payload.kuota_kabupaten,
+            kuota_default=payload.kuota_default,
+            kecualikan_penerima=payload.kecualikan_penerima,
+            bobot_dimensi=payload.bobot_dimensi,
+            kategori=payload.kategori,
+            provinsi=payload.provinsi,
+            limit=payload.limit,
+            refresh=payload.refresh,
+        )
+        return success_response(
+            data=result,
+            message=(
+                f"{result['total_terpilih']} dari {result['total_kandidat']} kandidat terpilih, "
+                f"biaya {result['total_biaya']} dari anggaran {result['anggaran']}"
+            ),
+        )
+    except ValueError as e:
+        return error_response(str(e), error_code="VALIDATION_ERROR")
+    except Exception as e:
+        return error_response(f"Optimasi target bansos gagal: {str(e)}", error_code="INTERNAL_ERROR")
@@ -1,14 +1,16 @@
 """Routes for pesantren scoring calculation and retrieval."""
 
+from typing import Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, BackgroundTasks, Depends, Query
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
 from app.services.pesantren_score_service import PesantrenScoreService
 from app.schemas.pesantren_skor_schema import PesantrenSkorResponse
 from app.supports import success_response, error_response
-from app.models.pondok_pesantren import PondokPesantren
+from app.services.scoring_job_service import ScoringJobService
+from app.routes.scoring_job_routes import submit_scoring_job
 
 router = APIRouter(prefix="/api/pesantren-scoring", tags=["Pesantren Scoring"])
 
@@ -41,10 +43,14 @@ async def calculate_skor(
 @router.get("/pesantren/{pesantren_id}", response_model=None)
 async def get_skor_by_pesantren(
     pesantren_id: UUID,
+    fresh: bool = Query(False, description="Hitung ulang breakdown dari data terkini (tidak disimpan)"),
     service: PesantrenScoreService = Depends(get_service)
 ):
-    """Get scoring by pesantren ID with detailed breakdown."""
-    result = service.get_by_pesantren_id(pesantren_id)
+    """Get scoring by pesantren ID with detailed breakdown.
+
+    Returns the breakdown stored at calculation time; `?fresh=true` recomputes it.
+    """
+    result = service.get_by_pesantren_id(pesantren_id, fresh=fresh)
     if not result:
         return error_response(
             "Skor tidak ditemukan",
@@ -75,45 +81,17 @@ async def get_skor_detail(
 
 
 @router.post("/batch/calculate-all", response_model=None)
-async def batch_calculate_all(db: Session = Depends(get_db)):
-    """Calculate scoring for all pondok pesantren records."""
+async def batch_calculate_all(
+    background_tasks: BackgroundTasks,
+    chunk_size: Optional[int] = Query(None, ge=1, le=10000, description="Jumlah pesantren per commit"),
+    db: Session = Depends(get_db)
+):
+    """Submit a job that scores all pondok pesantren records.
+
+    Returns 202 with the job id immediately; poll `/api/scoring-jobs/{job_id}` for
+    progress and page through `/api/scoring-jobs/{job_id}/results` for results.
+    """
     try:
-        service = PesantrenScoreService(db)
-        pesantrens = db.query(PondokPesantren).all()
-        
-        results = []
-        errors = []
-        
-        for pesantren in pesantrens:
-            try:
-                pesantren_id = (
-                    UUID(str(pesantren.id))
-                    if not isinstance(pesantren.id, UUID)
-                    else pesantren.id
-                )
-                record, breakdown = service.calculate_and_save(pesantren_id)
-                results.append({
-                    "pesantren_id": str(pesantren.id),
-                    "nama": pesantren.nama,
-                    "skor_total": record.skor_total,
-                    "kategori": record.kategori_kelayakan,
-                })
-            except Exception as e:
-                errors.append({
-                    "pesantren_id": str(pesantren.id),
-                    "nama": pesantren.nama,
-                    "error": str(e),
-                })
-        
-        return success_response(
-            data={
-                "total_processed": len(results),
-                "total_errors": len(errors),
-                "results": results,
-                "errors": errors if errors else None,
-            },
-            message=f"Scoring selesai: {len(results)} berhasil, {len(errors)} gagal",
-            status_code=200
-        )
+        return submit_scoring_job(ScoringJobService(db), background_tasks, "pesantren", chunk_size)
     except Exception as e:
         return error_response(str(e), error_code="INTERNAL_ERROR")
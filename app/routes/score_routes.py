@@ -1,15 +1,24 @@
 """Routes for scoring calculation and retrieval."""
 from uuid import UUID
-from typing import List
-from fastapi import APIRouter, Depends
+from typing import List, Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, Query
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 
 from app.core.database import get_db
 from app.services.score_service import ScoreService
+from app.services.bulk_score_service import BulkScoreService
+from app.services.scoring_job_service import ScoringJobService
+from app.services.scoring_simulation_service import ScoringSimulationService
+from app.services.score_histogram_service import DEFAULT_QUANTILES, DIMENSIONS, ScoreHistogramService
+from app.services.santri_ranking_service import LEVELS, MAX_TOP_N, SantriRankingService
+from app.routes.scoring_job_routes import submit_scoring_job
 from app.schemas.santri_skor_schema import SantriSkorResponse
+from app.schemas.scoring_simulation_schema import ScoringSimulationRequest
+from app.schemas.scoring_preview_schema import ScoringPreviewBatchRequest, ScoringPreviewRequest
+from app.rules.scoring_program import get_scoring_program
+from app.rules.scoring_rules import calculate_scores_from_values
 from app.supports import success_response, error_response
-from app.models.santri_pribadi import SantriPribadi
 
 router = APIRouter(prefix="/api/scoring", tags=["Scoring"])
 
@@ -43,8 +52,12 @@ async def calculate_skor(santri_id: UUID, service: ScoreService = Depends(get_se
 
 
 @router.get("/santri/{santri_id}", response_model=None)
-async def get_skor_by_santri(santri_id: UUID, service: ScoreService = Depends(get_service)):
-    result = service.get_by_santri_id(santri_id)
+async def get_skor_by_santri(
+    santri_id: UUID,
+    fresh: bool = Query(False, description="Hitung ulang breakdown dari data terkini (tidak disimpan)"),
+    service: ScoreService = Depends(get_service)
+):
+    result = service.get_by_santri_id(santri_id, fresh=fresh)
     if not result:
         return error_response("Skor tidak ditemukan", status_code=404, error_code="NOT_FOUND")
     
@@ -56,10 +69,78 @@ async def get_skor_by_santri(santri_id: UUID, service: ScoreService = Depends(ge
     return success_response(response_dict)
 
 
+@router.get("/distribution", response_model=None)
+def get_score_distribution(
+    dimensi: str = Query("total", description=f"Salah satu dari: {', '.join(DIMENSIONS)}"),
+    provinsi: Optional[str] = Query(None),
+    kabupaten: Optional[str] = Query(None),
+    pesantren_id: Optional[UUID] = Query(None),
+    bins: int = Query(10, ge=1, le=200, description="Jumlah bin dengan lebar tetap"),
+    quantiles: Optional[List[float]] = Query(None, description="Contoh: quantiles=0.5&quantiles=0.9"),
+    skor: Optional[int] = Query(None, description="Hitung percentile rank skor ini"),
+    db: Session = Depends(get_db)
+):
+    """Histogram, quantiles and percentile rank of santri scores.
+
+    Served from the pre-aggregated `santri_skor_histogram` (one count per score
+    value and drill-down group), so the cost does not grow with the population.
+    Filters combine; `dimensi` selects skor_total (`total`) or one dimension.
+    """
+    try:
+        result = ScoreHistogramService(db).distribution(
+            dimensi=dimensi,
+            provinsi=provinsi,
+            kabupaten=kabupaten,
+            pesantren_id=pesantren_id,
+            bins=bins,
+            quantiles=quantiles or DEFAULT_QUANTILES,
+            skor=skor,
+        )
+        return success_response(data=result, message=f"Distribusi {dimensi}: {result['total_santri']} santri")
+    except ValueError as e:
+        return error_response(str(e), error_code="VALIDATION_ERROR")
+    except Exception as e:
+        return error_response(f"Gagal mengambil distribusi skor: {str(e)}", error_code="INTERNAL_ERROR")
+
+
+@router.get("/ranking", response_model=None)
+def get_santri_ranking(
+    level: str = Query("kabupaten", description=f"Salah satu dari: {', '.join(LEVELS)}"),
+    n: int = Query(50, ge=1, le=MAX_TOP_N, description="Jumlah santri per grup (atau per halaman)"),
+    provinsi: Optional[str] = Query(None),
+    kabupaten: Optional[str] = Query(None),
+    kecamatan: Optional[str] = Query(None),
+    pesantren_id: Optional[UUID] = Query(None),
+    after: Optional[str] = Query(None, description="next_cursor dari halaman sebelumnya"),
+    db: Session = Depends(get_db)
+):
+    """Neediest santri (highest skor_total) per kabupaten, kecamatan or pesantren.
+
+    Without a complete group filter: the top `n` of every group. With one (e.g.
+    level=kecamatan&kabupaten=...&kecamatan=...): that group's ranking, `n` per page,
+    continued with `after=<next_cursor>`. Ties are broken on the dimension scores.
+    """
+    try:
+        result = SantriRankingService(db).ranking(
+            level=level,
+            n=n,
+            provinsi=provinsi,
+            kabupaten=kabupaten,
+            kecamatan=kecamatan,
+            pesantren_id=pesantren_id,
+            after=after,
+        )
+        return success_response(data=result, message=f"Ranking santri per {level}")
+    except ValueError as e:
+        return error_response(str(e), error_code="VALIDATION_ERROR")
+    except Exception as e:
+        return error_response(f"Gagal mengambil ranking santri: {str(e)}", error_code="INTERNAL_ERROR")
+
+
 @router.post("/bulk/calculate-asset", response_model=None)
 async def bulk_calculate_asset_scores(
     payload: BulkScoreRequest,
-    service: ScoreService = Depends(get_service)
+    db: Session = Depends(get_db)
 ):
     """Bulk calculate asset scores for multiple santri.
     
@@ -70,25 +151,30 @@ async def bulk_calculate_asset_scores(
         if not payload.santri_ids:
             return error_response("santri_ids tidak boleh kosong", error_code="VALIDATION_ERROR")
 
-        results = []
-        errors = []
-
-        for santri_id in payload.santri_ids:
-            try:
-                record, _ = service.calculate_and_save(santri_id, metode=payload.metode, version=payload.version)
-                results.append({
-                    "santri_id": str(santri_id),
-                    "skor_total": record.skor_total,
-                    "skor_aset": record.skor_aset,
-                    "kategori_kemiskinan": record.kategori_kemiskinan,
-                    "success": True
-                })
-            except Exception as e:
-                errors.append({
-                    "santri_id": str(santri_id),
-                    "error": str(e),
-                    "success": False
-                })
+        # One set-based load and one upsert + commit for the whole batch
+        bulk = BulkScoreService(db)
+        scored, _, chunk_errors = bulk.compute_chunk(list(dict.fromkeys(payload.santri_ids)))
+        bulk.write_chunk(scored)
+        db.commit()
+
+        results = [
+            {
+                "santri_id": str(item["santri_id"]),
+                "skor_total": item["skor_total"],
+                "skor_aset": item["components"]["skor_aset"],
+                "kategori_kemiskinan": item["kategori_kemiskinan"],
+                "success": True
+            }
+            for item in scored
+        ]
+        errors = [
+            {
+                "santri_id": error["santri_id"],
+                "error": error["error"],
+                "success": False
+            }
+            for error in chunk_errors
+        ]
 
         return success_response(
             data={
@@ -102,46 +188,95 @@ async def bulk_calculate_asset_scores(
             status_code=201
         )
     except Exception as e:
+        db.rollback()
         return error_response(f"Failed to bulk calculate scores: {str(e)}", error_code="INTERNAL_ERROR")
 
 
 @router.post("/batch/calculate-all", response_model=None)
-async def batch_calculate_all(db: Session = Depends(get_db)):
-    """Calculate scoring for all santri_pribadi records."""
+async def batch_calculate_all(
+    background_tasks: BackgroundTasks,
+    chunk_size: Optional[int] = Query(None, ge=1, le=10000, description="Jumlah santri per commit"),
+    db: Session = Depends(get_db)
+):
+    """Submit a job that scores all santri_pribadi records.
+
+    Returns 202 with the job id immediately. The job runs the set-based bulk engine
+    chunk by chunk (one commit per chunk); poll `/api/scoring-jobs/{job_id}` for
+    progress and page through `/api/scoring-jobs/{job_id}/results` for results.
+    """
     try:
-        service = ScoreService(db)
-        santris = db.query(SantriPribadi).all()
-        
-        results = []
-        errors = []
-        
-        for santri in santris:
-            try:
-                santri_id = UUID(str(santri.id)) if not isinstance(santri.id, UUID) else santri.id
-                record, _ = service.calculate_and_save(santri_id)
-                results.append({
-                    "santri_id": str(santri.id),
-                    "nama": santri.nama,
-                    "skor_total": record.skor_total,
-                    "kategori": record.kategori_kemiskinan,
-                })
-            except Exception as e:
-                errors.append({
-                    "santri_id": str(santri.id),
-                    "nama": santri.nama,
-                    "error": str(e),
-                })
-        
+        return submit_scoring_job(ScoringJobService(db), background_tasks, "santri", chunk_size)
+    except Exception as e:
+        return error_response(str(e), error_code="INTERNAL_ERROR")
+
+
+@router.post("/simulate", response_model=None)
+def simulate_scoring_config(payload: ScoringSimulationRequest, db: Session = Depends(get_db)):
+    """What-if: score all santri with a candidate config and compare with the live scoring.json.
+
+    Nothing is written. Returns the category distribution of both configs, the
+    category transitions, per-kabupaten shifts and the santri that change category
+    (largest score change first, up to `changed_limit`). Santri data comes from an
+    in-memory feature matrix that is built on first use and cached.
+    """
+    try:
+        result = ScoringSimulationService(db).simulate(
+            payload.config,
+            changed_limit=payload.changed_limit,
+            refresh=payload.refresh,
+        )
         return success_response(
-            data={
-                "total_processed": len(results),
-                "total_errors": len(errors),
-                "results": results,
-                "errors": errors if errors else None,
-            },
-            message=f"Scoring selesai: {len(results)} berhasil, {len(errors)} gagal",
-            status_code=200
+            data=result,
+            message=f"Simulasi selesai: {result['changed_total']} dari {result['total_santri']} santri berubah kategori"
         )
+    except ValueError as e:
+        return error_response(str(e), error_code="VALIDATION_ERROR")
     except Exception as e:
-        return error_response(str(e), error_code="INTERNAL_ERROR")
+        return error_response(f"Simulasi gagal: {str(e)}", error_code="INTERNAL_ERROR")
+
+
+def _preview(record: ScoringPreviewRequest, program, include_breakdown: bool = True) -> dict:
+    per_component, total, kategori, metode, version, breakdown = calculate_scores_from_values(
+        record.model_dump(), program
+    )
+    result = {
+        **per_component,
+        "skor_total": total,
+        "kategori_kemiskinan": kategori,
+        "metode": metode,
+        "version": version,
+    }
+    if include_breakdown:
+        result["breakdown"] = breakdown
+    return result
+
 
+@router.post("/preview", response_model=None)
+async def preview_skor(payload: ScoringPreviewRequest):
+    """Score unsaved form values with the live scoring.json.
+
+    Pure computation: nothing is read from or written to the database, so forms can
+    call it on every change. Same result as `/{santri_id}/calculate` would give once
+    the values are saved.
+    """
+    try:
+        return success_response(_preview(payload, get_scoring_program()))
+    except Exception as e:
+        return error_response(f"Preview skor gagal: {str(e)}", error_code="INTERNAL_ERROR")
+
+
+@router.post("/preview/batch", response_model=None)
+async def preview_skor_batch(payload: ScoringPreviewBatchRequest):
+    """Score many unsaved records in one call (results in request order); no database access.
+
+    Breakdowns are left out unless `include_breakdown` is set, which keeps the
+    response small for hundreds of records.
+    """
+    try:
+        program = get_scoring_program()
+        return success_response(
+            data=[_preview(record, program, payload.include_breakdown) for record in payload.records],
+            message=f"Preview {len(payload.records)} record selesai"
+        )
+    except Exception as e:
+        return error_response(f"Preview skor gagal: {str(e)}", error_code="INTERNAL_ERROR")
@@ -0,0 +1,127 @@
+"""Routes for asynchronous batch scoring jobs."""
+
+from typing import Optional, Literal
+from uuid import UUID
+from fastapi import APIRouter, BackgroundTasks, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.core.database import get_db
+from app.schemas.scoring_job_schema import (
+    ScoringJobCreate,
+    ScoringJobResponse,
+    ScoringJobItemResponse,
+)
+from app.services.scoring_job_service import ScoringJobService, run_scoring_job
+from app.supports import success_response, error_response, paginated_response
+
+router = APIRouter(prefix="/api/scoring-jobs", tags=["Scoring Jobs"])
+
+
+def get_service(db: Session = Depends(get_db)) -> ScoringJobService:
+    """Dependency to get scoring job service."""
+    return ScoringJobService(db)
+
+
+def submit_scoring_job(
+    service: ScoringJobService,
+    background_tasks: BackgroundTasks,
+    kind: str,
+    chunk_size: Optional[int] = None,
+):
+    """Create a job, schedule it after the response and answer 202 with its status URL."""
+    job = service.create(kind, chunk_size)
+    background_tasks.add_task(run_scoring_job, job.id)
+    data = ScoringJobResponse(**service.to_dict(job)).model_dump()
+    data["status_url"] = f"{router.prefix}/{job.id}"
+    data["results_url"] = f"{router.prefix}/{job.id}/results"
+    return success_response(
+        data=data,
+        message="Job scoring diterima dan sedang diproses",
+        status_code=202
+    )
+
+
+@router.post("", response_model=None)
+async def create_job(
+    payload: ScoringJobCreate,
+    background_tasks: BackgroundTasks,
+    service: ScoringJobService = Depends(get_service)
+):
+    """Submit a batch scoring job; returns immediately with the job id."""
+    try:
+        return submit_scoring_job(service, background_tasks, payload.kind, payload.chunk_size)
+    except Exception as e:
+        return error_response(str(e), error_code="INTERNAL_ERROR")
+
+
+@router.get("", response_model=None)
+async def get_jobs(
+    page: int = Query(1, ge=1, description="Page number"),
+    per_page: int = Query(20, ge=1, le=100, description="Items per page"),
+    service: ScoringJobService = Depends(get_service)
+):
+    """List scoring jobs, newest first."""
+    jobs, total = service.get_all(page=page, per_page=per_page)
+    return paginated_response(
+        data=[ScoringJobResponse(**service.to_dict(job)).model_dump() for job in jobs],
+        page=page,
+        per_page=per_page,
+        total=total,
+        message="Data job scoring berhasil diambil"
+    )
+
+
+@router.get("/{job_id}", response_model=None)
+async def get_job(job_id: UUID, service: ScoringJobService = Depends(get_service)):
+    """Get job status: processed/failed counts, progress and ETA."""
+    job = service.get_by_id(job_id)
+    if not job:
+        return error_response("Job tidak ditemukan", status_code=404, error_code="NOT_FOUND")
+    return success_response(ScoringJobResponse(**service.to_dict(job)).model_dump())
+
+
+@router.post("/{job_id}/resume", response_model=None)
+async def resume_job(
+    job_id: UUID,
+    background_tasks: BackgroundTasks,
+    service: ScoringJobService = Depends(get_service)
+):
+    """Resume a failed or interrupted job from its last committed chunk."""
+    job = service.get_by_id(job_id)
+    if not job:
+        return error_response("Job tidak ditemukan", status_code=404, error_code="NOT_FOUND")
+    if job.status == "completed":
+        return error_response("Job sudah selesai", status_code=400, error_code="JOB_COMPLETED")
+    claimed_at = service.claim(job_id)
+    if claimed_at is None:
+        return error_response("Job masih berjalan", status_code=409, error_code="JOB_RUNNING")
+
+    background_tasks.add_task(run_scoring_job, job_id, claimed_at)
+    job = service.get_by_id(job_id)
+    return success_response(
+        data=ScoringJobResponse(**service.to_dict(job)).model_dump(),
+        message="Job scoring dilanjutkan",
+        status_code=202
+    )
+
+
+@router.get("/{job_id}/results", response_model=None)
+async def get_job_results(
+    job_id: UUID,
+    page: int = Query(1, ge=1, description="Page number"),
+    per_page: int = Query(100, ge=1, le=1000, description="Items per page"),
+    status: Optional[Literal["success", "error"]] = Query(None, description="Filter hasil berhasil/gagal"),
+    service: ScoringJobService = Depends(get_service)
+):
+    """Get per-santri/pesantren results of a job with pagination."""
+    if not service.get_by_id(job_id):
+        return error_response("Job tidak ditemukan", status_code=404, error_code="NOT_FOUND")
+    success = None if status is None else status == "success"
+    items, total = service.get_items(job_id, page=page, per_page=per_page, success=success)
+    return paginated_response(
+        data=[ScoringJobItemResponse.model_validate(item).model_dump() for item in items],
+        page=page,
+        per_page=per_page,
+        total=total,
+        message="Hasil job scoring berhasil diambil"
+    )
@@ -1,11 +1,52 @@
 """Load scoring configuration from JSON file with simple caching."""
 from __future__ import annotations
+import hashlib
 import json
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Tuple
+
+SCORING_CONFIG_PATH = Path(__file__).parent / "scoring.json"
+PESANTREN_SCORING_CONFIG_PATH = Path(__file__).parent / "pesantren_scoring.json"
+
+
+class _CachedConfig:
+    __slots__ = ("mtime_ns", "size", "digest", "data")
+
+    def __init__(self, mtime_ns: int, size: int, digest: str, data: Dict[str, Any]):
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.digest = digest
+        self.data = data
+
+
+_cache: Dict[Path, _CachedConfig] = {}
+
+
+def load_config_file(path: Path) -> Tuple[Dict[str, Any], str]:
+    """Return (parsed config, sha256 of the file content) for a JSON config file.
+
+    The file is only re-read when its mtime or size changes, and only re-parsed when
+    the content hash changes, so edits to thresholds take effect on the next call
+    without parsing the file on every scoring call. The returned dict is shared;
+    callers must not mutate it.
+    """
+    stat = path.stat()
+    cached = _cache.get(path)
+    if cached and cached.mtime_ns == stat.st_mtime_ns and cached.size == stat.st_size:
+        return cached.data, cached.digest
+
+    raw = path.read_bytes()
+    digest = hashlib.sha256(raw).hexdigest()
+    if cached and cached.digest == digest:
+        cached.mtime_ns = stat.st_mtime_ns
+        cached.size = stat.st_size
+        return cached.data, cached.digest
+
+    data = json.loads(raw.decode("utf-8"))
+    _cache[path] = _CachedConfig(stat.st_mtime_ns, stat.st_size, digest, data)
+    return data, digest
+
 
 def load_scoring_config() -> Dict[str, Any]:
-    """Load scoring config fresh on every call to avoid stale thresholds."""
-    config_path = Path(__file__).parent / "scoring.json"
-    with config_path.open("r", encoding="utf-8") as f:
-        return json.load(f)
+    """Load scoring config, reloading automatically when scoring.json changes."""
+    return load_config_file(SCORING_CONFIG_PATH)[0]
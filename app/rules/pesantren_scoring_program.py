@@ -0,0 +1,211 @@
+"""Compiled form of pesantren_scoring.json.
+
+`compile_pesantren_config` resolves, once per config, which table supplies each
+parameter (fisik, then fasilitas, then pendidikan, as the original lookup did) and
+the fallback score for values missing from a mapping. Evaluating a pesantren is then
+a dict lookup per parameter over rows loaded by `PesantrenDataRepository`, with
+results identical to the per-dimension evaluation it replaces.
+
+`get_pesantren_scoring_program` caches the compiled program and recompiles it when
+the content hash of pesantren_scoring.json changes.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.rules.config_loader import PESANTREN_SCORING_CONFIG_PATH, load_config_file
+from app.models.pesantren_fisik import PesantrenFisik
+from app.models.pesantren_fasilitas import PesantrenFasilitas
+from app.models.pesantren_pendidikan import PesantrenPendidikan
+
+
+# Tables searched for a parameter key, in order
+PARAMETER_SOURCES = (
+    ("fisik", PesantrenFisik),
+    ("fasilitas", PesantrenFasilitas),
+    ("pendidikan", PesantrenPendidikan),
+)
+
+# Map parameter keys to friendly names
+NAMA_PARAMETER = {
+    "kondisi_bangunan": "Kondisi Bangunan",
+    "status_bangunan": "Status Bangunan",
+    "keamanan_bangunan": "Keamanan Bangunan",
+    "jenis_lantai": "Jenis Lantai",
+    "jenis_dinding": "Jenis Dinding",
+    "jenis_atap": "Jenis Atap",
+    "air_bersih": "Air Bersih",
+    "sumber_air": "Sumber Air",
+    "kualitas_air": "Kualitas Air",
+    "sanitasi": "Sanitasi",
+    "sumber_listrik": "Sumber Listrik",
+    "kestabilan_listrik": "Kestabilan Listrik",
+    "fasilitas_mengajar": "Fasilitas Mengajar",
+    "fasilitas_komunikasi": "Fasilitas Komunikasi",
+    "fasilitas_transportasi": "Fasilitas Transportasi",
+    "akses_jalan": "Akses Jalan",
+    "jenjang_pendidikan": "Jenjang Pendidikan",
+    "kurikulum": "Kurikulum",
+    "akreditasi": "Akreditasi",
+    "prestasi_santri": "Prestasi Santri",
+}
+
+# Friendly dimension names
+NAMA_DIMENSI = {
+    "kelayakan_fisik": "Kelayakan Fisik Bangunan",
+    "air_sanitasi": "Air Bersih dan Sanitasi",
+    "fasilitas_pendukung": "Fasilitas Pendukung",
+    "mutu_pendidikan": "Mutu Pendidikan",
+}
+
+# Category interpretations
+KATEGORI_INTERPRETASI = {
+    "sangat_layak": "Kondisi sangat baik, memenuhi semua standar kelayakan",
+    "layak": "Kondisi baik, memenuhi standar kelayakan",
+    "cukup_layak": "Kondisi cukup, perlu perbaikan di beberapa aspek",
+    "tidak_layak": "Kondisi kurang baik, memerlukan perbaikan menyeluruh",
+}
+
+
+class CompiledPesantrenParameter:
+    """One parameter: where its value lives and how it maps to a score."""
+
+    __slots__ = ("key", "nama", "sources", "mapping", "fallback")
+
+    def __init__(self, conf: Dict[str, Any]):
+        self.key: str = conf["key"]
+        self.nama = NAMA_PARAMETER.get(self.key, self.key.replace("_", " ").title())
+        self.sources: List[str] = [name for name, model in PARAMETER_SOURCES if hasattr(model, self.key)]
+        self.mapping: Dict[str, int] = conf["mapping"]
+        # A value that exists but is not in the mapping gets the lowest score
+        self.fallback = min(self.mapping.values()) if self.mapping else 0
+
+    def value(self, data: Dict[str, Any]) -> Any:
+        for source in self.sources:
+            row = data.get(source)
+            if row:
+                return getattr(row, self.key)
+        return None
+
+    def score(self, value: Any) -> int:
+        if value in self.mapping:
+            return self.mapping[value]
+        return self.fallback
+
+
+class CompiledPesantrenDimension:
+    __slots__ = ("key", "nama", "weight", "parameters")
+
+    def __init__(self, conf: Dict[str, Any]):
+        self.key: str = conf["key"]
+        self.nama = NAMA_DIMENSI.get(self.key, self.key.replace("_", " ").title())
+        self.weight = conf["weight"]
+        self.parameters = [CompiledPesantrenParameter(p) for p in conf["parameters"]]
+
+    def evaluate(self, data: Dict[str, Any]) -> Tuple[int, List[Dict[str, Any]]]:
+        """Average score of the parameters that have a value, with breakdown details."""
+        total_param_score = 0
+        param_count = 0
+        detail_params = []
+
+        for param in self.parameters:
+            value = param.value(data)
+            param_score = 0
+            if value:
+                param_score = param.score(value)
+                total_param_score += param_score
+                param_count += 1
+
+            detail_params.append({
+                "parameter": param.nama,
+                "nilai": str(value).replace("_", " ").title() if value else "Tidak ada data",
+                "skor": param_score
+            })
+
+        avg_score = total_param_score / param_count if param_count > 0 else 0
+        return int(avg_score), detail_params
+
+    @staticmethod
+    def interpretasi(dim_score: int) -> str:
+        if dim_score >= 85:
+            return "Sangat Baik"
+        if dim_score >= 70:
+            return "Baik"
+        if dim_score >= 55:
+            return "Cukup"
+        return "Kurang"
+
+
+class PesantrenScoringProgram:
+    """Executable pesantren_scoring.json: evaluates one pesantren from its loaded rows."""
+
+    def __init__(self, cfg: Dict[str, Any], digest: Optional[str] = None):
+        self.digest = digest
+        self.metode = f"{cfg['scoring_type']}.rules"
+        self.version = cfg["version"]
+        self.dimensions = [CompiledPesantrenDimension(d) for d in cfg["dimensions"]]
+        # Config order; the first rule whose min is reached wins
+        self.result_mapping: List[Tuple[int, str]] = [(rule["min"], rule["category"]) for rule in cfg["result_mapping"]]
+
+    def categorize(self, total_score: int) -> str:
+        for minimum, category in self.result_mapping:
+            if total_score >= minimum:
+                return category
+        return "tidak_layak"
+
+    def evaluate(self, data: Dict[str, Any]) -> Tuple[Dict[str, int], int, str, str, str, Dict[str, Any]]:
+        """Score one pesantren; same return shape as `calculate_pesantren_scores_from_config`.
+
+        Args:
+            data: Rows keyed "pesantren", "fisik", "fasilitas", "pendidikan"
+                (see `PesantrenDataRepository.get_all_many`)
+        """
+        per_dimension: Dict[str, int] = {}
+        weighted_total = 0.0
+        breakdown_dimensi = []
+
+        for dim in self.dimensions:
+            dim_score, detail_params = dim.evaluate(data)
+            per_dimension[f"skor_{dim.key}"] = dim_score
+
+            contribution = dim_score * dim.weight
+            weighted_total += contribution
+
+            breakdown_dimensi.append({
+                "nama": dim.nama,
+                "skor": dim_score,
+                "skor_maks": 100,
+                "bobot": dim.weight * 100,  # Convert to percentage
+                "kontribusi": round(contribution, 2),
+                "interpretasi": dim.interpretasi(dim_score),
+                "detail": detail_params
+            })
+
+        total_score = int(weighted_total)
+        category = self.categorize(total_score)
+
+        breakdown = {
+            "dimensi": breakdown_dimensi,
+            "skor_total": total_score,
+            "kategori_kelayakan": category,
+            "interpretasi_kategori": KATEGORI_INTERPRETASI.get(category, "")
+        }
+
+        return per_dimension, total_score, category, self.metode, self.version, breakdown
+
+
+def compile_pesantren_config(cfg: Dict[str, Any], digest: Optional[str] = None) -> PesantrenScoringProgram:
+    """Compile a pesantren scoring config dict without caching it."""
+    return PesantrenScoringProgram(cfg, digest)
+
+
+_program: Optional[PesantrenScoringProgram] = None
+
+
+def get_pesantren_scoring_program() -> PesantrenScoringProgram:
+    """Return the compiled program for pesantren_scoring.json, recompiling when the file content changes."""
+    global _program
+    cfg, digest = load_config_file(PESANTREN_SCORING_CONFIG_PATH)
+    program = _program
+    if program is None or program.digest != digest:
+        program = compile_pesantren_config(cfg, digest)
+        _program = program
+    return program
@@ -0,0 +1,387 @@
+"""Compiled form of scoring.json.
+
+`compile_scoring_config` turns the `dimensi`/`rules` config into a `ScoringProgram`:
+operator strings are dispatched once at compile time, `in` lists are lowercased into
+sets, numeric thresholds are converted to floats, and parameters whose rules are all
+`==`/`in` become a single dict lookup. Evaluation results are identical to applying
+`scoring_rules._apply_rule` rule by rule.
+
+`get_scoring_program` caches the compiled program and recompiles it when the content
+hash of scoring.json changes.
+
+`ScoringProgram.evaluate_memoized` also returns a hash per dimension of the
+dimension's config and input values; a dimension whose hash matches the stored
+one is not re-evaluated, its score and breakdown entry are reused.
+"""
+import hashlib
+import json
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.rules.config_loader import SCORING_CONFIG_PATH, load_config_file
+
+
+# Rule kinds
+_NULL = 0       # is_null / empty
+_NOT_EMPTY = 1
+_EQ = 2
+_IN = 3
+_LT = 4
+_LE = 5
+_GE = 6
+_NEVER = 7      # unknown operator or operand that can never match
+
+_NUMERIC_OPS = {"<": _LT, "<=": _LE, ">=": _GE}
+
+_UNSET = object()
+
+# santri_skor columns filled from the per-dimension scores
+SKOR_COMPONENTS = (
+    "skor_ekonomi",
+    "skor_rumah",
+    "skor_aset",
+    "skor_pembiayaan",
+    "skor_kesehatan",
+    "skor_bansos",
+)
+
+# Nama dimensi yang lebih friendly
+NAMA_DIMENSI = {
+    "ekonomi": "Ekonomi",
+    "rumah": "Kondisi Rumah",
+    "aset": "Kepemilikan Aset",
+    "pembiayaan": "Pembiayaan Pendidikan",
+    "kesehatan": "Kesehatan",
+    "bansos": "Penerima Bantuan Sosial",
+}
+
+# Interpretasi mapping untuk kategori
+KATEGORI_INTERPRETASI = {
+    "Sangat Miskin": "Kondisi sangat buruk, memerlukan bantuan segera",
+    "Miskin": "Kondisi buruk, memerlukan bantuan",
+    "Rentan": "Kondisi sedang, rentan jatuh miskin",
+    "Tidak Miskin": "Kondisi baik, tidak memerlukan bantuan",
+}
+
+
+def _is_blank(target: Any) -> bool:
+    return target is None or (isinstance(target, str) and target.strip() == "")
+
+
+def _hashable(value: Any) -> bool:
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
+
+
+def _compile_rule(rule: Dict[str, Any]) -> Tuple[int, Any, int]:
+    op = rule.get("operator")
+    value = rule.get("value")
+    skor = int(rule.get("skor", 0))
+
+    if op in ("is_null", "empty"):
+        return _NULL, None, skor
+    if op == "not_empty":
+        return _NOT_EMPTY, None, skor
+    if op == "==":
+        return _EQ, value.lower() if isinstance(value, str) else value, skor
+    if op in _NUMERIC_OPS:
+        try:
+            return _NUMERIC_OPS[op], float(value), skor
+        except Exception:
+            return _NEVER, None, skor
+    if op == "in":
+        if not isinstance(value, list):
+            return _NEVER, None, skor
+        return _IN, (frozenset(str(v).lower() for v in value), list(value)), skor
+    return _NEVER, None, skor
+
+
+class CompiledParameter:
+    """One scoring parameter with its rules pre-dispatched."""
+
+    __slots__ = ("kode", "sumber", "label", "rules", "_str_table", "_other_table")
+
+    def __init__(self, conf: Dict[str, Any]):
+        self.kode: str = conf.get("kode")
+        self.sumber: str = conf.get("sumber")
+        self.label: str = conf.get("label", self.kode)
+        self.rules: List[Tuple[int, Any, int]] = [_compile_rule(r) for r in conf.get("rules", []) if r.get("operator")]
+        self._str_table: Optional[Dict[str, int]] = None
+        self._other_table: Optional[Dict[Any, int]] = None
+        self._build_lookup()
+
+    def _build_lookup(self) -> None:
+        """Collapse all-`==`/`in` rule lists into dict lookups (first rule wins)."""
+        if not all(kind in (_EQ, _IN, _NEVER) for kind, _, _ in self.rules):
+            return
+        str_table: Dict[str, int] = {}
+        other_table: Dict[Any, int] = {}
+        for kind, operand, skor in self.rules:
+            if kind == _EQ:
+                if operand is None or not _hashable(operand):
+                    if operand is not None:
+                        return
+                    continue
+                if isinstance(operand, str):
+                    str_table.setdefault(operand, skor)
+                else:
+                    other_table.setdefault(operand, skor)
+            elif kind == _IN:
+                lowered, raw = operand
+                for key in lowered:
+                    str_table.setdefault(key, skor)
+                for item in raw:
+                    if not _hashable(item):
+                        return
+                    if item is not None and not isinstance(item, str):
+                        other_table.setdefault(item, skor)
+        self._str_table = str_table
+        self._other_table = other_table
+
+    def match(self, target: Any) -> Optional[int]:
+        """Return the skor of the first matching rule, or None when no rule matches."""
+        if self._str_table is not None:
+            if target is None:
+                return None
+            if isinstance(target, str):
+                return self._str_table.get(str(target).lower())
+            try:
+                return self._other_table.get(target)
+            except TypeError:
+                pass
+        return self._match_sequential(target)
+
+    def _match_sequential(self, target: Any) -> Optional[int]:
+        number: Any = _UNSET
+        for kind, operand, skor in self.rules:
+            if kind == _NULL:
+                if _is_blank(target):
+                    return skor
+                continue
+            if kind == _NOT_EMPTY:
+                if not _is_blank(target):
+                    return skor
+                continue
+            if target is None or kind == _NEVER:
+                continue
+            if kind == _EQ:
+                normalized = str(target).lower() if isinstance(target, str) else target
+                if normalized == operand:
+                    return skor
+            elif kind == _IN:
+                lowered, raw = operand
+                if isinstance(target, str):
+                    if str(target).lower() in lowered:
+                        return skor
+                elif target in raw:
+                    return skor
+            else:
+                if number is _UNSET:
+                    try:
+                        number = float(target)
+                    except Exception:
+                        number = None
+                if number is None:
+                    continue
+                if kind == _LT and number < operand:
+                    return skor
+                if kind == _LE and number <= operand:
+                    return skor
+                if kind == _GE and number >= operand:
+                    return skor
+        return None
+
+
+class CompiledDimension:
+    __slots__ = ("key", "nama", "bobot", "skor_maks", "parameters", "_hasher")
+
+    def __init__(self, key: str, conf: Dict[str, Any]):
+        self.key = key
+        self.nama = NAMA_DIMENSI.get(key, key.title())
+        self.bobot = float(conf.get("bobot", 0))
+        self.skor_maks = int(conf.get("skor_maks", 0))
+        self.parameters = [
+            CompiledParameter(p)
+            for p in conf.get("parameters", [])
+            if p.get("kode") and p.get("sumber")
+        ]
+        # Seeded with the dimension's config so a config edit invalidates only this dimension
+        fingerprint = json.dumps([key, self.nama, conf], sort_keys=True, default=str)
+        self._hasher = hashlib.blake2b(fingerprint.encode(), digest_size=12)
+
+    def input_hash(self, values: List[Any]) -> str:
+        """Hash of the dimension config and its parameter values (in parameter order)."""
+        hasher = self._hasher.copy()
+        # repr keeps 1, 1.0, True and "1" apart, which score differently
+        hasher.update(repr(values).encode())
+        return hasher.hexdigest()
+
+    def evaluate(self, values: List[Any]) -> Tuple[int, Dict[str, Any]]:
+        """Score of the dimension and its breakdown entry for the given parameter values."""
+        raw_dim = 0
+        detail_params = []
+
+        for param, val in zip(self.parameters, values):
+            skor_param = param.match(val)
+
+            if skor_param is not None:
+                raw_dim += skor_param
+                detail_params.append({
+                    "parameter": param.label,
+                    "nilai": str(val) if val is not None else "Tidak ada data",
+                    "skor": skor_param
+                })
+            else:
+                skor_param = 0
+
+            # Jika tidak ada rule yang match, tetap catat nilainya
+            if skor_param == 0 and val is not None:
+                detail_params.append({
+                    "parameter": param.label,
+                    "nilai": str(val),
+                    "skor": 0
+                })
+
+        raw_dim = min(raw_dim, self.skor_maks)
+        entry = {
+            "nama": self.nama,
+            "skor": int(round(raw_dim)),
+            "skor_maks": self.skor_maks,
+            "bobot": self.bobot * 100,  # Convert to percentage
+            "kontribusi": int(round(raw_dim)),  # Use raw dimension score for clarity
+            "interpretasi": self.interpretasi(raw_dim),
+            "detail": detail_params if detail_params else None
+        }
+        return raw_dim, entry
+
+    def interpretasi(self, raw_dim: float) -> str:
+        skor_maks = self.skor_maks
+        if raw_dim == 0:
+            return "Sangat Baik"
+        if raw_dim <= skor_maks * 0.25:
+            return "Baik"
+        if raw_dim <= skor_maks * 0.5:
+            return "Sedang"
+        if raw_dim <= skor_maks * 0.75:
+            return "Buruk"
+        return "Sangat Buruk"
+
+
+class ScoringProgram:
+    """Executable scoring.json: evaluates one santri from a parameter value lookup."""
+
+    def __init__(self, cfg: Dict[str, Any], digest: Optional[str] = None):
+        meta = cfg.get("metadata", {})
+        self.digest = digest
+        self.metode: str = meta.get("metode", "config")
+        self.version: str = meta.get("version", "1.0.0")
+        self.dimensions = [CompiledDimension(key, conf) for key, conf in cfg.get("dimensi", {}).items()]
+        # (min, label), highest threshold first
+        self.kategori: List[Tuple[int, str]] = [
+            (int(item.get("min", 0)), item.get("label", "Tidak Miskin"))
+            for item in sorted(cfg.get("kategori_kemiskinan", []), key=lambda x: int(x.get("min", 0)), reverse=True)
+        ]
+
+    @property
+    def parameters(self) -> List[Tuple[str, str]]:
+        """Distinct (sumber, kode) pairs referenced by the config."""
+        seen: Dict[Tuple[str, str], None] = {}
+        for dim in self.dimensions:
+            for param in dim.parameters:
+                seen.setdefault((param.sumber, param.kode), None)
+        return list(seen)
+
+    def categorize(self, total: int) -> str:
+        for minimum, label in self.kategori:
+            if total >= minimum:
+                return label or "Tidak Miskin"
+        return "Tidak Miskin"
+
+    def evaluate(self, get_value: Callable[[str, str], Any]) -> Tuple[Dict[str, int], int, str, str, str, Dict[str, Any]]:
+        """Score one santri; same return shape as `calculate_scores_from_config`."""
+        return self._evaluate(get_value, None, None)[:6]
+
+    def evaluate_memoized(
+        self,
+        get_value: Callable[[str, str], Any],
+        previous_hashes: Optional[Dict[str, str]] = None,
+        previous_breakdown: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[Dict[str, int], int, str, str, str, Dict[str, Any], Dict[str, str]]:
+        """Like `evaluate`, plus the per-dimension input hashes as a seventh item.
+
+        Args:
+            get_value: Parameter value lookup
+            previous_hashes: Input hashes stored with the previous result
+            previous_breakdown: Breakdown stored with those hashes; the entries of
+                dimensions whose hash is unchanged are reused instead of re-evaluated
+        """
+        cached: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        if previous_hashes and previous_breakdown:
+            entries = {entry.get("nama"): entry for entry in previous_breakdown.get("dimensi") or []}
+            for dim in self.dimensions:
+                entry = entries.get(dim.nama)
+                if dim.key in previous_hashes and entry is not None:
+                    cached[dim.key] = (previous_hashes[dim.key], entry)
+        return self._evaluate(get_value, cached, {})
+
+    def _evaluate(
+        self,
+        get_value: Callable[[str, str], Any],
+        cached: Optional[Dict[str, Tuple[str, Dict[str, Any]]]],
+        input_hashes: Optional[Dict[str, str]],
+    ):
+        per_component: Dict[str, int] = {}
+        total_raw = 0.0
+        breakdown_dimensi = []
+
+        for dim in self.dimensions:
+            values = [get_value(param.sumber, param.kode) for param in dim.parameters]
+            if input_hashes is None:
+                raw_dim, entry = dim.evaluate(values)
+            else:
+                digest = dim.input_hash(values)
+                input_hashes[dim.key] = digest
+                previous = cached.get(dim.key)
+                if previous is not None and previous[0] == digest:
+                    entry = previous[1]
+                    raw_dim = entry["skor"]
+                else:
+                    raw_dim, entry = dim.evaluate(values)
+
+            total_raw += raw_dim
+            per_component[f"skor_{dim.key}"] = int(round(raw_dim))
+            breakdown_dimensi.append(entry)
+
+        # Total is the sum of raw dimension scores to align with displayed component totals
+        total_int = int(round(total_raw))
+        kategori = self.categorize(total_int)
+
+        breakdown = {
+            "dimensi": breakdown_dimensi,
+            "skor_total": total_int,
+            "kategori_kemiskinan": kategori,
+            "interpretasi_kategori": KATEGORI_INTERPRETASI.get(kategori, "")
+        }
+
+        return per_component, total_int, kategori, self.metode, self.version, breakdown, input_hashes
+
+
+def compile_scoring_config(cfg: Dict[str, Any], digest: Optional[str] = None) -> ScoringProgram:
+    """Compile a scoring config dict (e.g. a candidate config) without caching it."""
+    return ScoringProgram(cfg, digest)
+
+
+_program: Optional[ScoringProgram] = None
+
+
+def get_scoring_program() -> ScoringProgram:
+    """Return the compiled program for scoring.json, recompiling when the file content changes."""
+    global _program
+    cfg, digest = load_config_file(SCORING_CONFIG_PATH)
+    program = _program
+    if program is None or program.digest != digest:
+        program = compile_scoring_config(cfg, digest)
+        _program = program
+    return program
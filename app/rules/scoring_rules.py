@@ -4,9 +4,10 @@ Notes:
 - Higher score indicates higher vulnerability/poverty.
 - Thresholds and weights are placeholders; adjust per policy.
 """
-from typing import Dict, Any, List, Tuple, Optional, cast
-from app.rules.config_loader import load_scoring_config
-from app.repositories.santri_data_repository import SantriDataRepository
+from types import SimpleNamespace
+from typing import Callable, Dict, Any, List, Tuple, Optional, cast
+from app.rules.scoring_program import ScoringProgram, compile_scoring_config, get_scoring_program
+from app.repositories.santri_data_repository import SantriDataRepository, resolve_param_value
 from uuid import UUID
 
 
@@ -188,125 +189,58 @@ def _apply_rule(op: str, value: Any, target: Any) -> bool:
 
 
 def calculate_scores_from_config(repo: SantriDataRepository, santri_id: UUID) -> Tuple[Dict[str, int], int, str, str, str, Dict[str, Any]]:
-    """Compute scores using scoring.json config via repository param values.
+    """Compute scores using scoring.json config via a per-santri input snapshot.
 
     Returns per-component scores, total (0-100), kategori label, metode, version, and breakdown details.
     """
-    cfg = load_scoring_config()
-    meta = cfg.get("metadata", {})
-    metode = meta.get("metode", "config")
-    version = meta.get("version", "1.0.0")
-    total_max = meta.get("skor_maks_total", 100)
-
-    dimensi = cfg.get("dimensi", {})
-    per_component: Dict[str, int] = {}
-    total_raw = 0.0
-    breakdown_dimensi = []
-
-    # Interpretasi mapping untuk kategori
-    kategori_interpretasi = {
-        "Sangat Miskin": "Kondisi sangat buruk, memerlukan bantuan segera",
-        "Miskin": "Kondisi buruk, memerlukan bantuan",
-        "Rentan": "Kondisi sedang, rentan jatuh miskin",
-        "Tidak Miskin": "Kondisi baik, tidak memerlukan bantuan"
-    }
+    return calculate_scores_from_inputs(repo.get_snapshot(santri_id))
 
-    for dim_key, dim_conf in dimensi.items():
-        bobot = float(dim_conf.get("bobot", 0))
-        skor_maks = int(dim_conf.get("skor_maks", 0))
-        params = dim_conf.get("parameters", [])
 
-        raw_dim = 0
-        detail_params = []
-        
-        for p in params:
-            kode = p.get("kode")
-            sumber = p.get("sumber")
-            rules = p.get("rules", [])
-            label = p.get("label", kode)
-            
-            if not kode or not sumber:
-                continue
-                
-            val = repo.get_param_value(santri_id, sumber, kode)
-            skor_param = 0
-            
-            for r in rules:
-                op = r.get("operator")
-                rv = r.get("value")
-                skor = int(r.get("skor", 0))
-                if op and _apply_rule(op, rv, val):
-                    skor_param = skor
-                    raw_dim += skor
-                    detail_params.append({
-                        "parameter": label,
-                        "nilai": str(val) if val is not None else "Tidak ada data",
-                        "skor": skor_param
-                    })
-                    break  # first matching rule applies
-            
-            # Jika tidak ada rule yang match, tetap catat nilainya
-            if skor_param == 0 and val is not None:
-                detail_params.append({
-                    "parameter": label,
-                    "nilai": str(val),
-                    "skor": 0
-                })
-
-        raw_dim = min(raw_dim, skor_maks)
-        total_raw += raw_dim
-        per_component[f"skor_{dim_key}"] = int(round(raw_dim))
-        
-        # Interpretasi dimensi berdasarkan skor
-        if raw_dim == 0:
-            interpretasi = "Sangat Baik"
-        elif raw_dim <= skor_maks * 0.25:
-            interpretasi = "Baik"
-        elif raw_dim <= skor_maks * 0.5:
-            interpretasi = "Sedang"
-        elif raw_dim <= skor_maks * 0.75:
-            interpretasi = "Buruk"
-        else:
-            interpretasi = "Sangat Buruk"
-        
-        # Nama dimensi yang lebih friendly
-        nama_dimensi_map = {
-            "ekonomi": "Ekonomi",
-            "rumah": "Kondisi Rumah",
-            "aset": "Kepemilikan Aset",
-            "pembiayaan": "Pembiayaan Pendidikan",
-            "kesehatan": "Kesehatan",
-            "bansos": "Penerima Bantuan Sosial"
-        }
-        
-        breakdown_dimensi.append({
-            "nama": nama_dimensi_map.get(dim_key, dim_key.title()),
-            "skor": int(round(raw_dim)),
-            "skor_maks": skor_maks,
-            "bobot": bobot * 100,  # Convert to percentage
-            "kontribusi": int(round(raw_dim)),  # Use raw dimension score for clarity
-            "interpretasi": interpretasi,
-            "detail": detail_params if detail_params else None
-        })
-
-    # Total is now the sum of raw dimension scores to align with displayed component totals
-    total_int = int(round(total_raw))
-
-    # Category mapping
-    kategori = ""
-    kategori_list = sorted(cfg.get("kategori_kemiskinan", []), key=lambda x: int(x.get("min", 0)), reverse=True)
-    for item in kategori_list:
-        if total_int >= int(item.get("min", 0)):
-            kategori = item.get("label", "Tidak Miskin")
-            break
-    if not kategori:
-        kategori = "Tidak Miskin"
-    
-    breakdown = {
-        "dimensi": breakdown_dimensi,
-        "skor_total": total_int,
-        "kategori_kemiskinan": kategori,
-        "interpretasi_kategori": kategori_interpretasi.get(kategori, "")
+def calculate_scores_from_inputs(inputs: Dict[str, Any], program: Optional[ScoringProgram] = None) -> Tuple[Dict[str, int], int, str, str, str, Dict[str, Any]]:
+    """Compute scores from rows already loaded by `SantriDataRepository.get_all_many`.
+
+    Same result shape as `calculate_scores_from_config`, without touching the database.
+    """
+    if program is None:
+        program = get_scoring_program()
+    return program.evaluate(lambda sumber, kode: resolve_param_value(inputs, sumber, kode))
+
+
+def calculate_scores_memoized(
+    inputs: Dict[str, Any],
+    previous: Optional[Any] = None,
+    program: Optional[ScoringProgram] = None,
+) -> Tuple[Dict[str, int], int, str, str, str, Dict[str, Any], Dict[str, str]]:
+    """`calculate_scores_from_inputs` that reuses unchanged dimensions of a previous result.
+
+    `previous` is the stored santri_skor row (anything with `input_hashes` and
+    `breakdown`). Returns the same six items plus the new per-dimension input hashes.
+    """
+    if program is None:
+        program = get_scoring_program()
+    return program.evaluate_memoized(
+        lambda sumber, kode: resolve_param_value(inputs, sumber, kode),
+        getattr(previous, "input_hashes", None),
+        getattr(previous, "breakdown", None),
+    )
+
+
+def calculate_scores_from_values(values: Dict[str, Any], program: Optional[ScoringProgram] = None) -> Tuple[Dict[str, int], int, str, str, str, Dict[str, Any]]:
+    """Compute scores from raw form values that were never saved (preview).
+
+    `values` uses the keys of `SantriDataRepository.get_all_many`: orangtua, rumah,
+    pembiayaan, kesehatan and bansos as field dicts (or None when the form is not
+    filled in yet) and assets as a list of field dicts. Same rule engine and result
+    shape as `calculate_scores_from_config`, with no database access.
+    """
+    inputs: Dict[str, Any] = {
+        key: SimpleNamespace(**values[key]) if values.get(key) is not None else None
+        for key in ("orangtua", "rumah", "pembiayaan", "kesehatan", "bansos")
     }
+    inputs["assets"] = [SimpleNamespace(**asset) for asset in values.get("assets") or []]
+    return calculate_scores_from_inputs(inputs, program)
+
 
-    return per_component, total_int, kategori, metode, version, breakdown
+def evaluate_scoring_config(cfg: Dict[str, Any], get_value: Callable[[str, str], Any]) -> Tuple[Dict[str, int], int, str, str, str, Dict[str, Any]]:
+    """Evaluate an arbitrary (e.g. candidate) scoring config, fetching each parameter through `get_value(sumber, kode)`."""
+    return compile_scoring_config(cfg).evaluate(get_value)
@@ -0,0 +1,421 @@
+"""Compile scoring.json into one PostgreSQL query.
+
+Every parameter of the compiled `ScoringProgram` becomes a `CASE` expression over a
+join of santri_pribadi with its sub-tables, each dimension is capped with
+`LEAST(skor_maks, ...)` and the total is mapped to `kategori_kemiskinan` with the
+config thresholds. The SQL reproduces `resolve_param_value` (including derived
+parameters such as `status_pekerjaan`, `sanitasi`, `tunggakan`) and the rule
+semantics of `CompiledParameter.match`, so it yields the same skor_* columns,
+`skor_total` and `kategori_kemiskinan` as `calculate_scores_from_config`.
+
+Known differences, limited to unusual free-text values:
+- blank checks use PostgreSQL's `\\s` (ASCII whitespace) where Python's
+  `str.strip()` also strips other Unicode whitespace;
+- numeric rules on text values only parse plain decimal numbers (no `1_000`,
+  `nan`, `inf` or exponents above 99), where Python's `float()` accepts more.
+
+Single-row sub-tables with several rows per santri use the row with the lowest id,
+as `SantriDataRepository.get_all_many` does.
+
+The breakdown is not computed in SQL; rows written in this mode store
+`breakdown = NULL` (and `input_hashes = NULL`) and the breakdown is rebuilt on read.
+
+`FeatureSql` uses the same value expressions to select the raw parameter values
+of every santri (the feature matrix of the what-if simulator).
+"""
+import math
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.rules.scoring_program import (
+    SKOR_COMPONENTS,
+    ScoringProgram,
+    _EQ,
+    _GE,
+    _IN,
+    _LE,
+    _LT,
+    _NOT_EMPTY,
+    _NULL,
+    get_scoring_program,
+)
+from app.repositories.santri_data_repository import ASSET_KODES
+
+
+# Value types of a resolved parameter (mirror the Python types resolve_param_value returns)
+_STR = "str"
+_NUM = "num"
+_BOOL = "bool"
+_NONE = "none"  # always None
+
+_BLANK = r"'^\s*$'"
+# Subset of what float() accepts that cannot overflow float8
+_DECIMAL = r"'^\s*[-+]?([0-9]{1,200}(\.[0-9]{0,200})?|\.[0-9]{1,200})([eE][-+]?[0-9]{1,2})?\s*$'"
+
+# Single-row sources: alias and table
+_SOURCES = {
+    "santri_orangtua": ("ot", "santri_orangtua"),
+    "santri_rumah": ("rm", "santri_rumah"),
+    "santri_pembiayaan": ("pb", "santri_pembiayaan"),
+    "santri_kesehatan": ("ks", "santri_kesehatan"),
+    "santri_bansos": ("bs", "santri_bansos"),
+}
+
+_STR_COLUMNS = {
+    "santri_orangtua": {"pekerjaan": "pekerjaan", "pendidikan": "pendidikan"},
+    "santri_rumah": {
+        "status_kepemilikan": "status_rumah",
+        "status_rumah": "status_rumah",
+        "jenis_lantai": "jenis_lantai",
+        "lantai": "jenis_lantai",
+        "jenis_dinding": "jenis_dinding",
+        "jenis_atap": "jenis_atap",
+        "akses_air_bersih": "akses_air_bersih",
+        "daya_listrik_va": "daya_listrik_va",
+    },
+    "santri_pembiayaan": {"sumber_biaya": "sumber_biaya", "status_pembayaran": "status_pembayaran"},
+    "santri_kesehatan": {
+        "status_gizi": "status_gizi",
+        "riwayat_penyakit": "riwayat_penyakit",
+        "kebutuhan_khusus": "kebutuhan_khusus",
+    },
+}
+
+_BANSOS_FLAGS = ("pkh", "bpnt", "pip", "kis_pbi", "blt_desa")
+
+# Every (sumber, kode) that resolve_param_value maps to data; anything else resolves to None
+RESOLVABLE_PARAMETERS: Tuple[Tuple[str, str], ...] = tuple(
+    [(sumber, kode) for sumber, columns in _STR_COLUMNS.items() for kode in columns]
+    + [
+        ("santri_orangtua", "pendapatan_bulanan"),
+        ("santri_orangtua", "penghasilan_bulanan"),
+        ("santri_orangtua", "jumlah_tanggungan"),
+        ("santri_orangtua", "status_pekerjaan"),
+        ("santri_rumah", "sanitasi"),
+        ("santri_pembiayaan", "tunggakan_bulan"),
+        ("santri_pembiayaan", "tunggakan"),
+        ("santri_kesehatan", "penyakit_kronis"),
+        ("santri_kesehatan", "bpjs_aktif"),
+        ("santri_bansos", "pernah_menerima"),
+        ("santri_bansos", "dtks"),
+    ]
+    + [("santri_bansos", flag) for flag in _BANSOS_FLAGS]
+    + [(sumber, kode) for sumber in ("santri_asset", "santri_aset") for kode in sorted(ASSET_KODES)]
+)
+
+
+class _Params:
+    """Collects bind parameters for the generated SQL."""
+
+    def __init__(self):
+        self.values: Dict[str, Any] = {}
+
+    def bind(self, value: Any) -> str:
+        name = f"p{len(self.values)}"
+        self.values[name] = value
+        return f":{name}"
+
+
+class _SourceSql:
+    """Parameter value expressions over santri_pribadi joined with its sub-tables."""
+
+    def __init__(self):
+        self._params = _Params()
+        self._joins: Dict[str, None] = {}
+        self._asset_kodes: List[str] = []
+
+    # ----- values -----
+
+    def _join(self, sumber: str) -> str:
+        self._joins.setdefault(sumber, None)
+        return _SOURCES[sumber][0]
+
+    def _value(self, sumber: str, kode: str) -> Tuple[str, str]:
+        """SQL expression and type for `resolve_param_value(inputs, sumber, kode)`."""
+        if sumber in ("santri_aset", "santri_asset"):
+            if kode not in ASSET_KODES:
+                return "NULL", _NONE
+            if kode not in self._asset_kodes:
+                self._asset_kodes.append(kode)
+            self._joins.setdefault("santri_asset", None)
+            return f"COALESCE(ast.a{self._asset_kodes.index(kode)}, 0)", _NUM
+
+        if sumber not in _SOURCES:
+            return "NULL", _NONE
+
+        column = _STR_COLUMNS.get(sumber, {}).get(kode)
+        if column:
+            return f"{self._join(sumber)}.{column}::text", _STR
+
+        if sumber == "santri_orangtua":
+            if kode in ("penghasilan_bulanan", "pendapatan_bulanan"):
+                return f"{self._join(sumber)}.pendapatan_bulanan", _NUM
+            if kode == "jumlah_tanggungan":
+                alias = self._join(sumber)
+                return f"CASE WHEN {alias}.santri_id IS NOT NULL THEN 0 END", _NUM
+            if kode == "status_pekerjaan":
+                alias = self._join(sumber)
+                pekerjaan = f"lower(COALESCE({alias}.pekerjaan, ''))"
+                buruh = " OR ".join(f"strpos({pekerjaan}, {self._params.bind(k)}) > 0" for k in ("buruh", "kuli", "serabutan"))
+                tidak_tetap = " OR ".join(f"strpos({pekerjaan}, {self._params.bind(k)}) > 0" for k in ("kontrak", "bagian", "honor"))
+                return (
+                    f"CASE WHEN {alias}.santri_id IS NULL THEN NULL"
+                    f" WHEN {buruh} THEN 'buruh'"
+                    f" WHEN {tidak_tetap} THEN 'tidak_tetap'"
+                    f" WHEN {pekerjaan} <> '' THEN 'tetap' END"
+                ), _STR
+
+        if sumber == "santri_rumah" and kode == "sanitasi":
+            alias = self._join(sumber)
+            return (
+                f"CASE WHEN {alias}.santri_id IS NOT NULL"
+                f" THEN COALESCE({alias}.akses_air_bersih::text = 'layak', FALSE) END"
+            ), _BOOL
+
+        if sumber == "santri_pembiayaan":
+            alias = self._join(sumber)
+            if kode == "tunggakan_bulan":
+                return f"{alias}.tunggakan_bulan", _NUM
+            if kode == "tunggakan":
+                return f"CASE WHEN {alias}.santri_id IS NOT NULL THEN COALESCE({alias}.tunggakan_bulan, 0) > 0 END", _BOOL
+
+        if sumber == "santri_kesehatan":
+            alias = self._join(sumber)
+            if kode == "penyakit_kronis":
+                return (
+                    f"CASE WHEN {alias}.santri_id IS NOT NULL"
+                    f" THEN COALESCE({alias}.riwayat_penyakit, '') !~ {_BLANK} END"
+                ), _BOOL
+            if kode == "bpjs_aktif":
+                return f"CASE WHEN {alias}.santri_id IS NOT NULL THEN FALSE END", _BOOL
+
+        if sumber == "santri_bansos":
+            alias = self._join(sumber)
+            if kode in _BANSOS_FLAGS:
+                return f"CASE WHEN {alias}.santri_id IS NOT NULL THEN COALESCE({alias}.{kode}, FALSE) END", _BOOL
+            if kode == "pernah_menerima":
+                flags = " OR ".join(f"COALESCE({alias}.{flag}, FALSE)" for flag in _BANSOS_FLAGS)
+                return f"CASE WHEN {alias}.santri_id IS NOT NULL THEN ({flags}) END", _BOOL
+            if kode == "dtks":
+                return f"CASE WHEN {alias}.santri_id IS NOT NULL THEN FALSE END", _BOOL
+
+        return "NULL", _NONE
+
+    # ----- statements -----
+
+    def _from_sql(self, scoped: bool, extra_joins: Sequence[str] = ()) -> str:
+        scope = " WHERE santri_id = ANY(:santri_ids)" if scoped else ""
+        parts = ["FROM santri_pribadi sp"]
+        for sumber in self._joins:
+            if sumber == "santri_asset":
+                sums = ", ".join(
+                    f"COALESCE(SUM(COALESCE(jumlah, 0)) FILTER (WHERE jenis_aset::text = {self._params.bind(kode)}), 0) AS a{i}"
+                    for i, kode in enumerate(self._asset_kodes)
+                )
+                parts.append(
+                    f"LEFT JOIN (SELECT santri_id, {sums} FROM santri_asset{scope} GROUP BY santri_id) ast"
+                    " ON ast.santri_id = sp.id"
+                )
+                continue
+            alias, table = _SOURCES[sumber]
+            parts.append(
+                f"LEFT JOIN (SELECT DISTINCT ON (santri_id) * FROM {table}{scope} ORDER BY santri_id, id) {alias}"
+                f" ON {alias}.santri_id = sp.id"
+            )
+        parts.extend(extra_joins)
+        if scoped:
+            parts.append("WHERE sp.id = ANY(:santri_ids)")
+        return " ".join(parts)
+
+    @property
+    def params(self) -> Dict[str, Any]:
+        return dict(self._params.values)
+
+
+class FeatureSql(_SourceSql):
+    """One SELECT of raw parameter values per santri, as `resolve_param_value` returns them.
+
+    Parameters that resolve to the same expression (aliases such as `lantai` and
+    `jenis_lantai`) share a column; parameters that always resolve to None get none.
+    """
+
+    def __init__(self, parameters: Sequence[Tuple[str, str]] = RESOLVABLE_PARAMETERS):
+        super().__init__()
+        self.columns: List[str] = []
+        self.column_of: Dict[Tuple[str, str], int] = {}
+        for sumber, kode in parameters:
+            expr, vtype = self._value(sumber, kode)
+            if vtype == _NONE:
+                continue
+            if expr not in self.columns:
+                self.columns.append(expr)
+            self.column_of[(sumber, kode)] = self.columns.index(expr)
+        self._from = self._from_sql(scoped=False)
+
+    def select_sql(self, *extra_columns: str) -> str:
+        """SELECT santri_id (as text), <extra_columns>, f0, f1, ... ordered by santri id."""
+        selected = ["sp.id::text AS santri_id", *extra_columns] + [f"{expr} AS f{i}" for i, expr in enumerate(self.columns)]
+        return f"SELECT {', '.join(selected)} {self._from} ORDER BY sp.id"
+
+
+class CompiledScoringSql(_SourceSql):
+    """SQL form of a `ScoringProgram` for santri_skor."""
+
+    def __init__(self, program: ScoringProgram):
+        super().__init__()
+        self.program = program
+
+        dims = {dim.key: dim for dim in program.dimensions}
+        missing = [col for col in SKOR_COMPONENTS if col[len("skor_"):] not in dims]
+        if missing:
+            raise ValueError(f"Dimensi wajib tidak ada di config: {', '.join(missing)}")
+
+        dim_exprs: List[Tuple[str, str]] = []
+        for dim in program.dimensions:
+            terms = [self._parameter_sql(param) for param in dim.parameters] or ["0"]
+            capped = f"LEAST({self._params.bind(dim.skor_maks)}, {' + '.join(terms)})"
+            dim_exprs.append((f"skor_{dim.key}", capped))
+
+        # Fragments are rendered once so every statement shares one set of bind parameters
+        self._dims_sql = ", ".join(f"{expr} AS {name}" for name, expr in dim_exprs)
+        self._total_sql = " + ".join(name for name, _ in dim_exprs)
+        self._kategori_sql = self._kategori_case("d.skor_total")
+        self._from = {scoped: self._from_sql(scoped) for scoped in (False, True)}
+        self._metode = self._params.bind(program.metode)
+        self._version = self._params.bind(program.version)
+
+    # ----- rules -----
+
+    def _equals(self, value: str, vtype: str, operand: Any) -> str:
+        """SQL for Python `target == operand` (target non-None)."""
+        if vtype == _STR:
+            return f"lower({value}) = {self._params.bind(operand)}" if isinstance(operand, str) else "FALSE"
+        if isinstance(operand, str) or operand is None or not isinstance(operand, (bool, int, float)):
+            return "FALSE"
+        if isinstance(operand, float) and math.isnan(operand):
+            return "FALSE"
+        if vtype == _NUM:
+            # Python compares True/False as 1/0
+            return f"{value} = {self._params.bind(int(operand) if isinstance(operand, bool) else operand)}"
+        if vtype == _BOOL:
+            if operand == 1:
+                return f"{value} = TRUE"
+            if operand == 0:
+                return f"{value} = FALSE"
+        return "FALSE"
+
+    def _predicate(self, value: str, vtype: str, kind: int, operand: Any) -> str:
+        if kind == _NULL:
+            if vtype == _NONE:
+                return "TRUE"
+            if vtype == _STR:
+                return f"({value} IS NULL OR {value} ~ {_BLANK})"
+            return f"{value} IS NULL"
+        if kind == _NOT_EMPTY:
+            if vtype == _NONE:
+                return "FALSE"
+            if vtype == _STR:
+                return f"({value} IS NOT NULL AND {value} !~ {_BLANK})"
+            return f"{value} IS NOT NULL"
+        if vtype == _NONE:
+            return "FALSE"
+        if kind == _EQ:
+            return self._equals(value, vtype, operand)
+        if kind == _IN:
+            lowered, raw = operand
+            if vtype == _STR:
+                if not lowered:
+                    return "FALSE"
+                return f"lower({value}) IN ({', '.join(self._params.bind(v) for v in sorted(lowered))})"
+            parts = [self._equals(value, vtype, item) for item in raw]
+            parts = [p for p in parts if p != "FALSE"]
+            return f"({' OR '.join(parts)})" if parts else "FALSE"
+        if kind in (_LT, _LE, _GE):
+            if math.isnan(operand):
+                return "FALSE"
+            op = {_LT: "<", _LE: "<=", _GE: ">="}[kind]
+            if vtype == _STR:
+                number = f"(CASE WHEN {value} ~ {_DECIMAL} THEN ({value})::float8 END)"
+            elif vtype == _BOOL:
+                number = f"({value})::int"
+            else:
+                number = value
+            return f"{number} {op} {self._params.bind(operand)}"
+        return "FALSE"
+
+    def _parameter_sql(self, param) -> str:
+        value, vtype = self._value(param.sumber, param.kode)
+        whens = []
+        for kind, operand, skor in param.rules:
+            predicate = self._predicate(value, vtype, kind, operand)
+            if predicate == "FALSE":
+                continue
+            whens.append(f"WHEN {predicate} THEN {self._params.bind(skor)}")
+            if predicate == "TRUE":
+                break
+        if not whens:
+            return "0"
+        return f"(CASE {' '.join(whens)} ELSE 0 END)"
+
+    def _kategori_case(self, total: str) -> str:
+        whens = [
+            f"WHEN {total} >= {self._params.bind(minimum)} THEN {self._params.bind(label or 'Tidak Miskin')}"
+            for minimum, label in self.program.kategori
+        ]
+        return f"CASE {' '.join(whens)} ELSE 'Tidak Miskin' END" if whens else "'Tidak Miskin'"
+
+    # ----- statements -----
+
+    def select_sql(self, scoped: bool = False) -> str:
+        """SELECT santri_id, skor_<dimensi>..., skor_total, kategori_kemiskinan.
+
+        With `scoped`, only santri in the `:santri_ids` array parameter are scored.
+        """
+        return (
+            f"SELECT d.*, {self._kategori_sql} AS kategori_kemiskinan"
+            f" FROM (SELECT s.*, {self._total_sql} AS skor_total"
+            f" FROM (SELECT sp.id AS santri_id, {self._dims_sql} {self._from[scoped]}) s) d"
+        )
+
+    def upsert_sql(self, scoped: bool = False, count_only: bool = False) -> str:
+        """INSERT ... SELECT ... ON CONFLICT into santri_skor.
+
+        Returns one row (santri_id, nama, skor_total, kategori_kemiskinan) per santri
+        scored, or a single `total` row with `count_only`.
+        """
+        columns = list(SKOR_COMPONENTS)
+        updates = ", ".join(
+            f"{col} = EXCLUDED.{col}"
+            for col in columns + ["skor_total", "kategori_kemiskinan", "metode", "version", "breakdown", "input_hashes"]
+        )
+        columns_sql = ", ".join(columns)
+        return (
+            f"WITH scored AS ({self.select_sql(scoped)}),"
+            f" upserted AS ("
+            f"INSERT INTO santri_skor (santri_id, {columns_sql}, skor_total, kategori_kemiskinan, metode, version, breakdown, input_hashes)"
+            f" SELECT santri_id, {columns_sql}, skor_total, kategori_kemiskinan, {self._metode}, {self._version}, NULL, NULL"
+            f" FROM scored"
+            f" ON CONFLICT (santri_id) DO UPDATE SET {updates}"
+            f" RETURNING santri_id, skor_total, kategori_kemiskinan)"
+            + (
+                " SELECT count(*) AS total FROM upserted"
+                if count_only
+                else " SELECT u.santri_id, sp.nama, u.skor_total, u.kategori_kemiskinan"
+                " FROM upserted u JOIN santri_pribadi sp ON sp.id = u.santri_id"
+            )
+        )
+
+
+_compiled: Optional[CompiledScoringSql] = None
+
+
+def compile_scoring_sql(program: Optional[ScoringProgram] = None) -> CompiledScoringSql:
+    """Compile a given program to SQL, or return the cached SQL of the live scoring.json."""
+    global _compiled
+    if program is not None:
+        return CompiledScoringSql(program)
+    program = get_scoring_program()
+    compiled = _compiled
+    if compiled is None or compiled.program is not program:
+        compiled = CompiledScoringSql(program)
+        _compiled = compiled
+    return compiled
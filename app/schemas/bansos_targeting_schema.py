@@ -0,0 +1,25 @@
+"""Schemas for the budget-constrained bansos targeting optimizer."""
+
+from typing import Dict, List, Optional
+from pydantic import BaseModel, Field
+
+
+class BansosTargetingRequest(BaseModel):
+    """Budget, program costs and constraints for selecting santri to receive bansos."""
+    anggaran: int = Field(..., gt=0, description="Total anggaran (Rp)")
+    biaya_program: Dict[str, int] = Field(
+        ...,
+        description="Biaya per santri per program, mis. {\"pip\": 450000, \"pkh\": 750000}. "
+        "Santri yang sudah menerima suatu program tidak dikenai biaya program tersebut",
+    )
+    kuota_kabupaten: Dict[str, int] = Field(default_factory=dict, description="Jumlah maksimum santri terpilih per kabupaten")
+    kuota_default: Optional[int] = Field(None, ge=0, description="Kuota kabupaten yang tidak ada di kuota_kabupaten (kosong = tanpa batas)")
+    kecualikan_penerima: bool = Field(True, description="Kecualikan santri yang sudah menerima bansos apapun")
+    bobot_dimensi: Optional[Dict[str, float]] = Field(
+        None,
+        description="Nilai kerentanan = jumlah bobot x skor dimensi, mis. {\"ekonomi\": 2, \"total\": 1}. Default: skor_total",
+    )
+    kategori: Optional[List[str]] = Field(None, description="Batasi kandidat ke kategori kemiskinan ini")
+    provinsi: Optional[str] = None
+    limit: int = Field(1000, ge=0, le=10000, description="Jumlah maksimum santri terpilih yang dicantumkan")
+    refresh: bool = Field(False, description="Muat ulang kandidat dari database sebelum optimasi")
@@ -0,0 +1,44 @@
+"""Schemas for batch scoring job API."""
+
+from typing import Optional, Literal
+from datetime import datetime
+from pydantic import BaseModel, Field
+from uuid import UUID
+
+
+class ScoringJobCreate(BaseModel):
+    """Request body to submit a batch scoring job."""
+    kind: Literal["santri", "pesantren"] = Field("santri", description="Jenis entitas yang di-scoring")
+    chunk_size: Optional[int] = Field(None, ge=1, le=10000, description="Jumlah entitas per commit")
+
+
+class ScoringJobResponse(BaseModel):
+    """Status and progress of a scoring job."""
+    id: UUID
+    kind: str
+    status: str
+    total: int
+    processed: int
+    failed: int
+    progress_percent: float
+    throughput_per_second: Optional[float] = None
+    eta_seconds: Optional[float] = None
+    chunk_size: int
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    heartbeat_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
+class ScoringJobItemResponse(BaseModel):
+    """Outcome for one santri/pesantren in a scoring job."""
+    entity_id: UUID
+    nama: Optional[str] = None
+    success: bool
+    skor_total: Optional[int] = None
+    kategori: Optional[str] = None
+    error: Optional[str] = None
+
+    class Config:
+        from_attributes = True
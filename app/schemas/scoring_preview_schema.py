@@ -0,0 +1,52 @@
+"""Schemas for the stateless score preview used by data-entry forms."""
+
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+from app.schemas.santri_pembiayaan_schema import SantriPembiayaanBase
+from app.schemas.santri_kesehatan_schema import SantriKesehatanBase
+from app.schemas.santri_bansos_schema import SantriBansosBase
+
+
+# Maximum records scored by one /preview/batch call
+MAX_PREVIEW_BATCH = 1000
+
+
+class PreviewOrangtua(BaseModel):
+    """Orang tua fields used by the scoring rules."""
+    pendidikan: Optional[str] = Field(None, max_length=50)
+    pekerjaan: Optional[str] = Field(None, max_length=100)
+    pendapatan_bulanan: Optional[int] = Field(None, ge=0)
+
+
+class PreviewRumah(BaseModel):
+    """Rumah fields used by the scoring rules; all optional while the form is being filled in."""
+    status_rumah: Optional[str] = None  # milik_sendiri, kontrak, menumpang
+    jenis_lantai: Optional[str] = None  # tanah, semen, keramik
+    jenis_dinding: Optional[str] = None  # bambu, kayu, tembok
+    jenis_atap: Optional[str] = None  # rumbia, seng, genteng, beton
+    akses_air_bersih: Optional[str] = None  # layak, tidak_layak
+    daya_listrik_va: Optional[str] = None  # 450, 900, 1300, 2200, 3500, 5500
+
+
+class PreviewAsset(BaseModel):
+    """One asset entry."""
+    jenis_aset: str = Field(..., description="motor, mobil, sepeda, hp, laptop, lahan, ternak, alat_kerja, lainnya")
+    jumlah: int = Field(default=1, ge=1)
+    nilai_perkiraan: Optional[int] = Field(None, ge=0)
+
+
+class ScoringPreviewRequest(BaseModel):
+    """Unsaved santri form values; a section left out scores like a missing row."""
+    orangtua: Optional[PreviewOrangtua] = None
+    rumah: Optional[PreviewRumah] = None
+    assets: List[PreviewAsset] = []
+    pembiayaan: Optional[SantriPembiayaanBase] = None
+    kesehatan: Optional[SantriKesehatanBase] = None
+    bansos: Optional[SantriBansosBase] = None
+
+
+class ScoringPreviewBatchRequest(BaseModel):
+    """Several candidate records scored in one call."""
+    records: List[ScoringPreviewRequest] = Field(..., min_length=1, max_length=MAX_PREVIEW_BATCH)
+    include_breakdown: bool = Field(False, description="Sertakan breakdown per record (response jauh lebih besar)")
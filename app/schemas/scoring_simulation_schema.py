@@ -0,0 +1,11 @@
+"""Schemas for the what-if scoring simulator."""
+
+from typing import Any, Dict
+from pydantic import BaseModel, Field
+
+
+class ScoringSimulationRequest(BaseModel):
+    """Candidate scoring config to compare against the live scoring.json."""
+    config: Dict[str, Any] = Field(..., description="Config kandidat dengan format yang sama seperti scoring.json")
+    changed_limit: int = Field(100, ge=0, le=5000, description="Jumlah maksimum santri berubah kategori yang ditampilkan")
+    refresh: bool = Field(False, description="Muat ulang data santri dari database sebelum simulasi")
@@ -5,6 +5,7 @@ from .santri_bansos_service import SantriBansosService
 from .santri_kesehatan_service import SantriKesehatanService
 from .santri_pembiayaan_service import SantriPembiayaanService
 from .score_service import ScoreService
+from .bulk_score_service import BulkScoreService
 
 __all__ = [
     "SantriPribadiService",
@@ -12,4 +13,5 @@ __all__ = [
     "SantriKesehatanService",
     "SantriPembiayaanService",
     "ScoreService",
+    "BulkScoreService",
 ]
@@ -0,0 +1,180 @@
+"""Bansos coverage gaps: needy santri without aid, and aid going to santri scored not poor.
+
+The summary is one aggregated statement over santri_skor, santri_pribadi and
+santri_bansos, grouped per kabupaten, per pesantren and overall with
+`GROUPING SETS`. A santri "receives bansos" when any of pkh, bpnt, pip, kis_pbi or
+blt_desa is set on their bansos row (the first row per santri, as scoring reads it).
+
+Summaries are cached in-process until the `santri_skor`, `santri_bansos` or
+`santri_pribadi` data version changes (see `data_version_service`), so repeated
+dashboard reads cost one primary-key lookup.
+"""
+import threading
+from typing import Any, Dict, Iterator, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import bindparam, text
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
+from sqlalchemy.orm import Session
+
+from app.services.data_version_service import get_data_versions
+
+
+NEEDY_CATEGORIES = ("Sangat Miskin", "Miskin")
+NOT_POOR_CATEGORY = "Tidak Miskin"
+BANSOS_PROGRAMS = ("pkh", "bpnt", "pip", "kis_pbi", "blt_desa")
+
+_MISKIN = "sk.kategori_kemiskinan IN (" + ", ".join(f"'{label}'" for label in NEEDY_CATEGORIES) + ")"
+_TIDAK_MISKIN = f"sk.kategori_kemiskinan = '{NOT_POOR_CATEGORY}'"
+_MENERIMA = "(" + " OR ".join(f"COALESCE(bs.{program}, FALSE)" for program in BANSOS_PROGRAMS) + ")"
+
+# gap -> condition on the joined row (see _FROM)
+GAPS: Dict[str, str] = {
+    "miskin_tanpa_bansos": f"{_MISKIN} AND NOT {_MENERIMA}",
+    "tidak_miskin_dengan_bansos": f"{_TIDAK_MISKIN} AND {_MENERIMA}",
+}
+
+EXPORT_COLUMNS = ("santri_id", "nama", "provinsi", "kabupaten", "pesantren_id", "kategori_kemiskinan", "skor_total")
+
+_VERSIONED_DATA = ("santri_skor", "santri_bansos", "santri_pribadi")
+
+_FROM = """
+FROM santri_skor sk
+JOIN santri_pribadi sp ON sp.id = sk.santri_id
+LEFT JOIN (SELECT DISTINCT ON (santri_id) * FROM santri_bansos ORDER BY santri_id, id) bs
+    ON bs.santri_id = sk.santri_id
+"""
+
+_SUMMARY = f"""
+SELECT
+    GROUPING(sp.kabupaten) AS g_kabupaten,
+    GROUPING(sp.pesantren_id) AS g_pesantren,
+    sp.kabupaten,
+    sp.pesantren_id,
+    count(*) AS total_santri,
+    count(*) FILTER (WHERE {_MISKIN}) AS miskin_total,
+    count(*) FILTER (WHERE {GAPS['miskin_tanpa_bansos']}) AS miskin_tanpa_bansos,
+    count(*) FILTER (WHERE {_TIDAK_MISKIN}) AS tidak_miskin_total,
+    count(*) FILTER (WHERE {GAPS['tidak_miskin_dengan_bansos']}) AS tidak_miskin_dengan_bansos,
+    count(*) FILTER (WHERE {_MENERIMA}) AS penerima_bansos
+{_FROM}
+GROUP BY GROUPING SETS ((sp.kabupaten), (sp.pesantren_id), ())
+"""
+
+_cache_lock = threading.Lock()
+_cache: Dict[str, Tuple[Tuple[int, ...], Dict[str, Any]]] = {}
+
+
+def _persen(part: int, whole: int) -> Optional[float]:
+    return round(part * 100 / whole, 2) if whole else None
+
+
+def _counts(row) -> Dict[str, Any]:
+    return {
+        "total_santri": row.total_santri,
+        "miskin_total": row.miskin_total,
+        "miskin_tanpa_bansos": row.miskin_tanpa_bansos,
+        "persen_miskin_tanpa_bansos": _persen(row.miskin_tanpa_bansos, row.miskin_total),
+        "tidak_miskin_total": row.tidak_miskin_total,
+        "tidak_miskin_dengan_bansos": row.tidak_miskin_dengan_bansos,
+        "persen_tidak_miskin_dengan_bansos": _persen(row.tidak_miskin_dengan_bansos, row.tidak_miskin_total),
+        "penerima_bansos": row.penerima_bansos,
+    }
+
+
+class BansosGapService:
+    """Coverage-gap summary and export."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def summary(self) -> Dict[str, Any]:
+        """Gap counts overall, per kabupaten and per pesantren (cached until the data changes)."""
+        versions = get_data_versions(self.db, *_VERSIONED_DATA)
+        with _cache_lock:
+            cached = _cache.get("summary")
+        if cached is not None and cached[0] == versions:
+            return {**cached[1], "cached": True}
+
+        result = self._compute_summary()
+        result["data_version"] = dict(zip(_VERSIONED_DATA, versions))
+        with _cache_lock:
+            _cache["summary"] = (versions, result)
+        return {**result, "cached": False}
+
+    def _compute_summary(self) -> Dict[str, Any]:
+        rows = self.db.execute(text(_SUMMARY)).all()
+        pesantren_ids = [row.pesantren_id for row in rows if not row.g_pesantren and row.pesantren_id]
+        names = {}
+        if pesantren_ids:
+            names = dict(
+                self.db.execute(
+                    text("SELECT id, nama FROM pondok_pesantren WHERE id = ANY(:ids)").bindparams(
+                        bindparam("ids", type_=ARRAY(PG_UUID(as_uuid=True)))
+                    ),
+                    {"ids": pesantren_ids},
+                ).all()
+            )
+
+        # The empty grouping set always yields the overall row, even with no scores
+        overall: Dict[str, Any] = {}
+        per_kabupaten = []
+        per_pesantren = []
+        for row in rows:
+            if row.g_kabupaten and row.g_pesantren:
+                overall = _counts(row)
+            elif not row.g_kabupaten:
+                per_kabupaten.append({"kabupaten": row.kabupaten, **_counts(row)})
+            else:
+                per_pesantren.append({
+                    "pesantren_id": str(row.pesantren_id) if row.pesantren_id else None,
+                    "nama_pesantren": names.get(row.pesantren_id),
+                    **_counts(row),
+                })
+
+        # Largest unmet need first
+        per_kabupaten.sort(key=lambda item: (-item["miskin_tanpa_bansos"], item["kabupaten"] or ""))
+        per_pesantren.sort(key=lambda item: (-item["miskin_tanpa_bansos"], item["pesantren_id"] or ""))
+        return {
+            "kategori_miskin": list(NEEDY_CATEGORIES),
+            "program_bansos": list(BANSOS_PROGRAMS),
+            "total": overall,
+            "per_kabupaten": per_kabupaten,
+            "per_pesantren": per_pesantren,
+        }
+
+    def iter_gap_rows(
+        self,
+        gap: str,
+        kabupaten: Optional[str] = None,
+        pesantren_id: Optional[UUID] = None,
+        batch_size: int = 5000,
+    ) -> Iterator[Tuple[Any, ...]]:
+        """Stream the santri in one gap as tuples of `EXPORT_COLUMNS` (server-side cursor).
+
+        Validates eagerly; rows are fetched `batch_size` at a time while iterating.
+
+        Raises:
+            ValueError: Unknown gap
+        """
+        if gap not in GAPS:
+            raise ValueError(f"Gap tidak dikenal: {gap}. Pilihan: {', '.join(GAPS)}")
+        conditions = [GAPS[gap]]
+        params: Dict[str, Any] = {}
+        if kabupaten is not None:
+            conditions.append("sp.kabupaten = :kabupaten")
+            params["kabupaten"] = kabupaten
+        if pesantren_id is not None:
+            conditions.append("sp.pesantren_id = :pesantren_id")
+            params["pesantren_id"] = pesantren_id
+
+        sql = text(
+            "SELECT sk.santri_id, sp.nama, sp.provinsi, sp.kabupaten, sp.pesantren_id,"
+            " sk.kategori_kemiskinan, sk.skor_total"
+            f" {_FROM} WHERE {' AND '.join(conditions)} ORDER BY sk.santri_id"
+        )
+        return self._stream(sql, params, batch_size)
+
+    def _stream(self, sql, params: Dict[str, Any], batch_size: int) -> Iterator[Tuple[Any, ...]]:
+        result = self.db.execute(sql, params, execution_options={"stream_results": True, "yield_per": batch_size})
+        for row in result:
+            yield tuple(row)
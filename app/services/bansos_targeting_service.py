@@ -0,0 +1,363 @@
+"""Budget-constrained bansos targeting.
+
+Selects the santri that maximise the total vulnerability covered by a budget:
+each candidate has a value (skor_total, or a weighted sum of dimension scores) and
+a cost (the requested programs they do not receive yet), subject to optional
+per-kabupaten quotas.
+
+Candidates (santri_skor with the first santri_bansos row per santri) are loaded once
+into NumPy arrays and cached until the `santri_skor`, `santri_bansos` or
+`santri_pribadi` data version changes. The solver is the value/cost greedy for the
+0/1 knapsack, evaluated in vectorised passes: each pass takes the longest prefix
+of the remaining candidates that fits the budget and quotas, so the result is
+identical to scanning one santri at a time (and optimal when all costs are equal).
+"""
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.models.santri_pribadi import SantriPribadi
+from app.rules.scoring_program import SKOR_COMPONENTS
+from app.services.bansos_gap_service import BANSOS_PROGRAMS
+from app.services.data_version_service import get_data_versions
+from app.services.score_histogram_service import DIMENSIONS
+from app.services.scoring_simulation_service import LOAD_PARTITION_ROWS, TANPA_KABUPATEN, _encode, _narrow
+
+
+_VERSIONED_DATA = ("santri_skor", "santri_bansos", "santri_pribadi")
+
+# Score columns in DIMENSIONS order ("total" first)
+_SCORE_COLUMNS = ("skor_total",) + SKOR_COMPONENTS
+
+# Ids as text and the received programs as one bitmask (bit i = BANSOS_PROGRAMS[i]):
+# building UUID objects and decoding five booleans per row dominated the load time
+_CANDIDATE_SQL = (
+    "SELECT sk.santri_id::text, sp.kabupaten, sp.provinsi, sk.kategori_kemiskinan, "
+    + ", ".join(f"sk.{col}" for col in _SCORE_COLUMNS)
+    + ", COALESCE("
+    + " | ".join(f"(CASE WHEN bs.{program} THEN {1 << i} ELSE 0 END)" for i, program in enumerate(BANSOS_PROGRAMS))
+    + ", 0) FROM santri_skor sk"
+    " JOIN santri_pribadi sp ON sp.id = sk.santri_id"
+    f" LEFT JOIN (SELECT DISTINCT ON (santri_id) santri_id, {', '.join(BANSOS_PROGRAMS)}"
+    " FROM santri_bansos ORDER BY santri_id, id) bs"
+    " ON bs.santri_id = sk.santri_id"
+)
+
+
+class CandidateSet:
+    """Scored santri in columnar form: region codes, scores and received programs."""
+
+    def __init__(
+        self,
+        santri_ids: List[str],
+        kabupaten: np.ndarray,
+        kabupaten_labels: List[str],
+        provinsi: np.ndarray,
+        provinsi_labels: List[Any],
+        kategori: np.ndarray,
+        kategori_labels: List[Any],
+        scores: np.ndarray,
+        menerima: np.ndarray,
+        versions: Tuple[int, ...],
+    ):
+        self.santri_ids = santri_ids
+        self.kabupaten = kabupaten
+        self.kabupaten_labels = kabupaten_labels
+        self.provinsi = provinsi
+        self.provinsi_labels = provinsi_labels
+        self.kategori = kategori
+        self.kategori_labels = kategori_labels
+        # (santri, DIMENSIONS) score matrix; NULL scores are 0
+        self.scores = scores
+        # Bit i set when the santri receives BANSOS_PROGRAMS[i]
+        self.menerima = menerima
+        self.versions = versions
+        self.built_at = datetime.now()
+        self.build_seconds = 0.0
+
+    @property
+    def size(self) -> int:
+        return len(self.santri_ids)
+
+    @classmethod
+    def load(cls, db: Session, versions: Tuple[int, ...]) -> "CandidateSet":
+        started = time.perf_counter()
+        santri_ids: List[str] = []
+        indexes: List[Dict[Any, int]] = [{}, {}, {}]
+        code_parts: List[List[np.ndarray]] = [[], [], []]
+        score_parts: List[np.ndarray] = []
+        menerima_parts: List[np.ndarray] = []
+
+        result = db.execute(text(_CANDIDATE_SQL), execution_options={"stream_results": True})
+        for rows in result.partitions(LOAD_PARTITION_ROWS):
+            columns = list(zip(*rows))
+            santri_ids.extend(columns[0])
+            labels = (tuple(label or TANPA_KABUPATEN for label in columns[1]), columns[2], columns[3])
+            for i, values in enumerate(labels):
+                code_parts[i].append(_encode(values, indexes[i]))
+            score_parts.append(np.array(columns[4:-1], dtype=np.float64).T)
+            menerima_parts.append(np.array(columns[-1], dtype=np.uint8))
+
+        def concat(chunks: List[np.ndarray], dtype, shape=(0,)) -> np.ndarray:
+            return np.concatenate(chunks) if chunks else np.zeros(shape, dtype=dtype)
+
+        codes = [_narrow(concat(parts, np.int32), len(index)) for parts, index in zip(code_parts, indexes)]
+        scores = np.nan_to_num(concat(score_parts, np.float64, (0, len(_SCORE_COLUMNS))))
+        candidates = cls(
+            santri_ids=santri_ids,
+            kabupaten=codes[0],
+            kabupaten_labels=list(indexes[0]),
+            provinsi=codes[1],
+            provinsi_labels=list(indexes[1]),
+            kategori=codes[2],
+            kategori_labels=list(indexes[2]),
+            scores=scores.astype(np.int32),
+            menerima=concat(menerima_parts, np.uint8),
+            versions=versions,
+        )
+        candidates.build_seconds = time.perf_counter() - started
+        return candidates
+
+
+_candidates: Optional[CandidateSet] = None
+_candidates_lock = threading.Lock()
+
+
+def get_candidate_set(db: Session, refresh: bool = False) -> CandidateSet:
+    """Cached candidate set; rebuilt when scores, bansos or santri data changed, or on `refresh`."""
+    global _candidates
+    versions = get_data_versions(db, *_VERSIONED_DATA)
+    with _candidates_lock:
+        candidates = _candidates
+        if refresh or candidates is None or candidates.versions != versions:
+            candidates = CandidateSet.load(db, versions)
+            _candidates = candidates
+        return candidates
+
+
+def _group_rank(groups: np.ndarray) -> np.ndarray:
+    """Position of each element among the elements of the same group, in array order."""
+    order = np.argsort(groups, kind="stable")
+    sorted_groups = groups[order]
+    starts = np.flatnonzero(np.r_[True, sorted_groups[1:] != sorted_groups[:-1]])
+    counts = np.diff(np.r_[starts, len(groups)])
+    rank = np.empty(len(groups), dtype=np.int64)
+    rank[order] = np.arange(len(groups)) - np.repeat(starts, counts)
+    return rank
+
+
+def greedy_select(order: np.ndarray, cost: np.ndarray, groups: np.ndarray, quota: np.ndarray, budget: int) -> np.ndarray:
+    """Scan `order` taking every candidate that fits the remaining budget and its group quota.
+
+    Vectorised in passes: a pass drops candidates that can no longer fit (cost above
+    the remaining budget, or group already full), takes the longest prefix whose
+    cumulative cost fits, and rejects the first candidate that overflowed. Returns
+    the selected positions in scan order.
+    """
+    taken = np.zeros(len(quota), dtype=np.int64)
+    remaining = int(budget)
+    limited = bool(np.isfinite(quota).any())
+    selected: List[np.ndarray] = []
+    pending = order
+    while len(pending):
+        pending = pending[(cost[pending] <= remaining) & (taken[groups[pending]] < quota[groups[pending]])]
+        if not len(pending):
+            break
+        pending_cost = cost[pending]
+        pending_groups = groups[pending]
+        # Within quota assuming every earlier group member in this pass is taken
+        if limited:
+            within = _group_rank(pending_groups) + taken[pending_groups] < quota[pending_groups]
+        else:
+            within = np.ones(len(pending), dtype=bool)
+        overflow = np.flatnonzero(within & (np.cumsum(np.where(within, pending_cost, 0)) > remaining))
+        stop = int(overflow[0]) if len(overflow) else len(pending)
+        chosen = np.flatnonzero(within[:stop])
+        selected.append(pending[chosen])
+        remaining -= int(pending_cost[chosen].sum())
+        taken += np.bincount(pending_groups[chosen], minlength=len(quota))
+        # Candidates before `stop` are decided; the one at `stop` no longer fits
+        pending = pending[stop + 1:]
+    return np.concatenate(selected) if selected else np.zeros(0, dtype=np.int64)
+
+
+class BansosTargetingService:
+    """Choose bansos recipients under a budget."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def optimize(
+        self,
+        anggaran: int,
+        biaya_program: Dict[str, int],
+        kuota_kabupaten: Optional[Dict[str, int]] = None,
+        kuota_default: Optional[int] = None,
+        kecualikan_penerima: bool = True,
+        bobot_dimensi: Optional[Dict[str, float]] = None,
+        kategori: Optional[List[str]] = None,
+        provinsi: Optional[str] = None,
+        limit: int = 1000,
+        refresh: bool = False,
+    ) -> Dict[str, Any]:
+        """Select santri maximising the vulnerability covered within `anggaran`.
+
+        A selected santri receives every program in `biaya_program` they do not
+        receive yet; those programs make up their cost. Santri already receiving all
+        of them are not candidates.
+
+        Raises:
+            ValueError: Unknown program, dimension or negative cost/quota
+        """
+        unknown = [program for program in biaya_program if program not in BANSOS_PROGRAMS]
+        if not biaya_program or unknown:
+            raise ValueError(f"Program tidak dikenal: {', '.join(unknown) or '-'}. Pilihan: {', '.join(BANSOS_PROGRAMS)}")
+        if any(biaya <= 0 for biaya in biaya_program.values()):
+            raise ValueError("Biaya program harus > 0")
+        bobot = bobot_dimensi or {"total": 1.0}
+        unknown = [dim for dim in bobot if dim not in DIMENSIONS]
+        if unknown:
+            raise ValueError(f"Dimensi tidak dikenal: {', '.join(unknown)}. Pilihan: {', '.join(DIMENSIONS)}")
+        kuota_kabupaten = kuota_kabupaten or {}
+        if any(kuota < 0 for kuota in kuota_kabupaten.values()):
+            raise ValueError("Kuota kabupaten harus >= 0")
+
+        candidates = get_candidate_set(self.db, refresh=refresh)
+        started = time.perf_counter()
+
+        weights = np.array([bobot.get(dim, 0.0) for dim in DIMENSIONS], dtype=np.float64)
+        value = candidates.scores @ weights
+
+        # Cost: the requested programs the santri does not receive yet
+        cost = np.zeros(candidates.size, dtype=np.int64)
+        for program, biaya in biaya_program.items():
+            bit = 1 << BANSOS_PROGRAMS.index(program)
+            cost += np.where(candidates.menerima & bit, 0, int(biaya))
+
+        eligible = (value > 0) & (cost > 0)
+        if kecualikan_penerima:
+            eligible &= candidates.menerima == 0
+        if kategori:
+            codes = [i for i, label in enumerate(candidates.kategori_labels) if label in kategori]
+            eligible &= np.isin(candidates.kategori, codes)
+        if provinsi is not None:
+            codes = [i for i, label in enumerate(candidates.provinsi_labels) if label == provinsi]
+            eligible &= np.isin(candidates.provinsi, codes)
+
+        labels = candidates.kabupaten_labels
+        quota = np.full(len(labels), np.inf if kuota_default is None else kuota_default, dtype=np.float64)
+        for i, label in enumerate(labels):
+            if label in kuota_kabupaten:
+                quota[i] = kuota_kabupaten[label]
+
+        positions = np.flatnonzero(eligible)
+        # Highest value per rupiah first; ties by higher value, then load order
+        order = positions[np.lexsort((-value[positions], -value[positions] / cost[positions]))]
+        kabupaten = candidates.kabupaten.astype(np.int64)
+        selected = greedy_select(order, cost, kabupaten, quota, anggaran)
+        elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+
+        total_cost = int(cost[selected].sum())
+        total_value = float(value[selected].sum())
+        eligible_value = float(value[positions].sum())
+        return {
+            "anggaran": anggaran,
+            "total_biaya": total_cost,
+            "sisa_anggaran": anggaran - total_cost,
+            "total_kandidat": int(len(positions)),
+            "total_terpilih": int(len(selected)),
+            "total_nilai": round(total_value, 2),
+            "persen_nilai_tercakup": round(total_value * 100 / eligible_value, 2) if eligible_value else None,
+            "skor_total": self._score_stats(candidates.scores[selected, 0]),
+            "per_program": self._per_program(candidates, selected, biaya_program),
+            "per_kategori": self._per_kategori(candidates, selected),
+            "per_kabupaten": self._per_kabupaten(candidates, positions, selected, cost, quota),
+            "terpilih": self._selection(candidates, selected[:limit], value, cost, biaya_program),
+            "kandidat": {
+                "built_at": candidates.built_at,
+                "build_seconds": round(candidates.build_seconds, 2),
+                "total_santri": candidates.size,
+            },
+            "elapsed_ms": elapsed_ms,
+        }
+
+    @staticmethod
+    def _score_stats(skor: np.ndarray) -> Dict[str, Any]:
+        if not len(skor):
+            return {"min": None, "max": None, "mean": None}
+        return {"min": int(skor.min()), "max": int(skor.max()), "mean": round(float(skor.mean()), 2)}
+
+    @staticmethod
+    def _per_program(candidates: CandidateSet, selected: np.ndarray, biaya_program: Dict[str, int]) -> List[Dict[str, Any]]:
+        rows = []
+        for program, biaya in biaya_program.items():
+            bit = 1 << BANSOS_PROGRAMS.index(program)
+            baru = int((candidates.menerima[selected] & bit == 0).sum())
+            rows.append({"program": program, "biaya_per_santri": biaya, "penerima_baru": baru, "total_biaya": baru * biaya})
+        return rows
+
+    @staticmethod
+    def _per_kategori(candidates: CandidateSet, selected: np.ndarray) -> Dict[str, int]:
+        counts = np.bincount(candidates.kategori[selected].astype(np.int64), minlength=len(candidates.kategori_labels))
+        return {str(label): int(counts[i]) for i, label in enumerate(candidates.kategori_labels) if counts[i]}
+
+    @staticmethod
+    def _per_kabupaten(
+        candidates: CandidateSet,
+        positions: np.ndarray,
+        selected: np.ndarray,
+        cost: np.ndarray,
+        quota: np.ndarray,
+    ) -> List[Dict[str, Any]]:
+        n = len(candidates.kabupaten_labels)
+        kab = candidates.kabupaten.astype(np.int64)
+        kandidat = np.bincount(kab[positions], minlength=n)
+        terpilih = np.bincount(kab[selected], minlength=n)
+        biaya = np.bincount(kab[selected], weights=cost[selected], minlength=n)
+        rows = [
+            {
+                "kabupaten": label,
+                "kandidat": int(kandidat[i]),
+                "terpilih": int(terpilih[i]),
+                "total_biaya": int(biaya[i]),
+                "kuota": None if np.isinf(quota[i]) else int(quota[i]),
+            }
+            for i, label in enumerate(candidates.kabupaten_labels)
+            if kandidat[i]
+        ]
+        rows.sort(key=lambda row: (-row["terpilih"], row["kabupaten"]))
+        return rows
+
+    def _selection(
+        self,
+        candidates: CandidateSet,
+        positions: np.ndarray,
+        value: np.ndarray,
+        cost: np.ndarray,
+        biaya_program: Dict[str, int],
+    ) -> List[Dict[str, Any]]:
+        if not len(positions):
+            return []
+        ids = [UUID(candidates.santri_ids[p]) for p in positions]
+        rows = self.db.query(SantriPribadi.id, SantriPribadi.nama).filter(SantriPribadi.id.in_(ids)).all()
+        nama = {str(row.id): row.nama for row in rows}
+        bits = {program: 1 << BANSOS_PROGRAMS.index(program) for program in biaya_program}
+        return [
+            {
+                "santri_id": candidates.santri_ids[p],
+                "nama": nama.get(candidates.santri_ids[p]),
+                "kabupaten": candidates.kabupaten_labels[candidates.kabupaten[p]],
+                "kategori_kemiskinan": candidates.kategori_labels[candidates.kategori[p]],
+                "skor_total": int(candidates.scores[p, 0]),
+                "nilai": round(float(value[p]), 2),
+                "program_baru": [program for program, bit in bits.items() if not candidates.menerima[p] & bit],
+                "biaya": int(cost[p]),
+            }
+            for p in positions
+        ]
@@ -0,0 +1,179 @@
+"""Set-based bulk scoring for santri.
+
+Loads the scoring inputs for a chunk of santri with one query per source table,
+evaluates `scoring.json` in memory and upserts `santri_skor` / `santri_map` for the
+whole chunk at once (see `score_writer`), so a full recompute costs a handful of
+queries per chunk instead of dozens per santri.
+
+Dimensions whose input hash matches the one stored in santri_skor reuse the stored
+score and breakdown entry; santri whose stored score is unchanged are not rewritten.
+"""
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from uuid import UUID
+from sqlalchemy.orm import Session
+
+from app.repositories.santri_data_repository import SantriDataRepository
+from app.rules.scoring_program import get_scoring_program
+from app.rules.scoring_rules import calculate_scores_memoized
+from app.models.santri_pribadi import SantriPribadi
+from app.models.santri_skor import SantriSkor
+from app.services.score_writer import SKOR_COMPONENTS, SantriScoreWriter
+
+
+DEFAULT_CHUNK_SIZE = 1000
+
+
+class BulkScoreService:
+    """Score santri in chunks with set-based reads and writes."""
+
+    def __init__(self, db: Session, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.db = db
+        self.repo = SantriDataRepository(db)
+        self.chunk_size = max(1, chunk_size)
+
+    def iter_id_chunks(self, after: Optional[UUID] = None) -> Iterator[List[UUID]]:
+        """Yield santri ids in primary-key order, `chunk_size` at a time (keyset paging).
+
+        Args:
+            after: Only yield ids greater than this one (resume point)
+        """
+        last_id = after
+        while True:
+            query = self.db.query(SantriPribadi.id).order_by(SantriPribadi.id)
+            if last_id is not None:
+                query = query.filter(SantriPribadi.id > last_id)
+            ids = [row.id for row in query.limit(self.chunk_size).all()]
+            if not ids:
+                return
+            yield ids
+            last_id = ids[-1]
+
+    def compute_chunk(
+        self, santri_ids: Sequence[UUID]
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Load inputs and evaluate the rules for one chunk without writing anything.
+
+        Returns:
+            Tuple of (scored rows for `write_chunk`, results, errors)
+        """
+        ids = list(santri_ids)
+        pribadi_rows = (
+            self.db.query(
+                SantriPribadi.id,
+                SantriPribadi.nama,
+                SantriPribadi.pesantren_id,
+                SantriPribadi.lokasi,
+            )
+            .filter(SantriPribadi.id.in_(ids))
+            .all()
+        )
+        inputs = self.repo.get_all_many([row.id for row in pribadi_rows])
+        previous = {
+            row.santri_id: row
+            for row in self.db.query(
+                SantriSkor.santri_id,
+                SantriSkor.skor_total,
+                SantriSkor.kategori_kemiskinan,
+                SantriSkor.metode,
+                SantriSkor.version,
+                SantriSkor.breakdown,
+                SantriSkor.input_hashes,
+            ).filter(SantriSkor.santri_id.in_(ids), SantriSkor.input_hashes.isnot(None))
+        }
+        program = get_scoring_program()
+
+        scored: List[Dict[str, Any]] = []
+        results: List[Dict[str, Any]] = []
+        errors: List[Dict[str, Any]] = []
+
+        found = {row.id for row in pribadi_rows}
+        for santri_id in ids:
+            if santri_id not in found:
+                errors.append({"santri_id": str(santri_id), "nama": None, "error": "Santri tidak ditemukan"})
+
+        for row in pribadi_rows:
+            try:
+                stored = previous.get(row.id)
+                per_component, total, kategori, metode, version, breakdown, input_hashes = (
+                    calculate_scores_memoized(inputs[row.id], stored, program)
+                )
+                scored.append({
+                    "santri_id": row.id,
+                    "nama": row.nama,
+                    "pesantren_id": row.pesantren_id,
+                    "lokasi": row.lokasi,
+                    "components": {key: per_component[key] for key in SKOR_COMPONENTS},
+                    "skor_total": total,
+                    "kategori_kemiskinan": kategori,
+                    "metode": metode,
+                    "version": version,
+                    "breakdown": breakdown,
+                    "input_hashes": input_hashes,
+                    "unchanged": stored is not None
+                    and stored.input_hashes == input_hashes
+                    and (stored.skor_total, stored.kategori_kemiskinan, stored.metode, stored.version)
+                    == (total, kategori, metode, version),
+                })
+                results.append({
+                    "santri_id": str(row.id),
+                    "nama": row.nama,
+                    "skor_total": total,
+                    "kategori": kategori,
+                })
+            except Exception as e:
+                errors.append({"santri_id": str(row.id), "nama": row.nama, "error": str(e)})
+
+        return scored, results, errors
+
+    def write_chunk(self, scored: List[Dict[str, Any]]) -> None:
+        """Stage `santri_skor` and `santri_map` upserts for scored rows in the current transaction."""
+        SantriScoreWriter(self.db).write(scored)
+
+    def score_chunk(self, santri_ids: Sequence[UUID]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Score one chunk and stage the writes in the current transaction.
+
+        The caller owns the transaction and is expected to commit (or roll back).
+
+        Returns:
+            Tuple of (results, errors), one entry per santri.
+        """
+        scored, results, errors = self.compute_chunk(santri_ids)
+        self.write_chunk(scored)
+        return results, errors
+
+    def iter_scored_chunks(
+        self, after: Optional[UUID] = None
+    ) -> Iterator[Tuple[List[UUID], List[Dict[str, Any]], List[Dict[str, Any]]]]:
+        """Score every santri after `after`, yielding (ids, results, errors) per chunk.
+
+        Each chunk's writes are staged but not committed when it is yielded, so the
+        caller can commit its own bookkeeping in the same transaction. A chunk that
+        fails is rolled back and reported as errors for all of its ids.
+        """
+        for ids in self.iter_id_chunks(after=after):
+            try:
+                results, errors = self.score_chunk(ids)
+            except Exception as e:
+                self.db.rollback()
+                results = []
+                errors = [{"santri_id": str(sid), "nama": None, "error": str(e)} for sid in ids]
+            yield ids, results, errors
+
+    def score_all(self) -> Dict[str, Any]:
+        """Score every santri, committing once per chunk."""
+        results: List[Dict[str, Any]] = []
+        errors: List[Dict[str, Any]] = []
+
+        for _, chunk_results, chunk_errors in self.iter_scored_chunks():
+            try:
+                self.db.commit()
+            except Exception as e:
+                self.db.rollback()
+                chunk_errors = chunk_errors + [
+                    {"santri_id": r["santri_id"], "nama": r["nama"], "error": str(e)} for r in chunk_results
+                ]
+                chunk_results = []
+            results.extend(chunk_results)
+            errors.extend(chunk_errors)
+
+        return {"results": results, "errors": errors}
@@ -0,0 +1,57 @@
+"""Change counters for cache invalidation (see `DataVersion`).
+
+Bumps are deferred to the session's commit: `bump_data_version` only records the
+names, and the counters are incremented as the last statement before COMMIT. The
+shared `data_version` row locks are therefore held for the commit alone, not for
+the rest of the writer's transaction, so concurrent score writers do not queue
+behind each other's map, grid and feature work.
+"""
+from typing import Tuple
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.models.data_version import DataVersion
+
+
+_PENDING_KEY = "pending_data_versions"
+
+
+def bump_data_version(db: Session, *names: str) -> None:
+    """Increment the version of the given datasets when `db` commits; does not commit.
+
+    Call before the caller's commit so the bump is atomic with the data change.
+    A rolled-back transaction drops its pending bumps.
+    """
+    if names:
+        db.info.setdefault(_PENDING_KEY, set()).update(names)
+
+
+@event.listens_for(Session, "before_commit")
+def _apply_pending_bumps(session: Session) -> None:
+    names = session.info.pop(_PENDING_KEY, None)
+    if not names:
+        return
+    # Flush first so the lock is taken after all other writes of the transaction
+    session.flush()
+    stmt = pg_insert(DataVersion).values([{"name": name, "version": 1} for name in sorted(names)])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DataVersion.name],
+        set_={"version": DataVersion.version + 1, "updated_at": text("now()")},
+    )
+    session.execute(stmt)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _drop_pending_bumps(session: Session, transaction) -> None:
+    # Only the outermost transaction; a rolled-back savepoint keeps the bumps
+    if transaction.parent is None:
+        session.info.pop(_PENDING_KEY, None)
+
+
+def get_data_versions(db: Session, *names: str) -> Tuple[int, ...]:
+    """Current version of each dataset, in argument order (0 if never written)."""
+    rows = dict(
+        db.query(DataVersion.name, DataVersion.version).filter(DataVersion.name.in_(names)).all()
+    )
+    return tuple(rows.get(name, 0) for name in names)
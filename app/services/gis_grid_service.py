@@ -0,0 +1,250 @@
+"""Pre-aggregated square-grid density layers for santri_map and pesantren_map.
+
+`gis_grid_cell` holds, per layer, zoom resolution, EPSG:3857 grid cell and
+category, the number of points and their score sum. It follows the map tables
+by deltas in the caller's transaction: map writers read a batch's current cells
+(`snapshot`, which also locks the map rows), rewrite the rows, then write the
+net change, new minus old, in one upsert ordered by primary key (`apply`).
+Every writer thus takes its cell locks in a single statement and in the same
+order, so concurrent batches sharing cells wait for each other instead of
+deadlocking. Deletes subtract the rows before they cascade away (`remove`);
+bulk writes that touch every row recount the layer (`rebuild`).
+
+A density request reads the cells of one resolution inside the bbox by primary
+key, so it returns a few hundred cells however many points there are.
+
+Run standalone to recount both layers:
+    python -m app.services.gis_grid_service
+"""
+import math
+from typing import Any, Dict, List, Optional, Sequence
+from uuid import UUID
+from sqlalchemy import bindparam, text
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
+from sqlalchemy.orm import Session
+
+
+WEB_MERCATOR_WORLD_M = 40075016.685578488
+WEB_MERCATOR_MAX_LAT = 85.05112878
+
+# Zoom levels with a precomputed grid; each cell is GRID_CELL_PX pixels at its zoom
+GRID_RESOLUTIONS = (4, 6, 8, 10, 12, 14)
+GRID_CELL_PX = 32
+# Cells a bbox may span at the chosen resolution
+MAX_GRID_CELLS = 25000
+
+# layer -> (map table, id column, category column)
+GRID_LAYERS: Dict[str, tuple] = {
+    "santri": ("santri_map", "santri_id", "kategori_kemiskinan"),
+    "pesantren": ("pesantren_map", "pesantren_id", "kategori_kelayakan"),
+}
+
+# Cells of the scoped map rows at every resolution; {before} may append older cells
+_CELLS = """
+WITH m AS (
+    SELECT ST_Transform(lokasi, 3857) AS geom, {kategori} AS kategori, skor_terakhir
+    FROM {table} WHERE lokasi IS NOT NULL AND {scope}{lock}
+), c AS (
+    SELECT r.resolusi, floor(ST_X(m.geom) / r.ukuran)::int AS cx, floor(ST_Y(m.geom) / r.ukuran)::int AS cy,
+           m.kategori, count(*) AS jumlah, COALESCE(sum(m.skor_terakhir), 0) AS total_skor
+    FROM m
+    CROSS JOIN (VALUES {resolutions}) r(resolusi, ukuran)
+    GROUP BY 1, 2, 3, 4{before}
+)
+"""
+
+_SNAPSHOT = _CELLS + "SELECT resolusi, cx, cy, kategori, jumlah, total_skor FROM c"
+
+_BEFORE = """
+    UNION ALL
+    SELECT * FROM unnest(
+        CAST(:resolusi AS int[]), CAST(:cx AS int[]), CAST(:cy AS int[]),
+        CAST(:kategori AS text[]), CAST(:jumlah AS bigint[]), CAST(:total_skor AS bigint[])
+    )"""
+
+_UPSERT = _CELLS + """
+INSERT INTO gis_grid_cell (layer, resolusi, cx, cy, kategori, jumlah, total_skor)
+SELECT '{layer}', resolusi, cx, cy, kategori, {sign} * sum(jumlah), {sign} * sum(total_skor)
+FROM c
+GROUP BY resolusi, cx, cy, kategori
+HAVING sum(jumlah) <> 0 OR sum(total_skor) <> 0
+ORDER BY resolusi, cx, cy, kategori
+ON CONFLICT (layer, resolusi, cx, cy, kategori)
+DO UPDATE SET jumlah = gis_grid_cell.jumlah + EXCLUDED.jumlah,
+              total_skor = gis_grid_cell.total_skor + EXCLUDED.total_skor
+"""
+
+_IDS = bindparam("ids", type_=ARRAY(PG_UUID(as_uuid=True)))
+
+
+def cell_size(zoom: int, cell_px: int = GRID_CELL_PX) -> float:
+    """Width in EPSG:3857 metres of a square `cell_px` screen pixels across at `zoom`."""
+    return WEB_MERCATOR_WORLD_M / (256 * 2 ** zoom) * cell_px
+
+
+def mercator(lon: float, lat: float) -> tuple:
+    """EPSG:4326 to EPSG:3857 (latitude clamped to the Web Mercator limit)."""
+    lat = max(-WEB_MERCATOR_MAX_LAT, min(WEB_MERCATOR_MAX_LAT, lat))
+    radius = WEB_MERCATOR_WORLD_M / (2 * math.pi)
+    return math.radians(lon) * radius, math.log(math.tan(math.pi / 4 + math.radians(lat) / 2)) * radius
+
+
+def inverse_mercator(x: float, y: float) -> tuple:
+    """EPSG:3857 to EPSG:4326 as (lon, lat)."""
+    radius = WEB_MERCATOR_WORLD_M / (2 * math.pi)
+    return math.degrees(x / radius), math.degrees(2 * math.atan(math.exp(y / radius)) - math.pi / 2)
+
+
+def _grid_sql(template: str, layer: str, scope: str, lock: str = "", sign: int = 1, before: str = "") -> str:
+    table, _, kategori = GRID_LAYERS[layer]
+    resolutions = ", ".join(f"({zoom}, {cell_size(zoom)!r})" for zoom in GRID_RESOLUTIONS)
+    return template.format(
+        table=table, kategori=kategori, layer=layer, scope=scope, lock=lock, sign=sign,
+        resolutions=resolutions, before=before,
+    )
+
+
+def _scope(layer: str) -> str:
+    return f"{GRID_LAYERS[layer][1]} = ANY(:ids)"
+
+
+class GisGridService:
+    """Maintain and query `gis_grid_cell`."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    # ----- maintenance -----
+
+    def snapshot(self, layer: str, ids: Sequence[UUID]) -> List[tuple]:
+        """Current cells of these santri/pesantren ids; locks their map rows until commit.
+
+        Pass the result to `apply` once the rows are rewritten.
+        """
+        ids = list(ids)
+        if not ids:
+            return []
+        sql = _grid_sql(_SNAPSHOT, layer, _scope(layer), lock=" FOR UPDATE")
+        return [tuple(row) for row in self.db.execute(text(sql).bindparams(_IDS), {"ids": ids})]
+
+    def apply(self, layer: str, ids: Sequence[UUID], before: Sequence[tuple]) -> None:
+        """Write the net change of these ids: their current cells minus `before`."""
+        ids = list(ids)
+        if not ids and not before:
+            return
+        columns = list(zip(*before)) if before else [()] * 6
+        params: Dict[str, Any] = {
+            "ids": ids,
+            "resolusi": list(columns[0]),
+            "cx": list(columns[1]),
+            "cy": list(columns[2]),
+            "kategori": list(columns[3]),
+            "jumlah": [-value for value in columns[4]],
+            "total_skor": [-value for value in columns[5]],
+        }
+        sql = _grid_sql(_UPSERT, layer, _scope(layer), before=_BEFORE)
+        self.db.execute(text(sql).bindparams(_IDS), params)
+
+    def remove(self, layer: str, ids: Sequence[UUID]) -> None:
+        """Subtract the current map rows of these ids, e.g. before they are deleted."""
+        ids = list(ids)
+        if ids:
+            self.db.execute(text(_grid_sql(_UPSERT, layer, _scope(layer), sign=-1)).bindparams(_IDS), {"ids": ids})
+
+    def rebuild(self, layer: Optional[str] = None) -> None:
+        """Recount one layer (or both) from its map table."""
+        for name in [layer] if layer else list(GRID_LAYERS):
+            self.db.execute(text("DELETE FROM gis_grid_cell WHERE layer = :layer"), {"layer": name})
+            self.db.execute(text(_grid_sql(_UPSERT, name, "TRUE")))
+
+    # ----- queries -----
+
+    def cells(
+        self,
+        layer: str,
+        zoom: int,
+        min_lon: float,
+        min_lat: float,
+        max_lon: float,
+        max_lat: float,
+        kategori: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Grid cells of the resolution for `zoom` inside the bbox, with count, average
+        score and count per category.
+
+        The resolution is the finest precomputed one not finer than `zoom`.
+
+        Raises:
+            ValueError: Unknown layer, invalid bbox, or a bbox spanning too many cells
+        """
+        if layer not in GRID_LAYERS:
+            raise ValueError(f"Layer tidak dikenal: {layer}. Pilihan: {', '.join(GRID_LAYERS)}")
+        if min_lon >= max_lon or min_lat >= max_lat:
+            raise ValueError("Bounding box tidak valid")
+
+        resolusi = max([r for r in GRID_RESOLUTIONS if r <= zoom] or [GRID_RESOLUTIONS[0]])
+        size = cell_size(resolusi)
+        x0, y0 = mercator(min_lon, min_lat)
+        x1, y1 = mercator(max_lon, max_lat)
+        cx0, cy0, cx1, cy1 = (math.floor(v / size) for v in (x0, y0, x1, y1))
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > MAX_GRID_CELLS:
+            raise ValueError("Bounding box terlalu besar untuk zoom ini")
+
+        conditions = [
+            "layer = :layer", "resolusi = :resolusi",
+            "cx BETWEEN :cx0 AND :cx1", "cy BETWEEN :cy0 AND :cy1", "jumlah > 0",
+        ]
+        params: Dict[str, Any] = {
+            "layer": layer, "resolusi": resolusi, "cx0": cx0, "cx1": cx1, "cy0": cy0, "cy1": cy1,
+        }
+        if kategori:
+            conditions.append("kategori = :kategori")
+            params["kategori"] = kategori
+        rows = self.db.execute(
+            text(
+                "SELECT cx, cy, kategori, jumlah, total_skor FROM gis_grid_cell"
+                f" WHERE {' AND '.join(conditions)}"
+            ),
+            params,
+        ).all()
+
+        merged: Dict[tuple, Dict[str, Any]] = {}
+        for row in rows:
+            cell = merged.setdefault((row.cx, row.cy), {"jumlah": 0, "total_skor": 0, "kategori": {}})
+            cell["jumlah"] += row.jumlah
+            cell["total_skor"] += row.total_skor
+            cell["kategori"][row.kategori] = row.jumlah
+
+        data = []
+        for (cx, cy), cell in merged.items():
+            lng, lat = inverse_mercator((cx + 0.5) * size, (cy + 0.5) * size)
+            data.append({
+                "lat": lat,
+                "lng": lng,
+                "jumlah": cell["jumlah"],
+                "rata_skor": round(cell["total_skor"] / cell["jumlah"], 2),
+                "kategori": cell["kategori"],
+            })
+        return {
+            "layer": layer,
+            "resolusi": resolusi,
+            "cell_size_m": round(size, 2),
+            "total": sum(cell["jumlah"] for cell in merged.values()),
+            "data": data,
+        }
+
+
+if __name__ == "__main__":
+    import time
+
+    import app.main  # noqa: F401  (registers every model mapper)
+    from app.core.database import SessionLocal
+
+    session = SessionLocal()
+    try:
+        started = time.time()
+        GisGridService(session).rebuild()
+        session.commit()
+        print(f"gis_grid_cell rebuilt in {time.time() - started:.1f}s")
+    finally:
+        session.close()
@@ -0,0 +1,144 @@
+"""Multi-process batch scoring.
+
+Scoring a chunk is pure CPU once its inputs are loaded, so chunks are spread over
+a process pool: each worker process opens its own DB engine, loads the inputs of
+the chunks it is given and evaluates the compiled rules. The parent process is the
+single writer: it consumes chunk results in id order and bulk-writes them with
+`BulkScoreService.write_chunk`. At most `workers * (1 + WINDOW_PER_WORKER)` chunks
+are in flight, so memory stays bounded however large the population is.
+
+Run standalone on a batch host:
+    python -m app.services.parallel_score_service --workers 16
+"""
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.services.bulk_score_service import DEFAULT_CHUNK_SIZE, BulkScoreService
+
+
+# Chunks queued per worker beyond the one it is computing
+WINDOW_PER_WORKER = 2
+
+_worker_session: Optional[sessionmaker] = None
+
+
+def _init_worker() -> None:
+    """Process pool initializer: give the worker its own engine and mappers."""
+    global _worker_session
+    import app.main  # noqa: F401  (registers every model mapper)
+
+    worker_engine = create_engine(settings.database_url, pool_size=1, max_overflow=0)
+    _worker_session = sessionmaker(autocommit=False, autoflush=False, bind=worker_engine)
+
+
+def _compute_chunk(
+    santri_ids: List[UUID],
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Worker task: read-only load + evaluation of one chunk."""
+    db = _worker_session()
+    try:
+        return BulkScoreService(db).compute_chunk(santri_ids)
+    finally:
+        db.rollback()
+        db.close()
+
+
+def default_worker_count() -> int:
+    return settings.scoring_workers or os.cpu_count() or 1
+
+
+class ParallelScoreService:
+    """Score santri chunks on a process pool with a single writer in this process."""
+
+    def __init__(
+        self,
+        db: Session,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        workers: Optional[int] = None,
+    ):
+        self.db = db
+        self.bulk = BulkScoreService(db, chunk_size)
+        self.workers = max(1, workers or default_worker_count())
+
+    def iter_scored_chunks(
+        self, after: Optional[UUID] = None
+    ) -> Iterator[Tuple[List[UUID], List[Dict[str, Any]], List[Dict[str, Any]]]]:
+        """Same contract as `BulkScoreService.iter_scored_chunks`, computed in parallel.
+
+        Chunks are yielded in id order with their writes staged but not committed.
+        """
+        window: Deque[Tuple[List[UUID], Future]] = deque()
+        max_in_flight = self.workers * (1 + WINDOW_PER_WORKER)
+
+        # spawn, not fork: the API process is multi-threaded and holds pooled connections
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=self.workers, mp_context=context, initializer=_init_worker) as pool:
+            for ids in self.bulk.iter_id_chunks(after=after):
+                window.append((ids, pool.submit(_compute_chunk, ids)))
+                if len(window) >= max_in_flight:
+                    yield self._write_next(window)
+            while window:
+                yield self._write_next(window)
+
+    def _write_next(
+        self, window: Deque[Tuple[List[UUID], Future]]
+    ) -> Tuple[List[UUID], List[Dict[str, Any]], List[Dict[str, Any]]]:
+        ids, future = window.popleft()
+        try:
+            scored, results, errors = future.result()
+            self.bulk.write_chunk(scored)
+        except Exception as e:
+            self.db.rollback()
+            results = []
+            errors = [{"santri_id": str(sid), "nama": None, "error": str(e)} for sid in ids]
+        return ids, results, errors
+
+    def score_all(self) -> Dict[str, Any]:
+        """Score every santri, committing once per chunk; returns counts only."""
+        processed = 0
+        errors: List[Dict[str, Any]] = []
+        for _, chunk_results, chunk_errors in self.iter_scored_chunks():
+            try:
+                self.db.commit()
+                processed += len(chunk_results)
+            except Exception as e:
+                self.db.rollback()
+                chunk_errors = chunk_errors + [
+                    {"santri_id": r["santri_id"], "nama": r["nama"], "error": str(e)} for r in chunk_results
+                ]
+            errors.extend(chunk_errors)
+        return {"total_processed": processed, "errors": errors}
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    import app.main  # noqa: F401  (registers every model mapper)
+    from app.core.database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Score all santri on a process pool")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: SCORING_WORKERS or CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    session = SessionLocal()
+    try:
+        service = ParallelScoreService(session, chunk_size=args.chunk_size, workers=args.workers)
+        started = time.time()
+        summary = service.score_all()
+        elapsed = time.time() - started
+        print(
+            f"Scored {summary['total_processed']} santri with {service.workers} workers "
+            f"in {elapsed:.1f}s ({summary['total_processed'] / elapsed if elapsed else 0:.0f}/s), "
+            f"{len(summary['errors'])} gagal"
+        )
+    finally:
+        session.close()
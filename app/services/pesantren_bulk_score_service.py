@@ -0,0 +1,140 @@
+"""Chunked batch scoring for pesantren.
+
+A chunk of pesantren is loaded with one joined query (pondok_pesantren with its
+fisik, fasilitas and pendidikan rows), evaluated against the cached compiled
+pesantren_scoring.json and upserted into `pesantren_skor` / `pesantren_map` for
+the whole chunk at once (see `score_writer`), so thousands of pesantren cost a
+handful of statements and one commit per chunk.
+"""
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from uuid import UUID
+from sqlalchemy.orm import Session
+
+from app.models.pondok_pesantren import PondokPesantren
+from app.repositories.pesantren_data_repository import PesantrenDataRepository
+from app.rules.pesantren_scoring_program import get_pesantren_scoring_program
+from app.rules.pesantren_scoring_rules import calculate_pesantren_scores_from_inputs
+from app.services.score_writer import PesantrenScoreWriter
+
+
+DEFAULT_CHUNK_SIZE = 1000
+
+# pesantren_skor column -> dimension score key of the config
+PESANTREN_SKOR_COMPONENTS = {
+    "skor_fisik": "skor_kelayakan_fisik",
+    "skor_air_sanitasi": "skor_air_sanitasi",
+    "skor_fasilitas_pendukung": "skor_fasilitas_pendukung",
+    "skor_mutu_pendidikan": "skor_mutu_pendidikan",
+}
+
+
+class PesantrenBulkScoreService:
+    """Score pesantren in chunks with one joined read and set-based writes per chunk."""
+
+    def __init__(self, db: Session, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.db = db
+        self.repo = PesantrenDataRepository(db)
+        self.chunk_size = max(1, chunk_size)
+
+    def iter_id_chunks(self, after: Optional[UUID] = None) -> Iterator[List[UUID]]:
+        """Yield pesantren ids in primary-key order, `chunk_size` at a time (keyset paging).
+
+        Args:
+            after: Only yield ids greater than this one (resume point)
+        """
+        last_id = after
+        while True:
+            query = self.db.query(PondokPesantren.id).order_by(PondokPesantren.id)
+            if last_id is not None:
+                query = query.filter(PondokPesantren.id > last_id)
+            ids = [row.id for row in query.limit(self.chunk_size).all()]
+            if not ids:
+                return
+            yield ids
+            last_id = ids[-1]
+
+    def compute_chunk(
+        self, pesantren_ids: Sequence[UUID]
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Load and evaluate one chunk without writing anything.
+
+        Returns:
+            Tuple of (scored rows, results, errors). A scored row carries the
+            pesantren_skor values plus the pesantren fields shown on the map.
+        """
+        ids = list(pesantren_ids)
+        data = self.repo.get_all_many(ids)
+        program = get_pesantren_scoring_program()
+
+        scored: List[Dict[str, Any]] = []
+        results: List[Dict[str, Any]] = []
+        errors: List[Dict[str, Any]] = []
+
+        for pesantren_id in ids:
+            pesantren = data[pesantren_id]["pesantren"]
+            if pesantren is None:
+                errors.append({"pesantren_id": str(pesantren_id), "nama": None, "error": "Pesantren tidak ditemukan"})
+                continue
+            try:
+                per_dimension, total, kategori, metode, version, breakdown = (
+                    calculate_pesantren_scores_from_inputs(data[pesantren_id], program)
+                )
+                scored.append({
+                    "pesantren_id": pesantren_id,
+                    "nama": pesantren.nama,
+                    "nsp": pesantren.nsp,
+                    "kabupaten": pesantren.kabupaten,
+                    "provinsi": pesantren.provinsi,
+                    "jumlah_santri": pesantren.jumlah_santri,
+                    "lokasi": pesantren.lokasi,
+                    "components": {col: per_dimension[key] for col, key in PESANTREN_SKOR_COMPONENTS.items()},
+                    "skor_total": total,
+                    "kategori_kelayakan": kategori,
+                    "metode": metode,
+                    "version": version,
+                    "breakdown": breakdown,
+                })
+                results.append({
+                    "pesantren_id": str(pesantren_id),
+                    "nama": pesantren.nama,
+                    "skor_total": total,
+                    "kategori": kategori,
+                })
+            except Exception as e:
+                errors.append({"pesantren_id": str(pesantren_id), "nama": pesantren.nama, "error": str(e)})
+
+        return scored, results, errors
+
+    def write_chunk(self, scored: List[Dict[str, Any]]) -> None:
+        """Stage `pesantren_skor` and `pesantren_map` upserts for scored rows in the current transaction."""
+        PesantrenScoreWriter(self.db).write(scored)
+
+    def score_chunk(self, pesantren_ids: Sequence[UUID]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Score one chunk and stage the writes in the current transaction.
+
+        The caller owns the transaction and is expected to commit (or roll back).
+
+        Returns:
+            Tuple of (results, errors), one entry per pesantren.
+        """
+        scored, results, errors = self.compute_chunk(pesantren_ids)
+        self.write_chunk(scored)
+        return results, errors
+
+    def iter_scored_chunks(
+        self, after: Optional[UUID] = None
+    ) -> Iterator[Tuple[List[UUID], List[Dict[str, Any]], List[Dict[str, Any]]]]:
+        """Score every pesantren after `after`, yielding (ids, results, errors) per chunk.
+
+        Each chunk's writes are staged but not committed when it is yielded, so the
+        caller can commit its own bookkeeping in the same transaction. A chunk that
+        fails is rolled back and reported as errors for all of its ids.
+        """
+        for ids in self.iter_id_chunks(after=after):
+            try:
+                results, errors = self.score_chunk(ids)
+            except Exception as e:
+                self.db.rollback()
+                results = []
+                errors = [{"pesantren_id": str(pid), "nama": None, "error": str(e)} for pid in ids]
+            yield ids, results, errors
@@ -7,6 +7,7 @@ from geoalchemy2.functions import ST_AsGeoJSON
 
 from app.models.pesantren_map import PesantrenMap
 from app.models.pondok_pesantren import PondokPesantren
+from app.services.gis_grid_service import GisGridService
 
 
 class PesantrenMapService:
@@ -47,8 +48,10 @@ class PesantrenMapService:
         
         # Use existing lokasi geometry from pesantren (already a POINT)
         lokasi = getattr(pesantren, 'lokasi', None)
+        grid = GisGridService(self.db)
         
         if existing:
+            before = grid.snapshot("pesantren", [pesantren_id])
             # Update existing record
             existing.nama = pesantren.nama  # type: ignore
             existing.nsp = pesantren.nsp  # type: ignore
@@ -59,6 +62,8 @@ class PesantrenMapService:
             existing.jumlah_santri = pesantren.jumlah_santri  # type: ignore
             existing.lokasi = lokasi  # type: ignore
             
+            self.db.flush()
+            grid.apply("pesantren", [pesantren_id], before)
             self.db.commit()
             self.db.refresh(existing)
             return existing
@@ -76,6 +81,8 @@ class PesantrenMapService:
                 lokasi=lokasi
             )
             self.db.add(new_map)
+            self.db.flush()
+            grid.apply("pesantren", [pesantren_id], [])
             self.db.commit()
             self.db.refresh(new_map)
             return new_map
@@ -7,7 +7,10 @@ from sqlalchemy import update
 from fastapi import HTTPException
 
 from app.repositories.pesantren_data_repository import PesantrenDataRepository
-from app.rules.pesantren_scoring_rules import calculate_pesantren_scores_from_config
+from app.rules.pesantren_scoring_rules import (
+    calculate_pesantren_scores_from_config,
+    calculate_pesantren_scores_from_inputs,
+)
 from app.models.pesantren_skor import PesantrenSkor
 from app.services.pesantren_map_service import PesantrenMapService
 
@@ -36,14 +39,14 @@ class PesantrenScoreService:
         Returns:
             Tuple of (PesantrenSkor object, breakdown dict)
         """
-        # Ensure pesantren exists
-        pesantren = self.repo.get_pesantren(pesantren_id)
-        if not pesantren:
+        # Load pesantren and its fisik/fasilitas/pendidikan rows in one query
+        data = self.repo.get_all(pesantren_id)
+        if not data["pesantren"]:
             raise HTTPException(status_code=404, detail="Pesantren tidak ditemukan")
         
-        # Compute scores using config-driven rules
+        # Compute scores using the cached compiled config
         per_dimension, total, kategori, metode_cfg, version_cfg, breakdown = (
-            calculate_pesantren_scores_from_config(self.repo, pesantren_id)
+            calculate_pesantren_scores_from_inputs(data)
         )
         
         # Upsert logic: if record exists, update; else create
@@ -66,6 +69,7 @@ class PesantrenScoreService:
                 kategori_kelayakan=kategori,
                 metode=metode_cfg,
                 version=version_cfg,
+                breakdown=breakdown,
             )
             self.db.execute(stmt)
             self.db.commit()
@@ -97,6 +101,7 @@ class PesantrenScoreService:
                 kategori_kelayakan=kategori,
                 metode=metode_cfg,
                 version=version_cfg,
+                breakdown=breakdown,
             )
             self.db.add(record)
             self.db.commit()
@@ -112,16 +117,28 @@ class PesantrenScoreService:
             
             return record, breakdown
     
-    def get_by_pesantren_id(self, pesantren_id: UUID) -> Optional[Tuple[PesantrenSkor, Dict[str, Any]]]:
-        """Get score by pesantren ID with breakdown."""
+    def get_by_pesantren_id(
+        self,
+        pesantren_id: UUID,
+        fresh: bool = False
+    ) -> Optional[Tuple[PesantrenSkor, Dict[str, Any]]]:
+        """
+        Get score by pesantren ID with breakdown.
+        
+        Args:
+            pesantren_id: UUID of the pesantren
+            fresh: Re-calculate the breakdown from current data instead of
+                returning the stored one (result is not saved)
+        """
         record = (
             self.db.query(PesantrenSkor)
             .filter(PesantrenSkor.pesantren_id == pesantren_id)
             .first()
         )
         if record:
-            # Re-calculate breakdown for display
-            _, _, _, _, _, breakdown = calculate_pesantren_scores_from_config(self.repo, pesantren_id)
+            breakdown = record.breakdown
+            if fresh or breakdown is None:
+                _, _, _, _, _, breakdown = calculate_pesantren_scores_from_config(self.repo, pesantren_id)
             return record, breakdown
         return None
     
@@ -8,6 +8,7 @@ from fastapi import HTTPException
 
 from app.models.pondok_pesantren import PondokPesantren
 from app.models.foto_pesantren import FotoPesantren
+from app.services.gis_grid_service import GisGridService
 import os
 
 from app.schemas.pondok_pesantren_schema import PondokPesantrenCreate, PondokPesantrenUpdate
@@ -150,6 +151,8 @@ class PondokPesantrenService:
         if not pesantren:
             return False
         
+        # Take the pesantren out of the density grid before its pesantren_map row cascades away
+        GisGridService(self.db).remove("pesantren", [pesantren.id])
         self.db.delete(pesantren)
         self.db.commit()
         return True
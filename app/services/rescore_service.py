@@ -0,0 +1,158 @@
+"""Incremental re-scoring driven by sub-table changes.
+
+Services that write santri_orangtua, santri_rumah, santri_asset, santri_pembiayaan,
+santri_kesehatan or santri_bansos (and santri_pribadi) call `mark_santri_dirty` inside
+their transaction. The worker coalesces those marks (one row per santri in
+`santri_skor_dirty`), re-scores only the marked santri in batches with the bulk
+scoring engine.
+
+Run standalone:
+    python -m app.services.rescore_service
+
+or set RESCORE_WORKER_ENABLED=true to run it in a background thread of the API.
+Several workers (processes or threads) can run at once; batches are claimed with
+FOR UPDATE SKIP LOCKED.
+"""
+import threading
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.santri_skor_dirty import SantriSkorDirty
+from app.services.bulk_score_service import BulkScoreService
+
+
+def mark_santri_dirty(db: Session, *santri_ids: Optional[UUID]) -> None:
+    """Queue santri for re-scoring; does not commit.
+
+    Call before the caller's commit so the mark is atomic with the data change.
+    Marking an already-queued santri only refreshes its `marked_at`.
+    """
+    ids = {sid for sid in santri_ids if sid is not None}
+    if not ids:
+        return
+    stmt = pg_insert(SantriSkorDirty).values([{"santri_id": sid} for sid in ids])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[SantriSkorDirty.santri_id],
+        set_={"marked_at": text("now()")},
+    )
+    db.execute(stmt)
+
+
+class RescoreService:
+    """Consume `santri_skor_dirty` marks in batches."""
+
+    def __init__(
+        self,
+        db: Session,
+        batch_size: Optional[int] = None,
+        settle_seconds: Optional[int] = None,
+    ):
+        self.db = db
+        self.batch_size = batch_size or settings.rescore_batch_size
+        self.settle_seconds = settings.rescore_settle_seconds if settle_seconds is None else settle_seconds
+
+    def pending_count(self) -> int:
+        return self.db.query(SantriSkorDirty).count()
+
+    def process_batch(self) -> Dict[str, Any]:
+        """Claim up to `batch_size` marks, re-score them and clear the marks in one transaction.
+
+        Only marks older than `settle_seconds` are claimed, so a burst of edits to the
+        same santri is scored once.
+        """
+        try:
+            rows = self.db.execute(
+                text(
+                    """
+                    SELECT santri_id FROM santri_skor_dirty
+                    WHERE marked_at <= now() - make_interval(secs => :settle)
+                    ORDER BY marked_at
+                    LIMIT :limit
+                    FOR UPDATE SKIP LOCKED
+                    """
+                ),
+                {"settle": self.settle_seconds, "limit": self.batch_size},
+            ).fetchall()
+            santri_ids: List[UUID] = [row.santri_id for row in rows]
+            if not santri_ids:
+                self.db.rollback()
+                return {"claimed": 0, "scored": 0, "errors": []}
+
+            results, errors = BulkScoreService(self.db).score_chunk(santri_ids)
+            self.db.query(SantriSkorDirty).filter(
+                SantriSkorDirty.santri_id.in_(santri_ids)
+            ).delete(synchronize_session=False)
+            self.db.commit()
+            return {"claimed": len(santri_ids), "scored": len(results), "errors": errors}
+        except Exception:
+            self.db.rollback()
+            raise
+
+    def drain(self) -> Dict[str, Any]:
+        """Process batches until no settled marks remain."""
+        claimed = 0
+        scored = 0
+        errors: List[Dict[str, Any]] = []
+        while True:
+            summary = self.process_batch()
+            if not summary["claimed"]:
+                break
+            claimed += summary["claimed"]
+            scored += summary["scored"]
+            errors.extend(summary["errors"])
+        return {"claimed": claimed, "scored": scored, "errors": errors}
+
+
+def run_worker(stop_event: Optional[threading.Event] = None, interval_seconds: Optional[int] = None) -> None:
+    """Drain the dirty queue every `interval_seconds` until `stop_event` is set."""
+    interval = interval_seconds or settings.rescore_interval_seconds
+    stop_event = stop_event or threading.Event()
+    while not stop_event.is_set():
+        db = SessionLocal()
+        try:
+            summary = RescoreService(db).drain()
+            if summary["claimed"]:
+                print(
+                    f"Rescore worker: {summary['scored']} santri re-scored, "
+                    f"{len(summary['errors'])} gagal"
+                )
+        except Exception as e:
+            print(f"Warning: Rescore worker batch failed: {e}")
+        finally:
+            db.close()
+        stop_event.wait(interval)
+
+
+_worker_thread: Optional[threading.Thread] = None
+_worker_stop = threading.Event()
+
+
+def start_background_worker() -> None:
+    """Start the re-scoring worker in a daemon thread (idempotent)."""
+    global _worker_thread
+    if _worker_thread is not None and _worker_thread.is_alive():
+        return
+    _worker_stop.clear()
+    _worker_thread = threading.Thread(
+        target=run_worker, args=(_worker_stop,), name="rescore-worker", daemon=True
+    )
+    _worker_thread.start()
+
+
+def stop_background_worker() -> None:
+    _worker_stop.set()
+
+
+if __name__ == "__main__":
+    import app.main  # noqa: F401  (registers every model mapper)
+
+    print("Rescore worker started (Ctrl+C to stop)")
+    try:
+        run_worker()
+    except KeyboardInterrupt:
+        print("Rescore worker stopped")
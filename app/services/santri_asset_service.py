@@ -11,6 +11,7 @@ from app.models.foto_asset import FotoAsset
 from app.models.santri_pribadi import SantriPribadi
 from app.schemas.santri_asset_schema import SantriAssetCreate, SantriAssetUpdate
 from app.supports import FileHandler
+from app.services.rescore_service import mark_santri_dirty
 
 
 class SantriAssetService:
@@ -96,6 +97,7 @@ class SantriAssetService:
                     )
                     self.db.add(foto)
             
+            mark_santri_dirty(self.db, asset.santri_id)
             self.db.commit()
             self.db.refresh(asset)
             return asset
@@ -120,6 +122,7 @@ class SantriAssetService:
         
         try:
             # Update fields
+            previous_santri_id = asset.santri_id
             update_data = data.model_dump(exclude_unset=True)
             for field, value in update_data.items():
                 if value is not None:
@@ -138,6 +141,7 @@ class SantriAssetService:
                     )
                     self.db.add(foto)
             
+            mark_santri_dirty(self.db, previous_santri_id, asset.santri_id)
             self.db.commit()
             self.db.refresh(asset)
             return asset
@@ -163,6 +167,7 @@ class SantriAssetService:
             self.file_handler.delete_file(str(foto.url_photo))
         
         # Delete asset (cascade will delete fotos)
+        mark_santri_dirty(self.db, asset.santri_id)
         self.db.delete(asset)
         self.db.commit()
         
@@ -9,6 +9,8 @@ from fastapi import HTTPException
 from app.models.santri_bansos import SantriBansos
 from app.models.santri_pribadi import SantriPribadi
 from app.schemas.santri_bansos_schema import SantriBansosCreate, SantriBansosUpdate
+from app.services.data_version_service import bump_data_version
+from app.services.rescore_service import mark_santri_dirty
 
 
 class SantriBansosService:
@@ -92,6 +94,8 @@ class SantriBansosService:
         bansos_dict = data.model_dump()
         bansos = SantriBansos(**bansos_dict)
         self.db.add(bansos)
+        mark_santri_dirty(self.db, bansos.santri_id)
+        bump_data_version(self.db, "santri_bansos")
         self.db.commit()
         self.db.refresh(bansos)
         return bansos
@@ -116,10 +120,13 @@ class SantriBansosService:
             return None
         
         # Update fields
+        previous_santri_id = bansos.santri_id
         update_dict = data.model_dump(exclude_unset=True)
         for key, value in update_dict.items():
             setattr(bansos, key, value)
         
+        mark_santri_dirty(self.db, previous_santri_id, bansos.santri_id)
+        bump_data_version(self.db, "santri_bansos")
         self.db.commit()
         self.db.refresh(bansos)
         return bansos
@@ -138,6 +145,8 @@ class SantriBansosService:
         if not bansos:
             return False
         
+        mark_santri_dirty(self.db, bansos.santri_id)
+        bump_data_version(self.db, "santri_bansos")
         self.db.delete(bansos)
         self.db.commit()
         return True
@@ -0,0 +1,169 @@
+"""Maintenance of the wide `santri_feature` table.
+
+Rows are rebuilt with one `INSERT ... SELECT ... ON CONFLICT (santri_id)` over
+santri_pribadi, its sub-tables and santri_skor. The input columns use the same SQL
+expressions as the score-in-database engine (`app.rules.scoring_sql`), so they hold
+exactly the values `resolve_param_value` gives the scoring rules.
+
+Score writers (bulk, single, jobs, re-scoring worker and the SQL engine) refresh
+the full rows of every santri they score, so a santri appears as soon as it is
+first scored and region or input edits land with its next score. Every write
+also applies its delta to `santri_skor_histogram` (see `score_histogram_service`).
+
+The migration creates the table empty; fill it after upgrading, and rebuild it
+after editing data directly in the database, with:
+    python -m app.services.santri_feature_service
+"""
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from uuid import UUID
+from sqlalchemy import bindparam, text
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
+from sqlalchemy.orm import Session
+
+from app.models.santri_pribadi import SantriPribadi
+from app.rules.scoring_program import SKOR_COMPONENTS
+from app.rules.scoring_sql import _SourceSql
+from app.services.score_histogram_service import ScoreHistogramService
+
+
+DEFAULT_CHUNK_SIZE = 5000
+
+# santri_feature column -> (sumber, kode) of the scoring parameter it holds
+INPUT_COLUMNS: Dict[str, Tuple[str, str]] = {
+    "pendapatan_bulanan": ("santri_orangtua", "pendapatan_bulanan"),
+    "pekerjaan": ("santri_orangtua", "pekerjaan"),
+    "pendidikan": ("santri_orangtua", "pendidikan"),
+    "status_pekerjaan": ("santri_orangtua", "status_pekerjaan"),
+    "status_rumah": ("santri_rumah", "status_rumah"),
+    "jenis_lantai": ("santri_rumah", "jenis_lantai"),
+    "jenis_dinding": ("santri_rumah", "jenis_dinding"),
+    "jenis_atap": ("santri_rumah", "jenis_atap"),
+    "akses_air_bersih": ("santri_rumah", "akses_air_bersih"),
+    "daya_listrik_va": ("santri_rumah", "daya_listrik_va"),
+    "sanitasi_layak": ("santri_rumah", "sanitasi"),
+    "aset_motor": ("santri_asset", "motor"),
+    "aset_mobil": ("santri_asset", "mobil"),
+    "aset_sepeda": ("santri_asset", "sepeda"),
+    "aset_hp": ("santri_asset", "hp"),
+    "aset_laptop": ("santri_asset", "laptop"),
+    "aset_lahan": ("santri_asset", "lahan"),
+    "aset_ternak": ("santri_asset", "ternak"),
+    "aset_alat_kerja": ("santri_asset", "alat_kerja"),
+    "aset_lainnya": ("santri_asset", "lainnya"),
+    "sumber_biaya": ("santri_pembiayaan", "sumber_biaya"),
+    "status_pembayaran": ("santri_pembiayaan", "status_pembayaran"),
+    "tunggakan_bulan": ("santri_pembiayaan", "tunggakan_bulan"),
+    "status_gizi": ("santri_kesehatan", "status_gizi"),
+    "riwayat_penyakit": ("santri_kesehatan", "riwayat_penyakit"),
+    "kebutuhan_khusus": ("santri_kesehatan", "kebutuhan_khusus"),
+    "penyakit_kronis": ("santri_kesehatan", "penyakit_kronis"),
+    "pkh": ("santri_bansos", "pkh"),
+    "bpnt": ("santri_bansos", "bpnt"),
+    "pip": ("santri_bansos", "pip"),
+    "kis_pbi": ("santri_bansos", "kis_pbi"),
+    "blt_desa": ("santri_bansos", "blt_desa"),
+    "pernah_menerima_bansos": ("santri_bansos", "pernah_menerima"),
+}
+
+PRIBADI_COLUMNS = ("pesantren_id", "nama", "jenis_kelamin", "provinsi", "kabupaten", "kecamatan", "desa", "lokasi")
+
+SCORE_COLUMNS = SKOR_COMPONENTS + ("skor_total", "kategori_kemiskinan")
+
+
+def _scoped(sql: str):
+    return text(sql).bindparams(bindparam("santri_ids", type_=ARRAY(PG_UUID(as_uuid=True))))
+
+
+class _FeatureRefreshSql(_SourceSql):
+    """INSERT ... SELECT ... ON CONFLICT that rebuilds santri_feature rows."""
+
+    def __init__(self, scoped: bool):
+        super().__init__()
+        selected = [f"sp.{col}::text" if col == "jenis_kelamin" else f"sp.{col}" for col in PRIBADI_COLUMNS]
+        selected += [self._value(sumber, kode)[0] for sumber, kode in INPUT_COLUMNS.values()]
+        selected += [f"sk.{col}" for col in SCORE_COLUMNS] + ["sk.calculated_at", "now()"]
+        columns = list(PRIBADI_COLUMNS) + list(INPUT_COLUMNS) + list(SCORE_COLUMNS) + ["skor_calculated_at", "refreshed_at"]
+        from_sql = self._from_sql(scoped, ["LEFT JOIN santri_skor sk ON sk.santri_id = sp.id"])
+        self.sql = (
+            f"INSERT INTO santri_feature (santri_id, {', '.join(columns)})"
+            f" SELECT sp.id, {', '.join(selected)} {from_sql}"
+            f" ON CONFLICT (santri_id) DO UPDATE SET {', '.join(f'{col} = EXCLUDED.{col}' for col in columns)}"
+        )
+
+
+_refresh_sql: Dict[bool, _FeatureRefreshSql] = {}
+
+
+def _refresh_statement(scoped: bool) -> _FeatureRefreshSql:
+    compiled = _refresh_sql.get(scoped)
+    if compiled is None:
+        compiled = _refresh_sql[scoped] = _FeatureRefreshSql(scoped)
+    return compiled
+
+
+class SantriFeatureService:
+    """Refresh santri_feature rows; writes are staged, the caller commits."""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.histogram = ScoreHistogramService(db)
+
+    def refresh(self, santri_ids: Optional[Sequence[UUID]] = None) -> int:
+        """Rebuild the rows of the given santri (all santri when None); returns rows written."""
+        if santri_ids is None:
+            compiled = _refresh_statement(scoped=False)
+            written = self.db.execute(text(compiled.sql), compiled.params).rowcount
+            self.histogram.rebuild()
+            return written
+        ids = list(santri_ids)
+        if not ids:
+            return 0
+        before = self.histogram.snapshot(ids)
+        written = self._refresh_ids(ids)
+        self.histogram.apply(ids, before)
+        return written
+
+    def refresh_all(self, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+        """Rebuild every row in keyset-paged chunks, committing after each chunk.
+
+        The histogram is recounted once at the end, which also repairs any drift
+        (e.g. santri removed by a cascading delete).
+        """
+        total = 0
+        for ids in self._iter_id_chunks(chunk_size):
+            total += self._refresh_ids(ids)
+            self.db.commit()
+        self.histogram.rebuild()
+        self.db.commit()
+        return total
+
+    def _refresh_ids(self, ids: List[UUID]) -> int:
+        compiled = _refresh_statement(scoped=True)
+        return self.db.execute(_scoped(compiled.sql), {**compiled.params, "santri_ids": ids}).rowcount
+
+    def _iter_id_chunks(self, chunk_size: int) -> Iterator[List[UUID]]:
+        last_id = None
+        while True:
+            query = self.db.query(SantriPribadi.id).order_by(SantriPribadi.id)
+            if last_id is not None:
+                query = query.filter(SantriPribadi.id > last_id)
+            ids = [row.id for row in query.limit(chunk_size).all()]
+            if not ids:
+                return
+            yield ids
+            last_id = ids[-1]
+
+
+if __name__ == "__main__":
+    import time
+
+    import app.main  # noqa: F401  (registers every model mapper)
+    from app.core.database import SessionLocal
+
+    session = SessionLocal()
+    try:
+        started = time.time()
+        total = SantriFeatureService(session).refresh_all()
+        print(f"santri_feature refreshed: {total} santri in {time.time() - started:.1f}s")
+    finally:
+        session.close()
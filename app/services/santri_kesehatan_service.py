@@ -8,6 +8,7 @@ from fastapi import HTTPException
 from app.models.santri_kesehatan import SantriKesehatan
 from app.models.santri_pribadi import SantriPribadi
 from app.schemas.santri_kesehatan_schema import SantriKesehatanCreate, SantriKesehatanUpdate
+from app.services.rescore_service import mark_santri_dirty
 
 
 class SantriKesehatanService:
@@ -96,6 +97,7 @@ class SantriKesehatanService:
         kesehatan_dict = data.model_dump()
         kesehatan = SantriKesehatan(**kesehatan_dict)
         self.db.add(kesehatan)
+        mark_santri_dirty(self.db, kesehatan.santri_id)
         self.db.commit()
         self.db.refresh(kesehatan)
         return kesehatan
@@ -120,10 +122,12 @@ class SantriKesehatanService:
             return None
         
         # Update fields
+        previous_santri_id = kesehatan.santri_id
         update_dict = data.model_dump(exclude_unset=True)
         for key, value in update_dict.items():
             setattr(kesehatan, key, value)
         
+        mark_santri_dirty(self.db, previous_santri_id, kesehatan.santri_id)
         self.db.commit()
         self.db.refresh(kesehatan)
         return kesehatan
@@ -142,6 +146,7 @@ class SantriKesehatanService:
         if not kesehatan:
             return False
         
+        mark_santri_dirty(self.db, kesehatan.santri_id)
         self.db.delete(kesehatan)
         self.db.commit()
         return True
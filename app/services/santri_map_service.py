@@ -7,6 +7,7 @@ from geoalchemy2.functions import ST_AsGeoJSON, ST_MakePoint, ST_SetSRID
 
 from app.models.santri_map import SantriMap
 from app.models.santri_pribadi import SantriPribadi
+from app.services.gis_grid_service import GisGridService
 
 
 class SantriMapService:
@@ -42,8 +43,10 @@ class SantriMapService:
         
         # Check if map record exists
         existing: SantriMap | None = self.db.query(SantriMap).filter(SantriMap.santri_id == santri_id).first()
+        grid = GisGridService(self.db)
         
         if existing:
+            before = grid.snapshot("santri", [santri_id])
             # Update existing record
             existing.nama = santri.nama  # type: ignore
             existing.skor_terakhir = skor_total  # type: ignore
@@ -54,6 +57,8 @@ class SantriMapService:
             if lokasi is not None:
                 existing.lokasi = lokasi  # type: ignore
             
+            self.db.flush()
+            grid.apply("santri", [santri_id], before)
             self.db.commit()
             self.db.refresh(existing)
             return existing
@@ -68,6 +73,8 @@ class SantriMapService:
                 lokasi=lokasi
             )
             self.db.add(new_map)
+            self.db.flush()
+            grid.apply("santri", [santri_id], [])
             self.db.commit()
             self.db.refresh(new_map)
             return new_map
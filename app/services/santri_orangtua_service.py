@@ -10,6 +10,7 @@ from fastapi import UploadFile, HTTPException
 from app.models.santri_orangtua import SantriOrangtua
 from app.models.foto_orangtua import FotoOrangtua
 from app.schemas.santri_orangtua_schema import SantriOrangtuaCreate, SantriOrangtuaUpdate
+from app.services.rescore_service import mark_santri_dirty
 from app.supports import FileHandler
 
 
@@ -104,6 +105,7 @@ class SantriOrangtuaService:
                     )
                     self.db.add(foto)
             
+            mark_santri_dirty(self.db, orangtua.santri_id)
             self.db.commit()
             self.db.refresh(orangtua)
             return orangtua
@@ -128,6 +130,7 @@ class SantriOrangtuaService:
         
         try:
             # Update fields if provided
+            previous_santri_id = orangtua.santri_id
             update_data = data.model_dump(exclude_unset=True)
             for field, value in update_data.items():
                 if value is not None:
@@ -146,6 +149,7 @@ class SantriOrangtuaService:
                     )
                     self.db.add(foto)
             
+            mark_santri_dirty(self.db, previous_santri_id, orangtua.santri_id)
             self.db.commit()
             self.db.refresh(orangtua)
             return orangtua
@@ -171,6 +175,7 @@ class SantriOrangtuaService:
             self.file_handler.delete_file(str(foto.url_photo))
         
         # Delete orangtua (cascade will delete fotos)
+        mark_santri_dirty(self.db, orangtua.santri_id)
         self.db.delete(orangtua)
         self.db.commit()
         
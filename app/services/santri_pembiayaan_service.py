@@ -8,6 +8,7 @@ from fastapi import HTTPException
 from app.models.santri_pembiayaan import SantriPembiayaan
 from app.models.santri_pribadi import SantriPribadi
 from app.schemas.santri_pembiayaan_schema import SantriPembiayaanCreate, SantriPembiayaanUpdate
+from app.services.rescore_service import mark_santri_dirty
 
 
 class SantriPembiayaanService:
@@ -101,6 +102,7 @@ class SantriPembiayaanService:
         pembiayaan_dict = data.model_dump()
         pembiayaan = SantriPembiayaan(**pembiayaan_dict)
         self.db.add(pembiayaan)
+        mark_santri_dirty(self.db, pembiayaan.santri_id)
         self.db.commit()
         self.db.refresh(pembiayaan)
         return pembiayaan
@@ -125,10 +127,12 @@ class SantriPembiayaanService:
             return None
         
         # Update fields
+        previous_santri_id = pembiayaan.santri_id
         update_dict = data.model_dump(exclude_unset=True)
         for key, value in update_dict.items():
             setattr(pembiayaan, key, value)
         
+        mark_santri_dirty(self.db, previous_santri_id, pembiayaan.santri_id)
         self.db.commit()
         self.db.refresh(pembiayaan)
         return pembiayaan
@@ -147,6 +151,7 @@ class SantriPembiayaanService:
         if not pembiayaan:
             return False
         
+        mark_santri_dirty(self.db, pembiayaan.santri_id)
         self.db.delete(pembiayaan)
         self.db.commit()
         return True
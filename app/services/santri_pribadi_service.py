@@ -10,6 +10,10 @@ from app.models.santri_pribadi import SantriPribadi
 from app.models.foto_santri import FotoSantri
 from app.schemas.santri_pribadi_schema import SantriPribadiCreate, SantriPribadiUpdate
 from app.supports import FileHandler
+from app.services.data_version_service import bump_data_version
+from app.services.rescore_service import mark_santri_dirty
+from app.services.score_histogram_service import ScoreHistogramService
+from app.services.gis_grid_service import GisGridService
 
 
 class SantriPribadiService:
@@ -151,6 +155,8 @@ class SantriPribadiService:
                         detail=f"Failed to upload photo: {str(e)}"
                     )
         
+        # Score the new santri and build its santri_feature row
+        mark_santri_dirty(self.db, santri.id)
         self.db.commit()
         self.db.refresh(santri)
         return santri
@@ -184,6 +190,9 @@ class SantriPribadiService:
         for key, value in update_dict.items():
             setattr(santri, key, value)
         
+        # nama, region and lokasi are copied into santri_map / santri_feature
+        mark_santri_dirty(self.db, santri.id)
+        bump_data_version(self.db, "santri_pribadi")
         self.db.commit()
         self.db.refresh(santri)
         return santri
@@ -206,6 +215,11 @@ class SantriPribadiService:
         for foto in santri.foto_santri:
             self.file_handler.delete_file(str(foto.url_photo))
         
+        # Take the santri out of the score histogram before its santri_feature row cascades away
+        ScoreHistogramService(self.db).remove([santri.id])
+        GisGridService(self.db).remove("santri", [santri.id])
+        bump_data_version(self.db, "santri_pribadi", "santri_skor", "santri_bansos")
+        
         # Delete santri (cascade will delete foto records)
         self.db.delete(santri)
         self.db.commit()
@@ -0,0 +1,199 @@
+"""Top-N ranking of the neediest santri per kabupaten, kecamatan or pesantren.
+
+Reads `santri_feature` through the partial ranking indexes
+(group columns, skor_total DESC, skor_<dimensi> DESC..., santri_id DESC), so both
+query shapes touch only the rows they return:
+
+- top N of every group: the groups are enumerated with a recursive skip scan over
+  the index and each group's first N rows are read with a LATERAL
+  `ORDER BY ... LIMIT N` (ranked with row_number())
+- one group, page by page: keyset pagination on the full sort key
+"""
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.rules.scoring_program import SKOR_COMPONENTS
+from app.supports import decode_cursor, encode_cursor
+
+
+# Ranking order: skor_total, then the dimension scores as tie-breakers, then santri_id
+RANK_COLUMNS: Tuple[str, ...] = ("skor_total",) + SKOR_COMPONENTS
+
+# level -> columns that identify a group
+LEVELS: Dict[str, Tuple[str, ...]] = {
+    "kabupaten": ("kabupaten",),
+    "kecamatan": ("kabupaten", "kecamatan"),
+    "pesantren": ("pesantren_id",),
+}
+
+MAX_TOP_N = 500
+
+_SELECT = ", ".join(
+    ("santri_id", "nama", "pesantren_id", "provinsi", "kabupaten", "kecamatan", "desa")
+    + RANK_COLUMNS
+    + ("kategori_kemiskinan",)
+)
+_ORDER = ", ".join(f"{col} DESC" for col in RANK_COLUMNS + ("santri_id",))
+_SORT_KEY = "(" + ", ".join(RANK_COLUMNS + ("santri_id",)) + ")"
+
+
+def _item(row, peringkat: int) -> Dict[str, Any]:
+    item = dict(row._mapping)
+    item.pop("peringkat", None)
+    item["santri_id"] = str(item["santri_id"])
+    item["pesantren_id"] = str(item["pesantren_id"]) if item["pesantren_id"] else None
+    item["peringkat"] = peringkat
+    return item
+
+
+def _is_int(value: Any) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+class SantriRankingService:
+    """Rank santri by skor_total within a region or pesantren."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def ranking(
+        self,
+        level: str = "kabupaten",
+        n: int = 50,
+        provinsi: Optional[str] = None,
+        kabupaten: Optional[str] = None,
+        kecamatan: Optional[str] = None,
+        pesantren_id: Optional[UUID] = None,
+        after: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Top `n` santri per group, or one page of a single group.
+
+        When the filters name a single group (e.g. level=kecamatan with kabupaten and
+        kecamatan), the result is that group's ranking from `after` onwards with a
+        `next_cursor`; otherwise it is the top `n` of every matching group.
+
+        Raises:
+            ValueError: Unknown level, n out of range or invalid cursor
+        """
+        if level not in LEVELS:
+            raise ValueError(f"Level tidak dikenal: {level}. Pilihan: {', '.join(LEVELS)}")
+        if not 1 <= n <= MAX_TOP_N:
+            raise ValueError(f"n harus di antara 1 dan {MAX_TOP_N}")
+
+        filters = {"kabupaten": kabupaten, "kecamatan": kecamatan, "pesantren_id": pesantren_id}
+        group_columns = LEVELS[level]
+        if all(filters[col] is not None for col in group_columns):
+            group = {col: filters[col] for col in group_columns}
+            return self._group_page(level, group, n, provinsi, after)
+        if after is not None:
+            raise ValueError("Cursor hanya berlaku untuk satu grup; lengkapi filter grupnya")
+        return self._top_per_group(level, n, provinsi, kabupaten)
+
+    def _group_page(
+        self,
+        level: str,
+        group: Dict[str, Any],
+        n: int,
+        provinsi: Optional[str],
+        after: Optional[str],
+    ) -> Dict[str, Any]:
+        conditions = ["skor_total IS NOT NULL"] + [f"{col} = :{col}" for col in group]
+        params: Dict[str, Any] = {**group, "limit": n + 1}
+        if provinsi is not None:
+            conditions.append("provinsi = :provinsi")
+            params["provinsi"] = provinsi
+        rank_offset = 0
+        if after is not None:
+            values = decode_cursor(after, len(RANK_COLUMNS) + 2)
+            rank_offset, scores, last_id = values[0], values[1:-1], values[-1]
+            # Checked here so a tampered cursor is a ValueError, not a failed query
+            if not _is_int(rank_offset) or rank_offset < 0:
+                raise ValueError("Cursor tidak valid")
+            if not all(value is None or _is_int(value) for value in scores):
+                raise ValueError("Cursor tidak valid")
+            keys = [f"c{i}" for i in range(len(RANK_COLUMNS) + 1)]
+            conditions.append(f"{_SORT_KEY} < ({', '.join(':' + key for key in keys)})")
+            params.update(zip(keys, scores))
+            try:
+                params[keys[-1]] = UUID(str(last_id))
+            except ValueError:
+                raise ValueError("Cursor tidak valid")
+
+        rows = self.db.execute(
+            text(f"SELECT {_SELECT} FROM santri_feature WHERE {' AND '.join(conditions)} ORDER BY {_ORDER} LIMIT :limit"),
+            params,
+        ).all()
+        items = [_item(row, rank_offset + i + 1) for i, row in enumerate(rows[:n])]
+        next_cursor = None
+        if len(rows) > n:
+            last = rows[n - 1]
+            next_cursor = encode_cursor(
+                [rank_offset + n] + [getattr(last, col) for col in RANK_COLUMNS] + [str(last.santri_id)]
+            )
+        return {
+            "level": level,
+            "group": {col: str(value) for col, value in group.items()},
+            "items": items,
+            "next_cursor": next_cursor,
+        }
+
+    def _top_per_group(self, level: str, n: int, provinsi: Optional[str], kabupaten: Optional[str]) -> Dict[str, Any]:
+        group_columns = LEVELS[level]
+        columns = ", ".join(group_columns)
+        present = " AND ".join(f"{col} IS NOT NULL" for col in group_columns)
+        params: Dict[str, Any] = {"n": n}
+
+        # kabupaten narrows the skip scan when it leads the group; otherwise, like
+        # provinsi, it keeps groups that have santri there and filters their rows
+        prefix = ""
+        region = {"provinsi": provinsi}
+        if kabupaten is not None:
+            if group_columns[0] == "kabupaten":
+                prefix = " AND kabupaten = :kabupaten"
+                params["kabupaten"] = kabupaten
+            else:
+                region["kabupaten"] = kabupaten
+        region = {col: value for col, value in region.items() if value is not None}
+        params.update(region)
+
+        in_region = ""
+        lateral_region = "".join(f" AND f.{col} = :{col}" for col in region)
+        if region:
+            match = " AND ".join(
+                [f"p.{col} = :{col}" for col in region] + [f"p.{col} = g.{col}" for col in group_columns]
+            )
+            in_region = f" WHERE EXISTS (SELECT 1 FROM santri_feature p WHERE {match})"
+
+        sql = f"""
+        WITH RECURSIVE groups AS (
+            (SELECT {columns} FROM santri_feature
+             WHERE skor_total IS NOT NULL AND {present}{prefix}
+             ORDER BY {columns} LIMIT 1)
+            UNION ALL
+            SELECT nxt.* FROM groups g
+            CROSS JOIN LATERAL (
+                SELECT {columns} FROM santri_feature
+                WHERE skor_total IS NOT NULL AND {present}{prefix}
+                  AND ({columns}) > ({', '.join('g.' + col for col in group_columns)})
+                ORDER BY {columns} LIMIT 1
+            ) nxt
+        )
+        SELECT r.* FROM groups g
+        CROSS JOIN LATERAL (
+            SELECT {_SELECT}, row_number() OVER (ORDER BY {_ORDER}) AS peringkat
+            FROM santri_feature f
+            WHERE f.skor_total IS NOT NULL
+              AND {' AND '.join(f'f.{col} = g.{col}' for col in group_columns)}{lateral_region}
+            ORDER BY {_ORDER} LIMIT :n
+        ) r{in_region}
+        ORDER BY {', '.join('r.' + col for col in group_columns)}, r.peringkat
+        """
+        groups: List[Dict[str, Any]] = []
+        for row in self.db.execute(text(sql), params):
+            key = {col: str(getattr(row, col)) for col in group_columns}
+            if not groups or groups[-1]["group"] != key:
+                groups.append({"group": key, "items": []})
+            groups[-1]["items"].append(_item(row, row.peringkat))
+        return {"level": level, "n": n, "groups": groups}
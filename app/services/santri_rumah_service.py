@@ -11,6 +11,7 @@ from app.models.santri_rumah import SantriRumah
 from app.models.foto_rumah import FotoRumah
 from app.schemas.santri_rumah_schema import SantriRumahCreate, SantriRumahUpdate
 from app.supports import FileHandler
+from app.services.rescore_service import mark_santri_dirty
 
 
 class SantriRumahService:
@@ -89,6 +90,7 @@ class SantriRumahService:
                     )
                     self.db.add(foto)
             
+            mark_santri_dirty(self.db, rumah.santri_id)
             self.db.commit()
             self.db.refresh(rumah)
             return rumah
@@ -115,6 +117,7 @@ class SantriRumahService:
             if update_dict:
                 stmt = update(SantriRumah).where(SantriRumah.id == rumah_id).values(**update_dict)
                 self.db.execute(stmt)
+                mark_santri_dirty(self.db, rumah.santri_id, update_dict.get("santri_id"))
             
             # Upload new photos if provided
             if foto_files:
@@ -151,6 +154,7 @@ class SantriRumahService:
         for foto in fotos:
             self.file_handler.delete_file(str(foto.url_photo))
 
+        mark_santri_dirty(self.db, rumah.santri_id)
         self.db.delete(rumah)
         self.db.commit()
         return True
@@ -0,0 +1,212 @@
+"""Pre-aggregated santri score distributions.
+
+`santri_skor_histogram` counts santri per exact score value, per dimension and per
+(provinsi, kabupaten, pesantren) group. It follows `santri_feature` by deltas: the
+feature writers read a batch's current counts (`snapshot`, which also locks the
+feature rows), rewrite the rows, then write the net change, new minus old, in one
+upsert ordered by primary key (`apply`), all in the caller's transaction. Every
+writer takes its histogram row locks in a single statement and in the same
+order, so concurrent batches sharing rows wait instead of deadlocking. Deletes
+subtract the rows before they cascade away (`remove`).
+
+Distribution queries sum the matching groups per score value, so histograms,
+quantiles and percentile ranks cost O(distinct score values x groups) rows no
+matter how many santri there are.
+"""
+import math
+from typing import Any, Dict, List, Optional, Sequence
+from uuid import UUID
+from sqlalchemy import bindparam, text
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
+from sqlalchemy.orm import Session
+
+from app.rules.scoring_program import SKOR_COMPONENTS, get_scoring_program
+
+
+# `total` is skor_total; the others are the santri_skor dimension columns without `skor_`
+DIMENSIONS = ("total",) + tuple(col[len("skor_"):] for col in SKOR_COMPONENTS)
+
+DEFAULT_QUANTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+
+# Counts of the scoped feature rows per histogram key; {before} may append older counts
+_COUNTS = """
+WITH f AS (
+    SELECT * FROM santri_feature WHERE {scope}{lock}
+), c AS (
+    SELECT v.dimensi, COALESCE(f.provinsi, '') AS provinsi, COALESCE(f.kabupaten, '') AS kabupaten,
+           f.pesantren_id, v.skor, count(*) AS jumlah
+    FROM f
+    CROSS JOIN LATERAL (VALUES {values}) v(dimensi, skor)
+    WHERE f.pesantren_id IS NOT NULL AND v.skor IS NOT NULL
+    GROUP BY 1, 2, 3, 4, 5{before}
+)
+""".replace("{values}", ", ".join(f"('{dim}', f.skor_{dim})" for dim in DIMENSIONS))
+
+_SNAPSHOT = _COUNTS + "SELECT dimensi, provinsi, kabupaten, pesantren_id, skor, jumlah FROM c"
+
+_BEFORE = """
+    UNION ALL
+    SELECT * FROM unnest(
+        CAST(:dimensi AS text[]), CAST(:provinsi AS text[]), CAST(:kabupaten AS text[]),
+        CAST(:pesantren_id AS uuid[]), CAST(:skor AS int[]), CAST(:jumlah AS bigint[])
+    )"""
+
+_UPSERT = _COUNTS + """
+INSERT INTO santri_skor_histogram (dimensi, provinsi, kabupaten, pesantren_id, skor, jumlah)
+SELECT dimensi, provinsi, kabupaten, pesantren_id, skor, {sign} * sum(jumlah)
+FROM c
+GROUP BY 1, 2, 3, 4, 5
+HAVING sum(jumlah) <> 0
+ORDER BY 1, 2, 3, 4, 5
+ON CONFLICT (dimensi, provinsi, kabupaten, pesantren_id, skor)
+DO UPDATE SET jumlah = santri_skor_histogram.jumlah + EXCLUDED.jumlah
+"""
+
+_SCOPE = "santri_id = ANY(:santri_ids)"
+
+
+def _scoped(sql: str):
+    return text(sql).bindparams(bindparam("santri_ids", type_=ARRAY(PG_UUID(as_uuid=True))))
+
+
+def _quantile(counts: List[List[int]], total: int, q: float) -> int:
+    """Smallest score whose cumulative count reaches q * total (PostgreSQL percentile_disc)."""
+    target = max(1, math.ceil(q * total))
+    running = 0
+    for skor, jumlah in counts:
+        running += jumlah
+        if running >= target:
+            return skor
+    return counts[-1][0]
+
+
+class ScoreHistogramService:
+    """Maintain and query `santri_skor_histogram`."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    # ----- maintenance -----
+
+    def snapshot(self, santri_ids: Sequence[UUID]) -> List[tuple]:
+        """Current counts of these santri's santri_feature rows; locks the rows until commit.
+
+        Pass the result to `apply` once the rows are rewritten.
+        """
+        ids = list(santri_ids)
+        if not ids:
+            return []
+        sql = _SNAPSHOT.format(scope=_SCOPE, lock=" FOR UPDATE", before="")
+        return [tuple(row) for row in self.db.execute(_scoped(sql), {"santri_ids": ids})]
+
+    def apply(self, santri_ids: Sequence[UUID], before: Sequence[tuple]) -> None:
+        """Write the net change of these santri: their current counts minus `before`."""
+        ids = list(santri_ids)
+        if not ids and not before:
+            return
+        columns = list(zip(*before)) if before else [()] * 6
+        params: Dict[str, Any] = {
+            "santri_ids": ids,
+            "dimensi": list(columns[0]),
+            "provinsi": list(columns[1]),
+            "kabupaten": list(columns[2]),
+            "pesantren_id": [str(value) for value in columns[3]],
+            "skor": list(columns[4]),
+            "jumlah": [-value for value in columns[5]],
+        }
+        sql = _UPSERT.format(scope=_SCOPE, lock="", sign=1, before=_BEFORE)
+        self.db.execute(_scoped(sql), params)
+
+    def remove(self, santri_ids: Sequence[UUID]) -> None:
+        """Subtract the current santri_feature rows of these santri, e.g. before they are deleted."""
+        ids = list(santri_ids)
+        if ids:
+            sql = _UPSERT.format(scope=_SCOPE, lock="", sign=-1, before="")
+            self.db.execute(_scoped(sql), {"santri_ids": ids})
+
+    def rebuild(self) -> None:
+        """Recount everything from santri_feature (after a full refresh)."""
+        self.db.execute(text("DELETE FROM santri_skor_histogram"))
+        self.db.execute(text(_UPSERT.format(scope="TRUE", lock="", sign=1, before="")))
+
+    # ----- queries -----
+
+    def distribution(
+        self,
+        dimensi: str = "total",
+        provinsi: Optional[str] = None,
+        kabupaten: Optional[str] = None,
+        pesantren_id: Optional[UUID] = None,
+        bins: int = 10,
+        quantiles: Sequence[float] = DEFAULT_QUANTILES,
+        skor: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Histogram with `bins` fixed-width bins over [0, skor_maks], quantiles and,
+        given `skor`, its percentile rank within the filtered population.
+
+        Raises:
+            ValueError: Unknown dimension or invalid bins/quantiles
+        """
+        if dimensi not in DIMENSIONS:
+            raise ValueError(f"Dimensi tidak dikenal: {dimensi}. Pilihan: {', '.join(DIMENSIONS)}")
+        if bins < 1:
+            raise ValueError("bins harus >= 1")
+        if any(not 0 < q <= 1 for q in quantiles):
+            raise ValueError("quantiles harus di antara 0 (eksklusif) dan 1")
+
+        conditions = ["dimensi = :dimensi"]
+        params: Dict[str, Any] = {"dimensi": dimensi}
+        for column, value in (("provinsi", provinsi), ("kabupaten", kabupaten), ("pesantren_id", pesantren_id)):
+            if value is not None:
+                conditions.append(f"{column} = :{column}")
+                params[column] = value
+        rows = self.db.execute(
+            text(
+                "SELECT skor, SUM(jumlah)::bigint AS jumlah FROM santri_skor_histogram"
+                f" WHERE {' AND '.join(conditions)} GROUP BY skor HAVING SUM(jumlah) > 0 ORDER BY skor"
+            ),
+            params,
+        ).all()
+        counts = [[row.skor, int(row.jumlah)] for row in rows]
+        total = sum(jumlah for _, jumlah in counts)
+
+        program = get_scoring_program()
+        maks = {dim.key: dim.skor_maks for dim in program.dimensions}
+        skor_maks = sum(maks.values()) if dimensi == "total" else maks.get(dimensi, 0)
+
+        low = min([0] + [s for s, _ in counts[:1]])
+        high = max([skor_maks] + [s for s, _ in counts[-1:]])
+        width = max(1, math.ceil((high - low + 1) / bins))
+        histogram = [
+            {"dari": low + i * width, "sampai": min(high, low + (i + 1) * width - 1), "jumlah": 0}
+            for i in range(math.ceil((high - low + 1) / width))
+        ]
+        for value, jumlah in counts:
+            histogram[(value - low) // width]["jumlah"] += jumlah
+
+        result: Dict[str, Any] = {
+            "dimensi": dimensi,
+            "filter": {
+                "provinsi": provinsi,
+                "kabupaten": kabupaten,
+                "pesantren_id": str(pesantren_id) if pesantren_id else None,
+            },
+            "total_santri": total,
+            "skor_maks": skor_maks,
+            "min": counts[0][0] if counts else None,
+            "max": counts[-1][0] if counts else None,
+            "mean": round(sum(s * j for s, j in counts) / total, 2) if total else None,
+            "bin_width": width,
+            "bins": histogram,
+            "quantiles": {f"{q:g}": _quantile(counts, total, q) for q in quantiles} if total else {},
+        }
+        if skor is not None:
+            below = sum(j for s, j in counts if s < skor)
+            at = sum(j for s, j in counts if s == skor)
+            result["percentile_rank"] = {
+                "skor": skor,
+                # Share of santri scoring strictly below / at most `skor`
+                "persen_di_bawah": round(below * 100 / total, 2) if total else None,
+                "persen_sampai": round((below + at) * 100 / total, 2) if total else None,
+            }
+        return result
@@ -0,0 +1,245 @@
+"""Bulk persistence of santri and pesantren score results.
+
+A batch of results is written to `santri_skor` and `santri_map` (or
+`pesantren_skor` and `pesantren_map`) with multi-row `INSERT ... ON CONFLICT
+DO UPDATE` statements: no existence checks, no per-row commits and no refreshes.
+The caller owns the transaction, so a batch costs one statement per table (per
+`UPSERT_BATCH_SIZE` rows) and one commit.
+
+Each scored santri row is a dict with `santri_id`, `nama`, `pesantren_id`,
+`lokasi`, `components` (skor_* values), `skor_total`, `kategori_kemiskinan`,
+`metode`, `version`, `breakdown` and `input_hashes`, as produced by
+`BulkScoreService.compute_chunk`; rows flagged `unchanged` (identical to the stored
+score) skip the santri_skor upsert. The `santri_feature` rows of every scored santri
+are refreshed (upserted) in the same transaction, and the `santri_skor`
+data version is bumped for cached analytics. Map upserts apply their delta to the
+`gis_grid_cell` density grid. Scored pesantren rows
+come from `PesantrenBulkScoreService.compute_chunk`.
+"""
+from typing import Any, Dict, List, Sequence
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.rules.scoring_program import SKOR_COMPONENTS
+from app.models.santri_skor import SantriSkor
+from app.models.santri_map import SantriMap
+from app.models.pesantren_skor import PesantrenSkor
+from app.models.pesantren_map import PesantrenMap
+from app.services.data_version_service import bump_data_version
+from app.services.gis_grid_service import GisGridService
+from app.services.santri_feature_service import SantriFeatureService
+
+
+# Rows per statement; keeps bind parameters well under PostgreSQL's 65535 limit
+UPSERT_BATCH_SIZE = 1000
+
+_SKOR_UPDATE_COLUMNS = SKOR_COMPONENTS + (
+    "skor_total",
+    "kategori_kemiskinan",
+    "metode",
+    "version",
+    "breakdown",
+    "input_hashes",
+)
+
+_PESANTREN_SKOR_UPDATE_COLUMNS = (
+    "skor_fisik",
+    "skor_air_sanitasi",
+    "skor_fasilitas_pendukung",
+    "skor_mutu_pendidikan",
+    "skor_total",
+    "kategori_kelayakan",
+    "metode",
+    "version",
+    "breakdown",
+)
+
+
+def _batches(rows: Sequence[Dict[str, Any]]):
+    for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+        yield rows[start:start + UPSERT_BATCH_SIZE]
+
+
+def _skor_values(item: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "santri_id": item["santri_id"],
+        **item["components"],
+        "skor_total": item["skor_total"],
+        "kategori_kemiskinan": item["kategori_kemiskinan"],
+        "metode": item["metode"],
+        "version": item["version"],
+        "breakdown": item["breakdown"],
+        "input_hashes": item.get("input_hashes"),
+    }
+
+
+def _map_values(item: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "santri_id": item["santri_id"],
+        "nama": item["nama"],
+        "skor_terakhir": item["skor_total"],
+        "kategori_kemiskinan": item["kategori_kemiskinan"],
+        "pesantren_id": item["pesantren_id"],
+        "lokasi": item["lokasi"],
+    }
+
+
+def _skor_upsert(rows: List[Dict[str, Any]]):
+    stmt = pg_insert(SantriSkor).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=[SantriSkor.santri_id],
+        set_={col: stmt.excluded[col] for col in _SKOR_UPDATE_COLUMNS},
+    )
+
+
+class SantriScoreWriter:
+    """Upsert score results into santri_skor and santri_map."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def write(self, scored: Sequence[Dict[str, Any]]) -> None:
+        """Upsert scores and the GIS map rows; a map failure must not lose the scores."""
+        if not scored:
+            return
+        self.upsert_scores(scored)
+        self._upsert_map_safely(scored)
+        # Unchanged scores still refresh the feature row: region or inputs may have changed
+        self._sync_features_safely([item["santri_id"] for item in scored])
+
+    def write_one(self, item: Dict[str, Any]) -> SantriSkor:
+        """Upsert a single result and return its `santri_skor` row (one statement, RETURNING)."""
+        record = self.db.scalars(
+            _skor_upsert([_skor_values(item)]).returning(SantriSkor),
+            execution_options={"populate_existing": True},
+        ).one()
+        bump_data_version(self.db, "santri_skor")
+        self._upsert_map_safely([item])
+        self._sync_features_safely([item["santri_id"]])
+        return record
+
+    def upsert_scores(self, scored: Sequence[Dict[str, Any]]) -> None:
+        rows = [_skor_values(item) for item in scored if not item.get("unchanged")]
+        for batch in _batches(rows):
+            self.db.execute(_skor_upsert(batch))
+        if rows:
+            bump_data_version(self.db, "santri_skor")
+
+    def _upsert_map_safely(self, scored: Sequence[Dict[str, Any]]) -> None:
+        # AUTO-UPDATE SANTRI MAP for GIS inside a savepoint
+        try:
+            with self.db.begin_nested():
+                self.upsert_map(scored)
+        except Exception as map_error:
+            print(f"Warning: Failed to update santri_map: {map_error}")
+
+    def _sync_features_safely(self, santri_ids: List[Any]) -> None:
+        if not santri_ids:
+            return
+        try:
+            with self.db.begin_nested():
+                SantriFeatureService(self.db).refresh(santri_ids)
+        except Exception as feature_error:
+            print(f"Warning: Failed to update santri_feature: {feature_error}")
+
+    def upsert_map(self, scored: Sequence[Dict[str, Any]]) -> None:
+        rows = [_map_values(item) for item in scored]
+        ids = [row["santri_id"] for row in rows]
+        grid = GisGridService(self.db)
+        before = grid.snapshot("santri", ids)
+        for batch in _batches(rows):
+            stmt = pg_insert(SantriMap).values(batch)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[SantriMap.santri_id],
+                set_={
+                    "nama": stmt.excluded.nama,
+                    "skor_terakhir": stmt.excluded.skor_terakhir,
+                    "kategori_kemiskinan": stmt.excluded.kategori_kemiskinan,
+                    "pesantren_id": stmt.excluded.pesantren_id,
+                    # Keep the stored location when the santri has none
+                    "lokasi": func.coalesce(stmt.excluded.lokasi, SantriMap.lokasi),
+                },
+            )
+            self.db.execute(stmt)
+        grid.apply("santri", ids, before)
+
+
+class PesantrenScoreWriter:
+    """Upsert score results into pesantren_skor and pesantren_map."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def write(self, scored: Sequence[Dict[str, Any]]) -> None:
+        """Upsert scores and the GIS map rows; a map failure must not lose the scores."""
+        if not scored:
+            return
+        self.upsert_scores(scored)
+        self._upsert_map_safely(scored)
+
+    def upsert_scores(self, scored: Sequence[Dict[str, Any]]) -> None:
+        rows = [
+            {
+                "pesantren_id": item["pesantren_id"],
+                **item["components"],
+                "skor_total": item["skor_total"],
+                "kategori_kelayakan": item["kategori_kelayakan"],
+                "metode": item["metode"],
+                "version": item["version"],
+                "breakdown": item["breakdown"],
+            }
+            for item in scored
+        ]
+        for batch in _batches(rows):
+            stmt = pg_insert(PesantrenSkor).values(batch)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[PesantrenSkor.pesantren_id],
+                set_={col: stmt.excluded[col] for col in _PESANTREN_SKOR_UPDATE_COLUMNS},
+            )
+            self.db.execute(stmt)
+
+    def _upsert_map_safely(self, scored: Sequence[Dict[str, Any]]) -> None:
+        # AUTO-UPDATE PESANTREN MAP for GIS inside a savepoint
+        try:
+            with self.db.begin_nested():
+                self.upsert_map(scored)
+        except Exception as map_error:
+            print(f"Warning: Failed to update pesantren_map: {map_error}")
+
+    def upsert_map(self, scored: Sequence[Dict[str, Any]]) -> None:
+        rows = [
+            {
+                "pesantren_id": item["pesantren_id"],
+                "nama": item["nama"],
+                "nsp": item["nsp"],
+                "skor_terakhir": item["skor_total"],
+                "kategori_kelayakan": item["kategori_kelayakan"],
+                "kabupaten": item["kabupaten"],
+                "provinsi": item["provinsi"],
+                "jumlah_santri": item["jumlah_santri"],
+                "lokasi": item["lokasi"],
+            }
+            for item in scored
+        ]
+        ids = [row["pesantren_id"] for row in rows]
+        grid = GisGridService(self.db)
+        before = grid.snapshot("pesantren", ids)
+        for batch in _batches(rows):
+            stmt = pg_insert(PesantrenMap).values(batch)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[PesantrenMap.pesantren_id],
+                set_={
+                    "nama": stmt.excluded.nama,
+                    "nsp": stmt.excluded.nsp,
+                    "skor_terakhir": stmt.excluded.skor_terakhir,
+                    "kategori_kelayakan": stmt.excluded.kategori_kelayakan,
+                    "kabupaten": stmt.excluded.kabupaten,
+                    "provinsi": stmt.excluded.provinsi,
+                    "jumlah_santri": stmt.excluded.jumlah_santri,
+                    # Keep the stored location when the pesantren has none
+                    "lokasi": func.coalesce(stmt.excluded.lokasi, PesantrenMap.lokasi),
+                },
+            )
+            self.db.execute(stmt)
+        grid.apply("pesantren", ids, before)
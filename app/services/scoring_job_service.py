@@ -0,0 +1,282 @@
+"""Asynchronous batch scoring jobs.
+
+A job scores every santri (or pesantren) in id order, `chunk_size` at a time.
+Each chunk's scores, its per-entity results and the job's progress/cursor are
+committed together, so a job whose process was killed can be resumed from the
+last committed chunk without rescoring or losing results.
+
+Every claim stamps the job's `started_at`, and a runner only commits while the
+stamp is still its own. A runner whose stale job was taken over by a resume
+therefore stops at its next chunk instead of racing the new runner.
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+from sqlalchemy.orm import Session
+from sqlalchemy import func, insert, text
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.scoring_job import ScoringJob, ScoringJobItem
+from app.models.santri_pribadi import SantriPribadi
+from app.models.pondok_pesantren import PondokPesantren
+from app.services.bulk_score_service import BulkScoreService
+from app.services.parallel_score_service import ParallelScoreService
+from app.services.pesantren_bulk_score_service import PesantrenBulkScoreService
+from app.services.sql_score_service import SqlScoreService
+
+
+JOB_KINDS = ("santri", "pesantren")
+
+# A running job without a chunk commit for this long is considered dead and may be resumed
+STALE_AFTER_SECONDS = 300
+
+# Guarded job updates: only the runner holding the current claim may write
+_OWNED = "id = :job_id AND status = 'running' AND started_at = :claimed_at"
+
+
+class JobTakenOver(Exception):
+    """The job was claimed by another runner since this runner claimed it."""
+
+
+class ScoringJobService:
+    """Create, run and report on batch scoring jobs."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def create(self, kind: str, chunk_size: Optional[int] = None) -> ScoringJob:
+        """Register a pending job; the caller schedules `run_scoring_job` for it."""
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Jenis job tidak dikenal: {kind}")
+        model = SantriPribadi if kind == "santri" else PondokPesantren
+        job = ScoringJob(
+            kind=kind,
+            status="pending",
+            chunk_size=chunk_size or settings.scoring_job_chunk_size,
+            total=self.db.query(func.count(model.id)).scalar() or 0,
+        )
+        self.db.add(job)
+        self.db.commit()
+        self.db.refresh(job)
+        return job
+
+    def get_by_id(self, job_id: UUID) -> Optional[ScoringJob]:
+        return self.db.query(ScoringJob).filter(ScoringJob.id == job_id).first()
+
+    def get_all(self, page: int = 1, per_page: int = 20) -> Tuple[List[ScoringJob], int]:
+        query = self.db.query(ScoringJob)
+        total = query.count()
+        jobs = (
+            query.order_by(ScoringJob.created_at.desc())
+            .offset((page - 1) * per_page)
+            .limit(per_page)
+            .all()
+        )
+        return jobs, total
+
+    def get_items(
+        self,
+        job_id: UUID,
+        page: int = 1,
+        per_page: int = 100,
+        success: Optional[bool] = None,
+    ) -> Tuple[List[ScoringJobItem], int]:
+        """Per-entity results of a job, in processing order."""
+        query = self.db.query(ScoringJobItem).filter(ScoringJobItem.job_id == job_id)
+        if success is not None:
+            query = query.filter(ScoringJobItem.success == success)
+        total = query.count()
+        items = (
+            query.order_by(ScoringJobItem.entity_id)
+            .offset((page - 1) * per_page)
+            .limit(per_page)
+            .all()
+        )
+        return items, total
+
+    @staticmethod
+    def to_dict(job: ScoringJob) -> Dict[str, Any]:
+        """Job status with progress percentage, throughput and ETA (based on the current run's rate)."""
+        done = job.processed + job.failed
+        eta_seconds = None
+        throughput = None
+        last_progress_at = job.finished_at if job.status == "completed" else job.heartbeat_at
+        if job.status in ("running", "completed") and job.started_at and last_progress_at:
+            elapsed = (last_progress_at - job.started_at).total_seconds()
+            done_this_run = done - job.done_at_start
+            if elapsed > 0 and done_this_run > 0:
+                throughput = round(done_this_run / elapsed, 1)
+                if job.status == "running":
+                    eta_seconds = round(max(job.total - done, 0) * elapsed / done_this_run, 1)
+        return {
+            "id": job.id,
+            "kind": job.kind,
+            "status": job.status,
+            "total": job.total,
+            "processed": job.processed,
+            "failed": job.failed,
+            "progress_percent": round(done * 100 / job.total, 2) if job.total else 100.0,
+            "eta_seconds": eta_seconds,
+            "throughput_per_second": throughput,
+            "chunk_size": job.chunk_size,
+            "error": job.error,
+            "created_at": job.created_at,
+            "started_at": job.started_at,
+            "heartbeat_at": job.heartbeat_at,
+            "finished_at": job.finished_at,
+        }
+
+    def claim(self, job_id: UUID) -> Optional[datetime]:
+        """Mark a job as running if it is pending, failed or stale.
+
+        Returns the claim's `started_at`, which the runner passes back with every
+        write, or None if someone else runs the job.
+        """
+        row = self.db.execute(
+            text(
+                """
+                UPDATE scoring_job
+                SET status = 'running',
+                    started_at = now(),
+                    heartbeat_at = now(),
+                    done_at_start = processed + failed,
+                    error = NULL
+                WHERE id = :job_id
+                  AND (
+                    status IN ('pending', 'failed')
+                    OR (status = 'running'
+                        AND COALESCE(heartbeat_at, started_at, created_at)
+                            < now() - make_interval(secs => :stale))
+                  )
+                RETURNING started_at
+                """
+            ),
+            {"job_id": job_id, "stale": STALE_AFTER_SECONDS},
+        ).first()
+        self.db.commit()
+        return row.started_at if row else None
+
+    def run(self, job_id: UUID, claimed_at: Optional[datetime] = None) -> None:
+        """Process the job from its cursor to the end, committing once per chunk.
+
+        Args:
+            job_id: Job to run
+            claimed_at: Value returned by `claim` when the caller already claimed the job
+        """
+        if claimed_at is None:
+            claimed_at = self.claim(job_id)
+            if claimed_at is None:
+                return
+        job = self.get_by_id(job_id)
+        try:
+            if job.kind == "santri":
+                self._run_santri(job, claimed_at)
+            else:
+                self._run_pesantren(job, claimed_at)
+            self._update_owned(job_id, claimed_at, "status = 'completed', finished_at = now()")
+            self.db.commit()
+        except JobTakenOver:
+            self.db.rollback()
+            print(f"Warning: Scoring job {job_id} was taken over by another runner; stopping")
+        except Exception as e:
+            self.db.rollback()
+            try:
+                self._update_owned(job_id, claimed_at, "status = 'failed', error = :error", {"error": str(e)})
+                self.db.commit()
+            except JobTakenOver:
+                self.db.rollback()
+            print(f"Warning: Scoring job {job_id} failed: {e}")
+
+    def _update_owned(
+        self,
+        job_id: UUID,
+        claimed_at: datetime,
+        assignments: str,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """UPDATE the job if this runner still holds its claim; raise JobTakenOver otherwise.
+
+        The job row stays locked until commit, so a concurrent claim waits and then
+        sees the fresh heartbeat.
+        """
+        row = self.db.execute(
+            text(f"UPDATE scoring_job SET {assignments} WHERE {_OWNED} RETURNING id"),
+            {"job_id": job_id, "claimed_at": claimed_at, **(params or {})},
+        ).first()
+        if row is None:
+            raise JobTakenOver(str(job_id))
+
+    def _run_santri(self, job: ScoringJob, claimed_at: datetime) -> None:
+        if settings.scoring_engine == "sql":
+            scorer = SqlScoreService(self.db, job.chunk_size)
+        elif settings.scoring_workers == 1:
+            scorer = BulkScoreService(self.db, job.chunk_size)
+        else:
+            scorer = ParallelScoreService(self.db, job.chunk_size, settings.scoring_workers)
+        for ids, results, errors in scorer.iter_scored_chunks(after=job.cursor):
+            items = [
+                {
+                    "entity_id": UUID(r["santri_id"]),
+                    "nama": r["nama"],
+                    "success": True,
+                    "skor_total": r["skor_total"],
+                    "kategori": r["kategori"],
+                }
+                for r in results
+            ] + [
+                {"entity_id": UUID(e["santri_id"]), "nama": e["nama"], "success": False, "error": e["error"]}
+                for e in errors
+            ]
+            self._commit_chunk(job, claimed_at, ids[-1], items)
+
+    def _run_pesantren(self, job: ScoringJob, claimed_at: datetime) -> None:
+        scorer = PesantrenBulkScoreService(self.db, job.chunk_size)
+        for ids, results, errors in scorer.iter_scored_chunks(after=job.cursor):
+            items = [
+                {
+                    "entity_id": UUID(r["pesantren_id"]),
+                    "nama": r["nama"],
+                    "success": True,
+                    "skor_total": r["skor_total"],
+                    "kategori": r["kategori"],
+                }
+                for r in results
+            ] + [
+                {"entity_id": UUID(e["pesantren_id"]), "nama": e["nama"], "success": False, "error": e["error"]}
+                for e in errors
+            ]
+            self._commit_chunk(job, claimed_at, ids[-1], items)
+
+    def _commit_chunk(
+        self, job: ScoringJob, claimed_at: datetime, cursor: UUID, items: List[Dict[str, Any]]
+    ) -> None:
+        """Advance the job cursor and record a chunk's results in the chunk's transaction.
+
+        Raises:
+            JobTakenOver: Another runner claimed the job; nothing of this chunk is kept
+        """
+        succeeded = sum(1 for item in items if item["success"])
+        # clock_timestamp(): now() is the start of this chunk's transaction
+        self._update_owned(
+            job.id,
+            claimed_at,
+            "processed = processed + :succeeded, failed = failed + :failed,"
+            " cursor = :cursor, heartbeat_at = clock_timestamp()",
+            {"succeeded": succeeded, "failed": len(items) - succeeded, "cursor": cursor},
+        )
+        if items:
+            self.db.execute(insert(ScoringJobItem), [
+                {"job_id": job.id, "skor_total": None, "kategori": None, "error": None, **item}
+                for item in items
+            ])
+        self.db.commit()
+
+
+def run_scoring_job(job_id: UUID, claimed_at: Optional[datetime] = None) -> None:
+    """Run a job in its own session (entry point for background tasks)."""
+    db = SessionLocal()
+    try:
+        ScoringJobService(db).run(job_id, claimed_at=claimed_at)
+    finally:
+        db.close()
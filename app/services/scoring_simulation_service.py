@@ -0,0 +1,307 @@
+"""What-if simulation of candidate scoring configs.
+
+The raw parameter values of every santri are loaded once into a columnar feature
+matrix (one query, see `FeatureSql`) and cached in memory. Each column is stored as
+integer codes into its distinct values, so evaluating a parameter is one rule match
+per distinct value (`CompiledParameter.match`, the same semantics as the live
+scorer) followed by a NumPy lookup over the whole population. A candidate config
+and the live scoring.json are evaluated side by side; nothing is persisted.
+"""
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.santri_pribadi import SantriPribadi
+from app.rules.scoring_program import CompiledParameter, ScoringProgram, compile_scoring_config, get_scoring_program
+from app.rules.scoring_sql import FeatureSql
+
+
+# Rows fetched per round trip while building the matrix
+LOAD_PARTITION_ROWS = 50000
+
+# Rule lookup tables kept per matrix (live config and unchanged candidate parameters reuse them)
+MAX_CACHED_LOOKUPS = 256
+
+TANPA_KABUPATEN = "Tidak diketahui"
+
+
+def _encode(values: Tuple[Any, ...], index: Dict[Any, int]) -> np.ndarray:
+    """Map values to codes in `index`, adding unseen values."""
+    for value in dict.fromkeys(values):
+        if value not in index:
+            index[value] = len(index)
+    return np.fromiter(map(index.__getitem__, values), dtype=np.int32, count=len(values))
+
+
+def _narrow(codes: np.ndarray, distinct: int) -> np.ndarray:
+    if distinct <= np.iinfo(np.int8).max:
+        return codes.astype(np.int8)
+    if distinct <= np.iinfo(np.int16).max:
+        return codes.astype(np.int16)
+    return codes
+
+
+class FeatureMatrix:
+    """Parameter values of the whole santri population in columnar form."""
+
+    def __init__(
+        self,
+        santri_ids: List[str],
+        kabupaten: np.ndarray,
+        kabupaten_labels: List[str],
+        codes: List[np.ndarray],
+        uniques: List[List[Any]],
+        column_of: Dict[Tuple[str, str], int],
+    ):
+        self.santri_ids = santri_ids
+        self.kabupaten = kabupaten
+        self.kabupaten_labels = kabupaten_labels
+        self.codes = codes
+        self.uniques = uniques
+        self.column_of = column_of
+        self.built_at = datetime.now()
+        self.build_seconds = 0.0
+        self._lookups: Dict[Tuple[int, str], np.ndarray] = {}
+
+    @property
+    def size(self) -> int:
+        return len(self.santri_ids)
+
+    @classmethod
+    def load(cls, db: Session) -> "FeatureMatrix":
+        started = time.perf_counter()
+        feature_sql = FeatureSql()
+        width = len(feature_sql.columns)
+
+        santri_ids: List[str] = []
+        kabupaten_index: Dict[Any, int] = {}
+        kabupaten_parts: List[np.ndarray] = []
+        indexes: List[Dict[Any, int]] = [{} for _ in range(width)]
+        parts: List[List[np.ndarray]] = [[] for _ in range(width)]
+
+        result = db.execute(
+            text(feature_sql.select_sql("sp.kabupaten")),
+            feature_sql.params,
+            execution_options={"stream_results": True},
+        )
+        for rows in result.partitions(LOAD_PARTITION_ROWS):
+            columns = list(zip(*rows))
+            santri_ids.extend(columns[0])
+            kabupaten_parts.append(_encode(tuple(label or TANPA_KABUPATEN for label in columns[1]), kabupaten_index))
+            for i in range(width):
+                parts[i].append(_encode(columns[2 + i], indexes[i]))
+
+        def concat(chunks: List[np.ndarray]) -> np.ndarray:
+            return np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.int32)
+
+        matrix = cls(
+            santri_ids=santri_ids,
+            kabupaten=_narrow(concat(kabupaten_parts), len(kabupaten_index)),
+            kabupaten_labels=list(kabupaten_index),
+            codes=[_narrow(concat(parts[i]), len(indexes[i])) for i in range(width)],
+            uniques=[list(index) for index in indexes],
+            column_of=feature_sql.column_of,
+        )
+        matrix.build_seconds = time.perf_counter() - started
+        return matrix
+
+    def parameter_scores(self, param: CompiledParameter):
+        """Skor of one parameter for every santri (a scalar when the value is always None)."""
+        column = self.column_of.get((param.sumber, param.kode))
+        if column is None:
+            return param.match(None) or 0
+        key = (column, repr(param.rules))
+        lut = self._lookups.get(key)
+        if lut is None:
+            uniques = self.uniques[column]
+            lut = np.fromiter(((param.match(value) or 0) for value in uniques), dtype=np.int64, count=len(uniques))
+            if len(self._lookups) >= MAX_CACHED_LOOKUPS:
+                self._lookups.clear()
+            self._lookups[key] = lut
+        return lut[self.codes[column]]
+
+    def evaluate(self, program: ScoringProgram, labels: Dict[str, int]) -> Tuple[np.ndarray, np.ndarray]:
+        """skor_total and kategori code (into `labels`, extended as needed) of every santri."""
+        total = np.zeros(self.size, dtype=np.int64)
+        for dim in program.dimensions:
+            raw = np.zeros(self.size, dtype=np.int64)
+            for param in dim.parameters:
+                raw += self.parameter_scores(param)
+            total += np.minimum(raw, dim.skor_maks)
+
+        kategori = np.full(self.size, labels.setdefault("Tidak Miskin", len(labels)), dtype=np.int16)
+        # Lowest threshold first so the first matching (highest) threshold is applied last
+        for minimum, label in reversed(program.kategori):
+            kategori[total >= minimum] = labels.setdefault(label or "Tidak Miskin", len(labels))
+        return total, kategori
+
+
+_matrix: Optional[FeatureMatrix] = None
+_matrix_lock = threading.Lock()
+
+
+def get_feature_matrix(db: Session, refresh: bool = False) -> FeatureMatrix:
+    """Cached feature matrix; rebuilt when older than SCORING_SIMULATION_CACHE_SECONDS or on `refresh`."""
+    global _matrix
+    with _matrix_lock:
+        matrix = _matrix
+        expired = (
+            matrix is None
+            or (datetime.now() - matrix.built_at).total_seconds() > settings.scoring_simulation_cache_seconds
+        )
+        if refresh or expired:
+            matrix = FeatureMatrix.load(db)
+            _matrix = matrix
+        return matrix
+
+
+class ScoringSimulationService:
+    """Compare a candidate scoring config against the live scoring.json."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def simulate(self, candidate_cfg: Dict[str, Any], changed_limit: int = 100, refresh: bool = False) -> Dict[str, Any]:
+        """Score the population with both configs and summarise the differences.
+
+        Args:
+            candidate_cfg: Config with the same shape as scoring.json
+            changed_limit: Maximum santri listed in `changed` (largest score change first)
+            refresh: Rebuild the feature matrix from the database first
+
+        Raises:
+            ValueError: The candidate config cannot be compiled
+        """
+        if not isinstance(candidate_cfg, dict) or not isinstance(candidate_cfg.get("dimensi"), dict) or not candidate_cfg["dimensi"]:
+            raise ValueError("Config kandidat harus memiliki 'dimensi'")
+        try:
+            candidate = compile_scoring_config(candidate_cfg)
+        except Exception as e:
+            raise ValueError(f"Config kandidat tidak valid: {e}")
+
+        matrix = get_feature_matrix(self.db, refresh=refresh)
+        started = time.perf_counter()
+        live = get_scoring_program()
+
+        labels: Dict[str, int] = {}
+        live_total, live_kategori = matrix.evaluate(live, labels)
+        candidate_total, candidate_kategori = matrix.evaluate(candidate, labels)
+        names = list(labels)
+        changed = live_kategori != candidate_kategori
+
+        return {
+            "total_santri": matrix.size,
+            "live": {"metode": live.metode, "version": live.version},
+            "candidate": {"metode": candidate.metode, "version": candidate.version},
+            "distribution": self._distribution(names, live_kategori, candidate_kategori),
+            "transitions": self._transitions(names, live_kategori, candidate_kategori),
+            "per_kabupaten": self._per_kabupaten(matrix, names, live_total, candidate_total, live_kategori, candidate_kategori, changed),
+            "changed_total": int(changed.sum()),
+            "changed": self._changed(matrix, names, live_total, candidate_total, live_kategori, candidate_kategori, changed, changed_limit),
+            "feature_matrix": {
+                "built_at": matrix.built_at,
+                "build_seconds": round(matrix.build_seconds, 2),
+                "columns": len(matrix.codes),
+            },
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+
+    @staticmethod
+    def _distribution(names: List[str], live: np.ndarray, candidate: np.ndarray) -> List[Dict[str, Any]]:
+        live_counts = np.bincount(live, minlength=len(names))
+        candidate_counts = np.bincount(candidate, minlength=len(names))
+        return [
+            {
+                "kategori": name,
+                "live": int(live_counts[i]),
+                "candidate": int(candidate_counts[i]),
+                "selisih": int(candidate_counts[i] - live_counts[i]),
+            }
+            for i, name in enumerate(names)
+        ]
+
+    @staticmethod
+    def _transitions(names: List[str], live: np.ndarray, candidate: np.ndarray) -> List[Dict[str, Any]]:
+        k = len(names)
+        counts = np.bincount(live.astype(np.int64) * k + candidate, minlength=k * k).reshape(k, k)
+        return [
+            {"dari": names[i], "ke": names[j], "jumlah": int(counts[i, j])}
+            for i in range(k)
+            for j in range(k)
+            if i != j and counts[i, j]
+        ]
+
+    @staticmethod
+    def _per_kabupaten(
+        matrix: FeatureMatrix,
+        names: List[str],
+        live_total: np.ndarray,
+        candidate_total: np.ndarray,
+        live: np.ndarray,
+        candidate: np.ndarray,
+        changed: np.ndarray,
+    ) -> List[Dict[str, Any]]:
+        kab = matrix.kabupaten.astype(np.int64)
+        n, k = len(matrix.kabupaten_labels), len(names)
+        totals = np.bincount(kab, minlength=n)
+        changed_counts = np.bincount(kab, weights=changed, minlength=n)
+        live_sum = np.bincount(kab, weights=live_total, minlength=n)
+        candidate_sum = np.bincount(kab, weights=candidate_total, minlength=n)
+        live_counts = np.bincount(kab * k + live, minlength=n * k).reshape(n, k)
+        candidate_counts = np.bincount(kab * k + candidate, minlength=n * k).reshape(n, k)
+
+        rows = []
+        for i, label in enumerate(matrix.kabupaten_labels):
+            if not totals[i]:
+                continue
+            rows.append({
+                "kabupaten": label,
+                "total": int(totals[i]),
+                "berubah": int(changed_counts[i]),
+                "rata_skor_live": round(live_sum[i] / totals[i], 2),
+                "rata_skor_candidate": round(candidate_sum[i] / totals[i], 2),
+                "live": {name: int(live_counts[i, j]) for j, name in enumerate(names) if live_counts[i, j]},
+                "candidate": {name: int(candidate_counts[i, j]) for j, name in enumerate(names) if candidate_counts[i, j]},
+            })
+        rows.sort(key=lambda row: (-row["berubah"], row["kabupaten"]))
+        return rows
+
+    def _changed(
+        self,
+        matrix: FeatureMatrix,
+        names: List[str],
+        live_total: np.ndarray,
+        candidate_total: np.ndarray,
+        live: np.ndarray,
+        candidate: np.ndarray,
+        changed: np.ndarray,
+        limit: int,
+    ) -> List[Dict[str, Any]]:
+        positions = np.flatnonzero(changed)
+        delta = candidate_total[positions] - live_total[positions]
+        positions = positions[np.argsort(-np.abs(delta), kind="stable")][:limit]
+        if not len(positions):
+            return []
+
+        ids = [UUID(matrix.santri_ids[p]) for p in positions]
+        rows = self.db.query(SantriPribadi.id, SantriPribadi.nama).filter(SantriPribadi.id.in_(ids)).all()
+        nama = {str(row.id): row.nama for row in rows}
+        return [
+            {
+                "santri_id": matrix.santri_ids[p],
+                "nama": nama.get(matrix.santri_ids[p]),
+                "kabupaten": matrix.kabupaten_labels[matrix.kabupaten[p]],
+                "skor_live": int(live_total[p]),
+                "skor_candidate": int(candidate_total[p]),
+                "kategori_live": names[live[p]],
+                "kategori_candidate": names[candidate[p]],
+            }
+            for p in positions
+        ]
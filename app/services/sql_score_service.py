@@ -0,0 +1,148 @@
+"""Score-in-database mode for santri.
+
+scoring.json is compiled to SQL (see `app.rules.scoring_sql`), so scoring a chunk
+or the whole population is one `INSERT ... SELECT ... ON CONFLICT` into santri_skor
+followed by one into santri_map (and a santri_feature refresh); no scoring
+inputs travel to the application.
+Rows written this way have `breakdown = NULL`; it is rebuilt on read.
+
+Run standalone for a population-wide recompute:
+    python -m app.services.sql_score_service
+"""
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from uuid import UUID
+from sqlalchemy import bindparam, text
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
+from sqlalchemy.orm import Session
+
+from app.rules.scoring_sql import compile_scoring_sql
+from app.services.bulk_score_service import DEFAULT_CHUNK_SIZE, BulkScoreService
+from app.services.data_version_service import bump_data_version
+from app.services.gis_grid_service import GisGridService
+from app.services.santri_feature_service import SantriFeatureService
+
+
+_MAP_UPSERT = """
+INSERT INTO santri_map (santri_id, nama, skor_terakhir, kategori_kemiskinan, pesantren_id, lokasi)
+SELECT sk.santri_id, sp.nama, sk.skor_total, sk.kategori_kemiskinan, sp.pesantren_id, sp.lokasi
+FROM santri_skor sk
+JOIN santri_pribadi sp ON sp.id = sk.santri_id
+{scope}
+ON CONFLICT (santri_id) DO UPDATE SET
+    nama = EXCLUDED.nama,
+    skor_terakhir = EXCLUDED.skor_terakhir,
+    kategori_kemiskinan = EXCLUDED.kategori_kemiskinan,
+    pesantren_id = EXCLUDED.pesantren_id,
+    lokasi = COALESCE(EXCLUDED.lokasi, santri_map.lokasi)
+"""
+
+
+def _scoped(sql: str):
+    return text(sql).bindparams(bindparam("santri_ids", type_=ARRAY(PG_UUID(as_uuid=True))))
+
+
+class SqlScoreService:
+    """Score santri with the SQL-compiled scoring.json."""
+
+    def __init__(self, db: Session, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.db = db
+        self.bulk = BulkScoreService(db, chunk_size)
+        self.compiled = compile_scoring_sql()
+
+    def score_ids(self, santri_ids: Sequence[UUID]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Score the given santri and stage the writes in the current transaction.
+
+        Returns:
+            Tuple of (results, errors), one entry per santri.
+        """
+        ids = list(santri_ids)
+        rows = self.db.execute(
+            _scoped(self.compiled.upsert_sql(scoped=True)),
+            {**self.compiled.params, "santri_ids": ids},
+        ).all()
+        bump_data_version(self.db, "santri_skor")
+        self._upsert_map_safely(ids)
+        self._sync_features_safely(ids)
+
+        results = [
+            {
+                "santri_id": str(row.santri_id),
+                "nama": row.nama,
+                "skor_total": row.skor_total,
+                "kategori": row.kategori_kemiskinan,
+            }
+            for row in rows
+        ]
+        found = {result["santri_id"] for result in results}
+        errors = [
+            {"santri_id": str(sid), "nama": None, "error": "Santri tidak ditemukan"}
+            for sid in ids
+            if str(sid) not in found
+        ]
+        return results, errors
+
+    def iter_scored_chunks(
+        self, after: Optional[UUID] = None
+    ) -> Iterator[Tuple[List[UUID], List[Dict[str, Any]], List[Dict[str, Any]]]]:
+        """Same contract as `BulkScoreService.iter_scored_chunks`, scored by PostgreSQL."""
+        for ids in self.bulk.iter_id_chunks(after=after):
+            try:
+                results, errors = self.score_ids(ids)
+            except Exception as e:
+                self.db.rollback()
+                results = []
+                errors = [{"santri_id": str(sid), "nama": None, "error": str(e)} for sid in ids]
+            yield ids, results, errors
+
+    def score_all(self) -> Dict[str, Any]:
+        """Score every santri with one statement per table and a single commit; returns counts only."""
+        total = self.db.execute(text(self.compiled.upsert_sql(count_only=True)), self.compiled.params).scalar()
+        bump_data_version(self.db, "santri_skor")
+        self._upsert_map_safely()
+        self._sync_features_safely()
+        self.db.commit()
+        return {"total_processed": total or 0, "errors": []}
+
+    def _upsert_map_safely(self, santri_ids: Optional[List[UUID]] = None) -> None:
+        # AUTO-UPDATE SANTRI MAP for GIS inside a savepoint
+        try:
+            with self.db.begin_nested():
+                grid = GisGridService(self.db)
+                if santri_ids is None:
+                    self.db.execute(text(_MAP_UPSERT.format(scope="")))
+                    grid.rebuild("santri")
+                else:
+                    before = grid.snapshot("santri", santri_ids)
+                    self.db.execute(
+                        _scoped(_MAP_UPSERT.format(scope="WHERE sk.santri_id = ANY(:santri_ids)")),
+                        {"santri_ids": santri_ids},
+                    )
+                    grid.apply("santri", santri_ids, before)
+        except Exception as map_error:
+            print(f"Warning: Failed to update santri_map: {map_error}")
+
+    def _sync_features_safely(self, santri_ids: Optional[List[UUID]] = None) -> None:
+        try:
+            with self.db.begin_nested():
+                SantriFeatureService(self.db).refresh(santri_ids)
+        except Exception as feature_error:
+            print(f"Warning: Failed to update santri_feature: {feature_error}")
+
+
+if __name__ == "__main__":
+    import time
+
+    import app.main  # noqa: F401  (registers every model mapper)
+    from app.core.database import SessionLocal
+
+    session = SessionLocal()
+    try:
+        started = time.time()
+        summary = SqlScoreService(session).score_all()
+        elapsed = time.time() - started
+        print(
+            f"Scored {summary['total_processed']} santri in PostgreSQL "
+            f"in {elapsed:.1f}s ({summary['total_processed'] / elapsed if elapsed else 0:.0f}/s)"
+        )
+    finally:
+        session.close()
@@ -2,6 +2,7 @@
 
 from .json_response import JSONResponse, success_response, error_response, paginated_response
 from .file_handler import FileHandler, allowed_file, save_upload_file, delete_file
+from .cursor import encode_cursor, decode_cursor
 
 __all__ = [
     "JSONResponse",
@@ -12,4 +13,6 @@ __all__ = [
     "allowed_file",
     "save_upload_file",
     "delete_file",
+    "encode_cursor",
+    "decode_cursor",
 ]
@@ -0,0 +1,27 @@
+"""Opaque keyset-pagination cursors."""
+
+import base64
+import json
+from typing import Any, List
+
+
+def encode_cursor(values: List[Any]) -> str:
+    """Encode the sort key of the last row of a page as a URL-safe token."""
+    raw = json.dumps(values, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str, length: int) -> List[Any]:
+    """
+    Decode a token made by `encode_cursor`.
+
+    Raises:
+        ValueError: If the token is malformed or does not hold `length` values
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+    except Exception:
+        raise ValueError("Cursor tidak valid")
+    if not isinstance(values, list) or len(values) != length:
+        raise ValueError("Cursor tidak valid")
+    return values
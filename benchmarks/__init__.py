@@ -0,0 +1 @@
+"""Reproducible performance benchmarks (see benchmarks/README.md)."""
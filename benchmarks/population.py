@@ -0,0 +1,305 @@
+"""Synthetic santri/pesantren population for benchmarks.
+
+Generates pondok_pesantren (with fisik, fasilitas and pendidikan rows) and santri
+(with orangtua, rumah, asset, pembiayaan, kesehatan and bansos rows) with enum
+distributions close to the field data, located inside Jawa Barat. The same
+`seed` always produces the same rows (including ids), so runs are comparable.
+
+Only use a dedicated database: the data is inserted as-is and `reset` empties
+every santri/pesantren table.
+
+    python -m benchmarks.population --database-url postgresql://localhost/santri_bench --santri 50000
+"""
+import argparse
+import os
+import random
+import uuid
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from sqlalchemy import Enum, insert, text
+from sqlalchemy.orm import Session
+
+
+# Rows per INSERT round trip
+INSERT_BATCH_SIZE = 5000
+
+# Approximate extent of Jawa Barat (lon/lat)
+JABAR_BBOX = (106.40, -7.80, 108.80, -5.95)
+
+KABUPATEN = (
+    "Bandung", "Bandung Barat", "Bekasi", "Bogor", "Ciamis", "Cianjur", "Cirebon",
+    "Garut", "Indramayu", "Karawang", "Kuningan", "Majalengka", "Pangandaran",
+    "Purwakarta", "Subang", "Sukabumi", "Sumedang", "Tasikmalaya", "Kota Bandung",
+    "Kota Bekasi", "Kota Bogor", "Kota Depok", "Kota Tasikmalaya",
+)
+
+# (table, column) -> {value: weight}; enum columns not listed are drawn uniformly
+WEIGHTS: Dict[tuple, Dict[Any, float]] = {
+    ("santri_rumah", "status_rumah"): {"milik_sendiri": 60, "kontrak": 15, "menumpang": 25},
+    ("santri_rumah", "jenis_lantai"): {"tanah": 15, "semen": 45, "keramik": 40},
+    ("santri_rumah", "jenis_dinding"): {"bambu": 20, "kayu": 25, "tembok": 55},
+    ("santri_rumah", "jenis_atap"): {"rumbia": 5, "seng": 25, "genteng": 60, "beton": 10},
+    ("santri_rumah", "akses_air_bersih"): {"layak": 75, "tidak_layak": 25},
+    ("santri_rumah", "daya_listrik_va"): {"450": 30, "900": 40, "1300": 20, "2200": 7, "3500": 2, "5500": 1},
+    ("santri_asset", "jenis_aset"): {
+        "motor": 30, "hp": 35, "sepeda": 10, "ternak": 8, "lahan": 6,
+        "alat_kerja": 5, "mobil": 2, "laptop": 2, "lainnya": 2,
+    },
+    ("santri_pembiayaan", "sumber_biaya"): {"orang_tua": 70, "wali": 12, "donatur": 10, "beasiswa": 8},
+    ("santri_pembiayaan", "status_pembayaran"): {"lancar": 65, "terlambat": 22, "menunggak": 13},
+    ("santri_kesehatan", "status_gizi"): {"baik": 75, "kurang": 18, "lebih": 7},
+    ("santri_orangtua", "hubungan"): {"ayah": 55, "ibu": 40, "wali": 5},
+    ("santri_orangtua", "status_hidup"): {"hidup": 92, "meninggal": 8},
+    ("santri_pribadi", "status_tinggal"): {"mondok": 80, "pp": 15, "mukim": 5},
+}
+
+PEKERJAAN = {
+    "petani": 25, "buruh": 22, "pedagang": 14, "wiraswasta": 10, "nelayan": 4,
+    "PNS": 5, "pegawai_tetap": 5, "guru honorer": 5, "sopir": 5, "": 5,
+}
+PENDIDIKAN = {"tidak_sekolah": 5, "SD": 35, "SMP": 27, "SMA": 25, "D3": 3, "S1": 5}
+PENYAKIT = {"": 80, "asma": 6, "maag": 6, "tifus": 4, "TBC": 2, "diabetes": 2}
+
+
+class _Sampler:
+    """Seeded draws for the generator."""
+
+    def __init__(self, seed: int):
+        self.rng = random.Random(seed)
+
+    def uuid(self) -> uuid.UUID:
+        return uuid.UUID(int=self.rng.getrandbits(128), version=4)
+
+    def weighted(self, weights: Dict[Any, float]) -> Any:
+        return self.rng.choices(list(weights), weights=list(weights.values()))[0]
+
+    def enum(self, table, column: str) -> Any:
+        col_type = table.c[column].type
+        weights = WEIGHTS.get((table.name, column))
+        if weights is not None:
+            return self.weighted(weights)
+        values: Sequence[Any] = list(col_type.enum_class) if col_type.enum_class else list(col_type.enums)
+        return self.rng.choice(values)
+
+    def point(self) -> str:
+        min_lon, min_lat, max_lon, max_lat = JABAR_BBOX
+        lon = self.rng.uniform(min_lon, max_lon)
+        lat = self.rng.uniform(min_lat, max_lat)
+        return f"SRID=4326;POINT({lon:.6f} {lat:.6f})"
+
+    def chance(self, p: float) -> bool:
+        return self.rng.random() < p
+
+
+def _enum_columns(table) -> List[str]:
+    return [col.name for col in table.columns if isinstance(col.type, Enum)]
+
+
+def _batches(rows: List[Dict[str, Any]]) -> Iterator[List[Dict[str, Any]]]:
+    for start in range(0, len(rows), INSERT_BATCH_SIZE):
+        yield rows[start:start + INSERT_BATCH_SIZE]
+
+
+def _insert(db: Session, table, rows: List[Dict[str, Any]]) -> None:
+    for batch in _batches(rows):
+        db.execute(insert(table), batch)
+
+
+def _pesantren_rows(s: _Sampler, count: int):
+    from app.models.pondok_pesantren import PondokPesantren
+    from app.models.pesantren_fisik import PesantrenFisik
+    from app.models.pesantren_fasilitas import PesantrenFasilitas
+    from app.models.pesantren_pendidikan import PesantrenPendidikan
+
+    fisik_t, fasilitas_t, pendidikan_t = PesantrenFisik.__table__, PesantrenFasilitas.__table__, PesantrenPendidikan.__table__
+    pondok, fisik, fasilitas, pendidikan = [], [], [], []
+    for i in range(count):
+        pid = s.uuid()
+        pondok.append({
+            "id": pid,
+            "nama": f"Pondok Pesantren Bench {i + 1}",
+            "nsp": f"5103{i:08d}",
+            "tahun_berdiri": s.rng.randint(1900, 2020),
+            "jumlah_santri": s.rng.randint(30, 2500),
+            "jumlah_guru": s.rng.randint(3, 150),
+            "kabupaten": s.rng.choice(KABUPATEN),
+            "provinsi": "Jawa Barat",
+            "lokasi": s.point(),
+        })
+        if s.chance(0.95):
+            row = {"id": s.uuid(), "pesantren_id": pid, "rasio_kepadatan_kamar": round(s.rng.uniform(1, 12), 1),
+                   "luas_tanah": round(s.rng.uniform(500, 50000)), "jumlah_mck": s.rng.randint(1, 60)}
+            row.update({col: s.enum(fisik_t, col) for col in _enum_columns(fisik_t)})
+            fisik.append(row)
+        if s.chance(0.9):
+            row = {"id": s.uuid(), "pesantren_id": pid, "jumlah_kamar": s.rng.randint(2, 200),
+                   "jumlah_ruang_kelas": s.rng.randint(1, 60), "jumlah_masjid": s.rng.randint(0, 3),
+                   "perpustakaan": s.chance(0.6), "laboratorium": s.chance(0.25), "ruang_komputer": s.chance(0.35),
+                   "koperasi": s.chance(0.5), "kantin": s.chance(0.7), "jarak_ke_kota_km": round(s.rng.uniform(0.5, 60), 1)}
+            row.update({col: s.enum(fasilitas_t, col) for col in _enum_columns(fasilitas_t)})
+            fasilitas.append(row)
+        if s.chance(0.9):
+            row = {"id": s.uuid(), "pesantren_id": pid, "jumlah_guru_tetap": s.rng.randint(1, 80),
+                   "jumlah_guru_tidak_tetap": s.rng.randint(0, 60), "persen_guru_bersertifikat": s.rng.randint(0, 100),
+                   "rasio_guru_santri": round(s.rng.uniform(5, 60), 1)}
+            row.update({col: s.enum(pendidikan_t, col) for col in _enum_columns(pendidikan_t)})
+            pendidikan.append(row)
+    return [(PondokPesantren.__table__, pondok), (fisik_t, fisik), (fasilitas_t, fasilitas), (pendidikan_t, pendidikan)]
+
+
+def _santri_rows(s: _Sampler, count: int, pesantren_ids: List[uuid.UUID], offset: int):
+    from app.models.santri_pribadi import SantriPribadi
+    from app.models.santri_orangtua import SantriOrangtua
+    from app.models.santri_rumah import SantriRumah
+    from app.models.santri_asset import SantriAsset
+    from app.models.santri_pembiayaan import SantriPembiayaan
+    from app.models.santri_kesehatan import SantriKesehatan
+    from app.models.santri_bansos import SantriBansos
+
+    pribadi_t, rumah_t = SantriPribadi.__table__, SantriRumah.__table__
+    orangtua_t, asset_t = SantriOrangtua.__table__, SantriAsset.__table__
+    pembiayaan_t, kesehatan_t = SantriPembiayaan.__table__, SantriKesehatan.__table__
+    rows: Dict[Any, List[Dict[str, Any]]] = {
+        t: [] for t in (pribadi_t, orangtua_t, rumah_t, asset_t, pembiayaan_t, kesehatan_t, SantriBansos.__table__)
+    }
+    for i in range(count):
+        sid = s.uuid()
+        rows[pribadi_t].append({
+            "id": sid,
+            "pesantren_id": s.rng.choice(pesantren_ids),
+            "nama": f"Santri Bench {offset + i + 1}",
+            "jenis_kelamin": s.rng.choice(("L", "P")),
+            "status_tinggal": s.enum(pribadi_t, "status_tinggal"),
+            "lama_mondok_tahun": s.rng.randint(0, 6),
+            "provinsi": "Jawa Barat",
+            "kabupaten": s.rng.choice(KABUPATEN),
+            "lokasi": s.point() if s.chance(0.9) else None,
+        })
+        for _ in range(s.weighted({0: 3, 1: 62, 2: 35})):
+            rows[orangtua_t].append({
+                "id": s.uuid(), "santri_id": sid, "nama": "Orang Tua",
+                "hubungan": s.enum(orangtua_t, "hubungan"),
+                "status_hidup": s.enum(orangtua_t, "status_hidup"),
+                "pekerjaan": s.weighted(PEKERJAAN) or None,
+                "pendidikan": s.weighted(PENDIDIKAN),
+                # Skewed towards low incomes, a few above 5 juta
+                "pendapatan_bulanan": int(min(s.rng.lognormvariate(14.2, 0.6), 15_000_000)) // 1000 * 1000,
+            })
+        if s.chance(0.95):
+            rows[rumah_t].append({"id": s.uuid(), "santri_id": sid, **{col: s.enum(rumah_t, col) for col in _enum_columns(rumah_t)}})
+        for _ in range(s.weighted({0: 12, 1: 30, 2: 30, 3: 18, 4: 10})):
+            rows[asset_t].append({
+                "id": s.uuid(), "santri_id": sid, "jenis_aset": s.enum(asset_t, "jenis_aset"),
+                "jumlah": s.weighted({1: 80, 2: 15, 3: 5}),
+                "nilai_perkiraan": s.rng.randint(1, 200) * 500_000,
+            })
+        if s.chance(0.9):
+            status = s.enum(pembiayaan_t, "status_pembayaran")
+            rows[pembiayaan_t].append({
+                "id": s.uuid(), "santri_id": sid,
+                "sumber_biaya": s.enum(pembiayaan_t, "sumber_biaya"),
+                "status_pembayaran": status,
+                "biaya_per_bulan": s.rng.randint(2, 30) * 50_000,
+                "tunggakan_bulan": 0 if status == "lancar" else s.rng.randint(1, 6),
+            })
+        if s.chance(0.85):
+            rows[kesehatan_t].append({
+                "id": s.uuid(), "santri_id": sid,
+                "status_gizi": s.enum(kesehatan_t, "status_gizi"),
+                "tinggi_badan": round(s.rng.uniform(120, 180), 1),
+                "berat_badan": round(s.rng.uniform(25, 80), 1),
+                "riwayat_penyakit": s.weighted(PENYAKIT) or None,
+                "kebutuhan_khusus": "tuna rungu" if s.chance(0.02) else None,
+            })
+        if s.chance(0.8):
+            rows[SantriBansos.__table__].append({
+                "id": s.uuid(), "santri_id": sid,
+                "pkh": s.chance(0.3), "bpnt": s.chance(0.25), "pip": s.chance(0.35),
+                "kis_pbi": s.chance(0.4), "blt_desa": s.chance(0.1),
+            })
+    return list(rows.items())
+
+
+def reset_population(db: Session) -> None:
+    """Empty every table filled by the generator (and the scores derived from them)."""
+    db.execute(text(
+        "TRUNCATE santri_skor, santri_map, santri_orangtua, santri_rumah, santri_asset,"
+        " santri_pembiayaan, santri_kesehatan, santri_bansos, santri_pribadi,"
+        " pesantren_skor, pesantren_map, pesantren_fisik, pesantren_fasilitas,"
+        " pesantren_pendidikan, pondok_pesantren, santri_skor_histogram, gis_grid_cell CASCADE"
+    ))
+    db.commit()
+
+
+def generate_population(db: Session, santri: int, pesantren: int, seed: int = 42) -> Dict[str, int]:
+    """Insert `pesantren` pondok and `santri` santri with all their sub-table rows.
+
+    Santri are generated and committed in slices of `INSERT_BATCH_SIZE` to keep
+    memory flat for large populations.
+
+    Returns:
+        Row counts per table
+    """
+    sampler = _Sampler(seed)
+    counts: Dict[str, int] = {}
+
+    def add(tables) -> None:
+        for table, rows in tables:
+            _insert(db, table, rows)
+            counts[table.name] = counts.get(table.name, 0) + len(rows)
+
+    pesantren_tables = _pesantren_rows(sampler, max(1, pesantren))
+    pesantren_ids = [row["id"] for row in pesantren_tables[0][1]]
+    add(pesantren_tables)
+    db.commit()
+
+    for offset in range(0, santri, INSERT_BATCH_SIZE):
+        add(_santri_rows(sampler, min(INSERT_BATCH_SIZE, santri - offset), pesantren_ids, offset))
+        db.commit()
+
+    db.execute(text("ANALYZE"))
+    db.commit()
+    return counts
+
+
+def add_database_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--database-url",
+        default=os.environ.get("BENCHMARK_DATABASE_URL"),
+        help="Dedicated benchmark database (default: $BENCHMARK_DATABASE_URL)",
+    )
+
+
+def use_database(url: Optional[str]) -> None:
+    """Point the app (and worker processes it spawns) at the benchmark database; call before importing app modules."""
+    if not url:
+        raise SystemExit("Set --database-url or BENCHMARK_DATABASE_URL to a dedicated benchmark database")
+    os.environ["DATABASE_URL"] = url
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate a synthetic santri/pesantren population")
+    add_database_arguments(parser)
+    parser.add_argument("--santri", type=int, default=10000)
+    parser.add_argument("--pesantren", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="Empty the santri/pesantren tables first")
+    args = parser.parse_args()
+
+    use_database(args.database_url)
+    import app.main  # noqa: F401  (registers every model mapper)
+    from app.core.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        if args.reset:
+            reset_population(db)
+        counts = generate_population(db, args.santri, args.pesantren, args.seed)
+    finally:
+        db.close()
+    for table, count in counts.items():
+        print(f"{table}: {count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+"""Scoring throughput benchmark.
+
+Times the scoring paths against a synthetic population (see `population`) and
+writes the results as JSON, so runs from different releases can be compared:
+
+- single_santri: `ScoreService.calculate_and_save` (POST /api/scoring/{id}/calculate)
+- batch_calculate_all: a santri scoring job from empty santri_skor (POST /api/scoring/batch/calculate-all)
+- batch_rescore_unchanged: the same job again, nothing changed in between
+- pesantren_calculate_all: a pesantren scoring job (POST /api/pesantren-scoring/batch/calculate-all)
+- map_sync: santri_map and pesantren_map upserts only, from precomputed scores
+
+Each scenario runs in a fresh process, so `peak_rss_mb` is that scenario's own peak.
+Reported per scenario: entities, seconds, ms per entity, SQL statements per entity
+and peak RSS.
+
+    python -m benchmarks.scoring_benchmark --database-url postgresql://localhost/santri_bench \\
+        --generate --santri 50000 --pesantren 500 --compare benchmarks/results/previous.json
+"""
+import argparse
+import json
+import multiprocessing
+import platform
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks.population import add_database_arguments, generate_population, reset_population, use_database
+
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+SCENARIOS = (
+    "single_santri",
+    "batch_calculate_all",
+    "batch_rescore_unchanged",
+    "pesantren_calculate_all",
+    "map_sync",
+)
+
+
+class QueryCounter:
+    """Counts statements sent on the app engine while `active`."""
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+
+        self.count = 0
+        self.active = False
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args) -> None:
+        if self.active:
+            self.count += 1
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux; process-pool workers count as children
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return round(max(own, children) / 1024, 1)
+
+
+def _measure(counter: QueryCounter, entities: int, work: Callable[[Callable], None]) -> Dict[str, Any]:
+    """Run `work(timed)`; only code run inside `timed(fn)` is timed and counted."""
+    elapsed = 0.0
+
+    def timed(fn: Callable[[], Any]) -> Any:
+        nonlocal elapsed
+        counter.active = True
+        started = time.perf_counter()
+        try:
+            return fn()
+        finally:
+            elapsed += time.perf_counter() - started
+            counter.active = False
+
+    work(timed)
+    return {
+        "entities": entities,
+        "seconds": round(elapsed, 3),
+        "ms_per_entity": round(elapsed * 1000 / entities, 3) if entities else None,
+        "queries": counter.count,
+        "queries_per_entity": round(counter.count / entities, 3) if entities else None,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def _run_scenario(name: str, options: Dict[str, Any]) -> Dict[str, Any]:
+    import app.main  # noqa: F401  (registers every model mapper)
+    from sqlalchemy import func, text
+    from app.core.database import SessionLocal, engine
+    from app.models.pondok_pesantren import PondokPesantren
+    from app.models.santri_pribadi import SantriPribadi
+    from app.services.bulk_score_service import BulkScoreService
+    from app.services.pesantren_bulk_score_service import PesantrenBulkScoreService
+    from app.services.score_service import ScoreService
+    from app.services.score_writer import PesantrenScoreWriter, SantriScoreWriter
+    from app.services.scoring_job_service import ScoringJobService
+
+    counter = QueryCounter(engine)
+    db = SessionLocal()
+    try:
+        santri_total = db.query(func.count(SantriPribadi.id)).scalar() or 0
+        pesantren_total = db.query(func.count(PondokPesantren.id)).scalar() or 0
+
+        def run_job(kind: str) -> Callable:
+            def work(timed: Callable) -> None:
+                jobs = ScoringJobService(db)
+                job = jobs.create(kind, options["chunk_size"])
+                timed(lambda: jobs.run(job.id))
+                db.expire_all()
+                job = jobs.get_by_id(job.id)
+                if job.status != "completed" or job.failed:
+                    raise RuntimeError(f"{kind} job {job.status} with {job.failed} failures: {job.error}")
+            return work
+
+        if name == "single_santri":
+            sample = options["single_sample"]
+            step = max(1, santri_total // sample) if sample else 1
+            ids = [row.id for row in db.query(SantriPribadi.id).order_by(SantriPribadi.id).all()][::step][:sample]
+            service = ScoreService(db)
+
+            def work(timed: Callable) -> None:
+                for santri_id in ids:
+                    db.expire_all()
+                    timed(lambda: service.calculate_and_save(santri_id))
+            return _measure(counter, len(ids), work)
+
+        if name == "batch_calculate_all":
+            db.execute(text("TRUNCATE santri_skor, santri_map"))
+            # The grid follows santri_map by deltas only
+            db.execute(text("DELETE FROM gis_grid_cell WHERE layer = 'santri'"))
+            db.commit()
+            return _measure(counter, santri_total, run_job("santri"))
+
+        if name == "batch_rescore_unchanged":
+            return _measure(counter, santri_total, run_job("santri"))
+
+        if name == "pesantren_calculate_all":
+            db.execute(text("TRUNCATE pesantren_skor, pesantren_map"))
+            db.execute(text("DELETE FROM gis_grid_cell WHERE layer = 'pesantren'"))
+            db.commit()
+            return _measure(counter, pesantren_total, run_job("pesantren"))
+
+        if name == "map_sync":
+            def work(timed: Callable) -> None:
+                santri = BulkScoreService(db, options["chunk_size"])
+                for ids in santri.iter_id_chunks():
+                    scored, _, _ = santri.compute_chunk(ids)
+                    timed(lambda: (SantriScoreWriter(db).upsert_map(scored), db.commit()))
+                pesantren = PesantrenBulkScoreService(db, options["chunk_size"])
+                for ids in pesantren.iter_id_chunks():
+                    scored, _, _ = pesantren.compute_chunk(ids)
+                    timed(lambda: (PesantrenScoreWriter(db).upsert_map(scored), db.commit()))
+            return _measure(counter, santri_total + pesantren_total, work)
+
+        raise ValueError(f"Unknown scenario: {name}")
+    finally:
+        db.close()
+
+
+def _scenario_process(name: str, options: Dict[str, Any], queue) -> None:
+    try:
+        queue.put({"scenario": name, **_run_scenario(name, options)})
+    except Exception as e:
+        queue.put({"scenario": name, "error": str(e)})
+
+
+def run_isolated(name: str, options: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one scenario in a fresh (spawned) process and return its measurements."""
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    process = ctx.Process(target=_scenario_process, args=(name, options, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def _environment() -> Dict[str, Any]:
+    from app.core.config import settings
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except Exception:
+        commit = None
+    return {
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": multiprocessing.cpu_count(),
+        "scoring_engine": settings.scoring_engine,
+        "scoring_workers": settings.scoring_workers,
+    }
+
+
+def _compare(results: List[Dict[str, Any]], previous_path: Path) -> None:
+    previous = {s["scenario"]: s for s in json.loads(previous_path.read_text())["scenarios"]}
+    print(f"\nCompared with {previous_path}:")
+    for result in results:
+        before = previous.get(result["scenario"])
+        if not before or not before.get("ms_per_entity") or not result.get("ms_per_entity"):
+            continue
+        change = (result["ms_per_entity"] - before["ms_per_entity"]) * 100 / before["ms_per_entity"]
+        print(
+            f"  {result['scenario']:<26} ms/entity {before['ms_per_entity']:>9} -> {result['ms_per_entity']:<9}"
+            f" ({change:+.1f}%)  queries/entity {before['queries_per_entity']} -> {result['queries_per_entity']}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark santri/pesantren scoring")
+    add_database_arguments(parser)
+    parser.add_argument("--generate", action="store_true", help="Reset and generate the population first")
+    parser.add_argument("--santri", type=int, default=10000, help="Santri to generate (with --generate)")
+    parser.add_argument("--pesantren", type=int, default=200, help="Pesantren to generate (with --generate)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--scenario", action="append", choices=SCENARIOS, help="Run only these scenarios (repeatable)")
+    parser.add_argument("--single-sample", type=int, default=200, help="Santri scored one by one in single_santri")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--output", type=Path, help="Result file (default: benchmarks/results/scoring-<timestamp>.json)")
+    parser.add_argument("--compare", type=Path, help="Earlier result file to compare against")
+    args = parser.parse_args()
+
+    use_database(args.database_url)
+    import app.main  # noqa: F401  (registers every model mapper)
+    from sqlalchemy import func
+    from app.core.database import SessionLocal
+    from app.models.pondok_pesantren import PondokPesantren
+    from app.models.santri_pribadi import SantriPribadi
+
+    db = SessionLocal()
+    try:
+        if args.generate:
+            started = time.perf_counter()
+            reset_population(db)
+            generate_population(db, args.santri, args.pesantren, args.seed)
+            print(f"Generated {args.santri} santri / {args.pesantren} pesantren in {time.perf_counter() - started:.1f}s")
+        population = {
+            "santri": db.query(func.count(SantriPribadi.id)).scalar() or 0,
+            "pesantren": db.query(func.count(PondokPesantren.id)).scalar() or 0,
+            "seed": args.seed if args.generate else None,
+        }
+    finally:
+        db.close()
+
+    options = {"single_sample": args.single_sample, "chunk_size": args.chunk_size}
+    results = []
+    for name in args.scenario or SCENARIOS:
+        result = run_isolated(name, options)
+        results.append(result)
+        if "error" in result:
+            print(f"{name:<26} FAILED: {result['error']}")
+        else:
+            print(
+                f"{name:<26} {result['entities']:>8} entities  {result['seconds']:>9.2f}s"
+                f"  {result['ms_per_entity']:>8} ms/entity  {result['queries_per_entity']:>7} queries/entity"
+                f"  {result['peak_rss_mb']:>7} MB peak RSS"
+            )
+
+    report = {
+        "benchmark": "scoring",
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "population": population,
+        "options": options,
+        "environment": _environment(),
+        "scenarios": results,
+    }
+    output = args.output or RESULTS_DIR / f"scoring-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        _compare(results, args.compare)
+    if any("error" in result for result in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,39 +7,62 @@ import time
 
 BASE_URL = "http://localhost:8000"
 
-def recalculate_all_santri():
-    """Recalculate scores for all santri"""
-    print("=" * 70)
-    print("RECALCULATING ALL SANTRI SCORES")
-    print("=" * 70)
-    
-    url = f"{BASE_URL}/api/scoring/batch/calculate-all"
-    
+POLL_INTERVAL = 2  # seconds between job status checks
+
+
+def run_job(url):
+    """Submit a batch scoring job, poll it until it finishes and print failures."""
     print(f"\nPOST {url}")
-    print("Processing...")
     
     start_time = time.time()
     response = requests.post(url)
-    elapsed = time.time() - start_time
-    
-    if response.status_code == 200:
-        data = response.json()
-        print(f"\n✓ SUCCESS ({elapsed:.2f}s)")
-        print(f"  Total Processed: {data['data']['total_processed']}")
-        print(f"  Total Errors: {data['data']['total_errors']}")
-        
-        if data['data']['errors']:
-            print("\n  Errors:")
-            for error in data['data']['errors'][:5]:  # Show first 5 errors
-                print(f"    - {error['nama']} ({error['santri_id']}): {error['error']}")
-            if len(data['data']['errors']) > 5:
-                print(f"    ... and {len(data['data']['errors']) - 5} more errors")
-        
-        return data['data']
-    else:
+    if response.status_code != 202:
         print(f"\n✗ FAILED ({response.status_code})")
         print(f"  {response.text}")
         return None
+    
+    job = response.json()['data']
+    status_url = f"{BASE_URL}{job['status_url']}"
+    results_url = f"{BASE_URL}{job['results_url']}"
+    print(f"Job {job['id']} submitted, polling {status_url}")
+    
+    while job['status'] in ('pending', 'running'):
+        time.sleep(POLL_INTERVAL)
+        job = requests.get(status_url).json()['data']
+        done = job['processed'] + job['failed']
+        eta = f", ETA {job['eta_seconds']:.0f}s" if job['eta_seconds'] is not None else ""
+        print(f"  {done}/{job['total']} ({job['progress_percent']}%){eta}")
+    
+    elapsed = time.time() - start_time
+    if job['status'] != 'completed':
+        print(f"\n✗ JOB {job['status'].upper()} ({elapsed:.2f}s): {job['error']}")
+        print(f"  Resume with: POST {status_url}/resume")
+        return None
+    
+    print(f"\n✓ SUCCESS ({elapsed:.2f}s)")
+    print(f"  Total Processed: {job['processed']}")
+    print(f"  Total Errors: {job['failed']}")
+    if job.get('throughput_per_second') is not None:
+        print(f"  Throughput: {job['throughput_per_second']}/s")
+    
+    if job['failed']:
+        errors = requests.get(results_url, params={"status": "error", "per_page": 5}).json()['data']
+        print("\n  Errors:")
+        for error in errors:  # Show first 5 errors
+            print(f"    - {error['nama']} ({error['entity_id']}): {error['error']}")
+        if job['failed'] > 5:
+            print(f"    ... and {job['failed'] - 5} more errors ({results_url}?status=error)")
+    
+    return {"total_processed": job['processed'], "total_errors": job['failed']}
+
+
+def recalculate_all_santri():
+    """Recalculate scores for all santri"""
+    print("=" * 70)
+    print("RECALCULATING ALL SANTRI SCORES")
+    print("=" * 70)
+    
+    return run_job(f"{BASE_URL}/api/scoring/batch/calculate-all")
 
 
 def recalculate_all_pesantren():
@@ -48,33 +71,7 @@ def recalculate_all_pesantren():
     print("RECALCULATING ALL PESANTREN SCORES")
     print("=" * 70)
     
-    url = f"{BASE_URL}/api/pesantren-scoring/batch/calculate-all"
-    
-    print(f"\nPOST {url}")
-    print("Processing...")
-    
-    start_time = time.time()
-    response = requests.post(url)
-    elapsed = time.time() - start_time
-    
-    if response.status_code == 200:
-        data = response.json()
-        print(f"\n✓ SUCCESS ({elapsed:.2f}s)")
-        print(f"  Total Processed: {data['data']['total_processed']}")
-        print(f"  Total Errors: {data['data']['total_errors']}")
-        
-        if data['data']['errors']:
-            print("\n  Errors:")
-            for error in data['data']['errors'][:5]:  # Show first 5 errors
-                print(f"    - {error['nama']} ({error['pesantren_id']}): {error['error']}")
-            if len(data['data']['errors']) > 5:
-                print(f"    ... and {len(data['data']['errors']) - 5} more errors")
-        
-        return data['data']
-    else:
-        print(f"\n✗ FAILED ({response.status_code})")
-        print(f"  {response.text}")
-        return None
+    return run_job(f"{BASE_URL}/api/pesantren-scoring/batch/calculate-all")
 
 
 def main():
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Check: vectorised `greedy_select` vs a plain one-santri-at-a-time scan.
+
+Runs on random costs, groups, quotas (some unlimited) and budgets; no database
+needed. Exit code 1 when a case differs.
+"""
+import sys
+
+import numpy as np
+
+from app.services.bansos_targeting_service import greedy_select
+
+CASES = 3000
+
+
+def sequential_select(order, cost, groups, quota, budget):
+    """Reference: take each candidate in order if it fits the budget and its group quota."""
+    taken = np.zeros(len(quota))
+    remaining = budget
+    selected = []
+    for position in order:
+        group = groups[position]
+        if cost[position] <= remaining and taken[group] < quota[group]:
+            selected.append(position)
+            remaining -= cost[position]
+            taken[group] += 1
+    return np.array(selected, dtype=np.int64)
+
+
+def random_case(rng):
+    n = int(rng.integers(0, 300))
+    n_groups = int(rng.integers(1, 6))
+    cost = rng.choice([1, 2, 3, 5, 8, 13], size=n).astype(np.int64) * rng.integers(1, 3)
+    groups = rng.integers(0, n_groups, size=n)
+    quota = np.where(rng.random(n_groups) < 0.5, np.inf, rng.integers(0, 40, size=n_groups)).astype(float)
+    order = rng.permutation(n)
+    budget = int(rng.integers(0, 400))
+    return order, cost, groups, quota, budget
+
+
+def test_greedy_select_matches_sequential_scan():
+    rng = np.random.default_rng(20261017)
+    for case in range(CASES):
+        args = random_case(rng)
+        expected = sequential_select(*args)
+        actual = greedy_select(*args)
+        assert np.array_equal(actual, expected), f"case {case}: {actual.tolist()} != {expected.tolist()}"
+
+
+def test_greedy_select_edge_cases():
+    empty = np.zeros(0, dtype=np.int64)
+    assert len(greedy_select(empty, empty, empty, np.array([np.inf]), 100)) == 0
+    order = np.arange(3)
+    cost = np.array([5, 5, 5])
+    groups = np.zeros(3, dtype=np.int64)
+    # Zero budget, zero quota, exact budget fit
+    assert len(greedy_select(order, cost, groups, np.array([np.inf]), 0)) == 0
+    assert len(greedy_select(order, cost, groups, np.array([0.0]), 100)) == 0
+    assert greedy_select(order, cost, groups, np.array([np.inf]), 10).tolist() == [0, 1]
+
+
+if __name__ == "__main__":
+    try:
+        test_greedy_select_matches_sequential_scan()
+        test_greedy_select_edge_cases()
+    except AssertionError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    print(f"✅ greedy_select identical to the sequential scan on {CASES} random cases")
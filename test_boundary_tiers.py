@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""Check: `pick_tier` zoom and tolerance boundaries for the admin boundary tiers.
+
+No database needed. Exit code 1 on the first wrong pick.
+"""
+import sys
+
+from app.gis.boundary_tiers import pick_tier
+
+
+def test_zoom_boundaries():
+    expected = {
+        0: ("geom_s3", 3), 5: ("geom_s3", 3),
+        6: ("geom_s2", 4), 8: ("geom_s2", 4),
+        9: ("geom_s1", 5), 11: ("geom_s1", 5),
+        12: ("geom", 6), 22: ("geom", 6),
+    }
+    for zoom, tier in expected.items():
+        assert pick_tier(zoom=zoom) == tier, f"zoom {zoom}: {pick_tier(zoom=zoom)} != {tier}"
+
+
+def test_tolerance_boundaries():
+    expected = {
+        0.5: ("geom_s3", 3), 0.01: ("geom_s3", 3),
+        0.005: ("geom_s2", 4), 0.002: ("geom_s2", 4),
+        0.001: ("geom_s1", 5), 0.0005: ("geom_s1", 5),
+        0.0004: ("geom", 6), 1e-9: ("geom", 6),
+    }
+    for tolerance, tier in expected.items():
+        actual = pick_tier(tolerance=tolerance)
+        assert actual == tier, f"tolerance {tolerance}: {actual} != {tier}"
+
+
+def test_tolerance_wins_over_zoom():
+    assert pick_tier(zoom=22, tolerance=0.01) == ("geom_s3", 3)
+
+
+def test_no_argument_keeps_full_geometry():
+    assert pick_tier() is None
+
+
+def test_invalid_values_rejected():
+    for kwargs in ({"zoom": -1}, {"zoom": 23}, {"tolerance": 0}, {"tolerance": -0.001}):
+        try:
+            pick_tier(**kwargs)
+        except ValueError:
+            continue
+        raise AssertionError(f"{kwargs} should raise ValueError")
+
+
+if __name__ == "__main__":
+    try:
+        test_zoom_boundaries()
+        test_tolerance_boundaries()
+        test_tolerance_wins_over_zoom()
+        test_no_argument_keeps_full_geometry()
+        test_invalid_values_rejected()
+    except AssertionError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    print("✅ pick_tier boundaries OK")
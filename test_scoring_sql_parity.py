@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""Parity test: SQL-compiled scoring vs the Python scoring.json evaluator.
+
+Scores every santri both ways (read-only, nothing is written) and reports any
+santri whose skor_* components, skor_total or kategori_kemiskinan differ.
+Exit code 1 when a mismatch is found.
+"""
+import sys
+
+from sqlalchemy import text
+
+import app.main  # noqa: F401  (registers every model mapper)
+from app.core.database import SessionLocal
+from app.repositories.santri_data_repository import SantriDataRepository
+from app.rules.scoring_program import SKOR_COMPONENTS, get_scoring_program
+from app.rules.scoring_rules import calculate_scores_from_inputs
+from app.rules.scoring_sql import compile_scoring_sql
+from app.services.bulk_score_service import BulkScoreService
+
+db = SessionLocal()
+try:
+    program = get_scoring_program()
+    compiled = compile_scoring_sql()
+    sql_rows = {row.santri_id: row for row in db.execute(text(compiled.select_sql()), compiled.params)}
+    print(f"SQL scored {len(sql_rows)} santri")
+
+    repo = SantriDataRepository(db)
+    checked = 0
+    mismatches = 0
+    for ids in BulkScoreService(db).iter_id_chunks():
+        inputs = repo.get_all_many(ids)
+        for santri_id in ids:
+            per_component, total, kategori, _, _, _ = calculate_scores_from_inputs(inputs[santri_id], program)
+            expected = {**{col: per_component[col] for col in SKOR_COMPONENTS}, "skor_total": total, "kategori_kemiskinan": kategori}
+
+            row = sql_rows.get(santri_id)
+            actual = {col: getattr(row, col) for col in expected} if row else None
+            checked += 1
+            if actual != expected:
+                mismatches += 1
+                print(f"❌ {santri_id}")
+                print(f"   python: {expected}")
+                print(f"   sql:    {actual}")
+
+    print(f"\nChecked {checked} santri, {mismatches} mismatch")
+    if mismatches:
+        sys.exit(1)
+    print("✅ SQL scoring identical to calculate_scores_from_config")
+finally:
+    db.close()